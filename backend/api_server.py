@@ -6,9 +6,10 @@ This allows the Next.js frontend to call the Python LangGraph backend via HTTP.
 
 import os
 import sys
-import json
+import time
+import uuid
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable, Tuple
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import traceback
@@ -16,31 +17,274 @@ import traceback
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.graph.orchestrator import build_langgraph_app
+from src.server.bounded_server import BoundedThreadPoolHTTPServer
+from src.server.jobs import Job, JobStore, JobQueueFull
+from src.graph.orchestrator import SCORING_MODES, build_langgraph_app
 from src.graph.optimization_orchestrator import build_optimization_app
+from src.config import (
+    warm_up_llm_clients,
+    GRAPH_CHECKPOINT_PATH,
+    GRAPH_CHECKPOINT_TTL_SECONDS,
+    GRAPH_PARTIAL_RETRIES,
+    LLM_RETRY_BUDGET,
+    LLM_HEDGE_MAX_PER_REQUEST,
+)
+from src.graph.checkpointing import has_thread, input_hash, resume_input, stored_input_hash, thread_config
+from src.graph.failures import invoke_with_partial_retry, partial_retry_state
+from src.utils.checkpoint_utils import get_checkpointer
+from src.utils.json_stream_utils import stream_partials
+from src.utils.serialization_utils import dumps_bytes, loads
+from src.utils.llm_utils import hedge_budget
 from src.utils.logging_utils import setup_logging, get_logger
+from src.utils.metrics_utils import REGISTRY
+from src.utils.retry_utils import retry_budget
+from src.utils.tracing_utils import get_correlation_id, record_span, sanitize_correlation_id, start_trace
 
 # Setup logging
 setup_logging("INFO")
 logger = get_logger(__name__)
 
-# Build the LangGraph apps once at startup
+# Build the LangGraph apps once at startup (checkpointed if GRAPH_CHECKPOINT_PATH is set)
 logger.info("Building LangGraph applications...")
-app = build_langgraph_app()
-optimization_app = build_optimization_app()
+checkpointer = get_checkpointer(GRAPH_CHECKPOINT_PATH, GRAPH_CHECKPOINT_TTL_SECONDS)
+app = build_langgraph_app(checkpointer)
+optimization_app = build_optimization_app(checkpointer)
 logger.info("LangGraph applications ready")
 
+# Create the shared Vertex AI clients before the first request arrives
+if os.getenv("LLM_WARMUP", "true").lower() in ("1", "true", "yes"):
+    try:
+        logger.info(f"Warmed up {warm_up_llm_clients()} LLM clients")
+    except Exception as e:
+        logger.warning(f"LLM client warm-up skipped: {e}")
+
+
+# Background executor for the asynchronous /jobs API
+job_store = JobStore(
+    max_workers=int(os.getenv("JOB_WORKERS", "4")),
+    max_pending=int(os.getenv("JOB_MAX_PENDING", "64")),
+    ttl_seconds=float(os.getenv("JOB_TTL_SECONDS", "3600")),
+    max_finished=int(os.getenv("JOB_MAX_FINISHED", "256")),
+)
+
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests",
+    "HTTP requests handled, by route, method and status code",
+    ("route", "method", "status"),
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time to handle an HTTP request once a worker picked it up",
+    ("route", "method"),
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ("route",),
+)
+HTTP_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "http_queue_wait_seconds",
+    "Time accepted connections waited in the server queue for a worker",
+)
+
+KNOWN_ROUTES = {"/", "/optimize", "/optimize/stream", "/stream", "/jobs", "/health", "/metrics"}
+
+
+def _route_label(path: str) -> str:
+    """Bounded-cardinality route label for metrics."""
+    if path == "":
+        return "/"
+    if path in KNOWN_ROUTES:
+        return path
+    if path.startswith("/jobs/"):
+        return "/jobs/{id}"
+    return "other"
+
+
+def _collect_server_metrics():
+    """Scrape-time metrics for the job store and the bounded server (if running)."""
+    job_counts = job_store.stats()
+    yield "jobs", "gauge", "Background jobs by status", [
+        ("", {"status": status}, count) for status, count in job_counts.items()
+    ]
+    server = _active_server
+    if isinstance(server, BoundedThreadPoolHTTPServer):
+        stats = server.stats()
+        yield "server_workers_busy", "gauge", "Server worker threads handling a request", [
+            ("", {}, stats["in_flight"])
+        ]
+        yield "server_queue_depth", "gauge", "Accepted connections waiting for a worker", [
+            ("", {}, stats["queued"])
+        ]
+        yield "server_rejected_requests", "counter", "Connections rejected with 503 because the queue was full", [
+            ("_total", {}, stats["rejected_total"])
+        ]
+
+
+# Server instance started by run_server, exported through /metrics
+_active_server: Optional[HTTPServer] = None
+REGISTRY.register_collector(_collect_server_metrics)
+
+
+def _iter_graph_events(
+    graph,
+    initial_state: Optional[Dict[str, Any]],
+    section_prefix: str,
+    result: Dict[str, Any],
+    retries: int = 0,
+    thread_id: Optional[str] = None,
+    partials: bool = False,
+):
+    """
+    Stream a graph and yield (event, data) as nodes complete.
+    
+    Yields ("resume_structured", dict) once extraction finishes,
+    ("section", {"section": name, "result": value}) for every node whose
+    name starts with section_prefix, and ("section_failed", NodeFailure dict)
+    for section nodes that failed. With ``partials`` (inside stream_partials),
+    also yields ("section_partial", {"section", "path", "item"}) for items
+    the agents report while their LLM response is still streaming. Every
+    node update is merged into ``result`` so the caller ends up with the
+    final graph state. Failed sections are re-run up to ``retries`` more
+    times. With a checkpointed graph, an existing ``thread_id`` is resumed
+    (initial_state may be None).
+    """
+    stream_mode = ["updates", "custom"] if partials else ["updates"]
+    state = initial_state
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            state = partial_retry_state(result)
+            if state is None:
+                break
+            # A retry recomputes these from scratch
+            result.pop("node_failures", None)
+        config = thread_config(graph, thread_id, attempt)
+        graph_input, checkpointed = resume_input(graph, state, config)
+        result.update(checkpointed)
+        for mode, update in graph.stream(graph_input, config, stream_mode=stream_mode):
+            if mode == "custom":
+                yield "section_partial", update
+                continue
+            for node_name, node_output in update.items():
+                if not node_output:
+                    continue
+                if "node_failures" in node_output:
+                    result["node_failures"] = result.get("node_failures", []) + node_output["node_failures"]
+                    for failure in node_output["node_failures"]:
+                        yield "section_failed", failure
+                    continue
+                if "entry_batches" in node_output:
+                    # Additive like node_failures; kept so a retry re-runs only failed batches
+                    result["entry_batches"] = result.get("entry_batches", []) + node_output["entry_batches"]
+                    continue
+                result.update(node_output)
+                
+                if "resume_structured" in node_output:
+                    yield "resume_structured", node_output["resume_structured"]
+                elif node_name.startswith(section_prefix):
+                    section = node_name[len(section_prefix):]
+                    # Each section node writes exactly one state key
+                    value = next(iter(node_output.values()))
+                    yield "section", {"section": section, "result": value}
+
+
+def _run_graph_job(
+    job: Job,
+    graph,
+    initial_state: Optional[Dict[str, Any]],
+    section_prefix: str,
+    formatter: Callable[[Dict[str, Any]], Dict[str, Any]],
+    correlation_id: Optional[str] = None,
+    retries: int = 0,
+    thread_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run a graph for a background job, publishing section results as partials.
+
+    The job is traced separately from the request that submitted it, under
+    the submitter's correlation id.
+    """
+    result: Dict[str, Any] = dict(initial_state or {})
+    with start_trace(f"job.{job.type}", correlation_id or job.id, job_id=job.id), \
+            retry_budget(LLM_RETRY_BUDGET), hedge_budget(LLM_HEDGE_MAX_PER_REQUEST):
+        for event, data in _iter_graph_events(graph, initial_state, section_prefix, result, retries, thread_id):
+            if event == "resume_structured":
+                job.set_partial("resumeStructured", data)
+            elif event == "section":
+                job.set_partial(data["section"], data["result"])
+    data = formatter(result)["data"]
+    data["threadId"] = thread_id
+    return data
+
 
 class ResumeAnalysisHandler(BaseHTTPRequestHandler):
     """HTTP request handler for resume analysis."""
     
+    def send_response(self, code, message=None):
+        """Record the status code for request metrics and echo the correlation id."""
+        self._status_code = code
+        super().send_response(code, message)
+        correlation_id = get_correlation_id()
+        if correlation_id:
+            self.send_header('X-Request-ID', correlation_id)
+    
+    def _observe(self, method: str, route_handler: Callable[[], None]):
+        """
+        Run a route handler, recording request count, latency and in-flight gauge.
+        
+        The request is traced under the caller's X-Request-ID (or a new id),
+        which is echoed back and tagged on every log line, graph node and
+        LLM call made on its behalf.
+        """
+        route = _route_label(urlparse(self.path).path)
+        self._status_code = None
+        correlation_id = sanitize_correlation_id(self.headers.get('X-Request-ID'))
+        with start_trace(f"{method} {route}", correlation_id, http_method=method, http_route=route) as trace:
+            if isinstance(self.server, BoundedThreadPoolHTTPServer):
+                queue_wait = self.server.queue_wait()
+                HTTP_QUEUE_WAIT_SECONDS.observe(queue_wait)
+                # Extend the request span back to when the connection was accepted
+                now_ns = time.time_ns()
+                trace.root().start_ns = now_ns - int(queue_wait * 1e9)
+                record_span("http.queue_wait", trace.root().start_ns, now_ns)
+            HTTP_IN_FLIGHT.inc(route=route)
+            start = time.perf_counter()
+            try:
+                route_handler()
+            finally:
+                HTTP_IN_FLIGHT.dec(route=route)
+                HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, route=route, method=method)
+                HTTP_REQUESTS.inc(route=route, method=method, status=str(self._status_code or 0))
+                trace.root().set_attribute("http_status", self._status_code or 0)
+    
     def do_GET(self):
-        """Handle GET requests (health check)."""
-        if self.path == "/health":
+        """Handle GET requests (health check, metrics and job status)."""
+        self._observe("GET", self._route_get)
+    
+    def do_POST(self):
+        """Handle POST requests for resume analysis and optimization."""
+        self._observe("POST", self._route_post)
+    
+    def _route_get(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            body = REGISTRY.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == "/health":
+            health = {"status": "healthy", "jobs": job_store.stats()}
+            if isinstance(self.server, BoundedThreadPoolHTTPServer):
+                health["server"] = self.server.stats()
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({"status": "healthy"}).encode())
+            self.wfile.write(dumps_bytes(health))
+        elif path.startswith("/jobs/"):
+            self._handle_job_status(path[len("/jobs/"):])
         else:
             self.send_response(404)
             self.end_headers()
@@ -49,191 +293,246 @@ class ResumeAnalysisHandler(BaseHTTPRequestHandler):
         """Handle CORS preflight requests."""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Request-ID')
         self.end_headers()
     
-    def do_POST(self):
-        """Handle POST requests for resume analysis and optimization."""
+    def _route_post(self):
         try:
             # Parse URL path
             parsed_path = urlparse(self.path)
             path = parsed_path.path
             
-            # Route to appropriate handler
-            if path == "/optimize":
-                self._handle_optimize()
-            elif path == "/" or path == "":
-                self._handle_analysis()
-            else:
-                self._send_error(404, f"Endpoint not found: {path}")
+            # Route to appropriate handler; LLM retries for the whole request
+            # and hedges share one budget so a degraded backend can't multiply load
+            with retry_budget(LLM_RETRY_BUDGET), hedge_budget(LLM_HEDGE_MAX_PER_REQUEST):
+                if path == "/optimize":
+                    self._handle_optimize()
+                elif path == "/optimize/stream":
+                    self._handle_optimize_stream()
+                elif path == "/stream":
+                    self._handle_analysis_stream()
+                elif path == "/jobs":
+                    self._handle_job_submit()
+                elif path == "/" or path == "":
+                    self._handle_analysis()
+                else:
+                    self._send_error(404, f"Endpoint not found: {path}")
                 
         except Exception as e:
             logger.error(f"Error processing request: {e}")
             logger.error(traceback.format_exc())
             self._send_error(500, f"Internal server error: {str(e)}")
     
+    def _read_json_body(self) -> Optional[Dict[str, Any]]:
+        """Read and parse the JSON request body, sending a 400 on failure."""
+        content_length = int(self.headers.get('Content-Length', 0))
+        post_data = self.rfile.read(content_length)
+        
+        try:
+            return loads(post_data)
+        except ValueError as e:
+            logger.error(f"Invalid JSON in request: {e}")
+            self._send_error(400, f"Invalid JSON: {e}")
+            return None
+    
+    def _parse_analysis_request(self, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Validate an analysis request and return the initial graph state.
+        
+        ``resume_structured`` may be sent instead of (or with) ``resume_text``
+        to skip extraction, e.g. after the user edits the structured resume;
+        with ``incremental`` only the sections that changed are re-scored.
+        ``scoring_mode`` ("sections" or "fused") overrides SCORING_MODE.
+        """
+        # Extract required fields
+        resume_text = request_data.get('resume_text')
+        job_description = request_data.get('job_description')
+        resume_structured = request_data.get('resume_structured')  # Optional - if provided, skip extraction
+        
+        if not job_description or not (resume_text or resume_structured):
+            self._send_error(400, "resume_text (or resume_structured) and job_description are required")
+            return None
+        
+        scoring_mode = request_data.get('scoring_mode')
+        if scoring_mode is not None and scoring_mode not in SCORING_MODES:
+            self._send_error(400, f"scoring_mode must be one of: {', '.join(SCORING_MODES)}")
+            return None
+        
+        initial_state = {
+            "resume_text": resume_text,
+            "job_description": job_description,
+            "incremental": bool(request_data.get('incremental', False)),
+        }
+        if resume_structured:
+            initial_state["resume_structured"] = resume_structured
+        if scoring_mode:
+            initial_state["scoring_mode"] = scoring_mode
+        return initial_state
+    
+    @staticmethod
+    def _partial_retries(request_data: Dict[str, Any]) -> int:
+        """
+        Rounds of re-running failed section nodes for this request.
+        
+        ``retry_failed`` may be a boolean or a count (capped at 3); when
+        omitted, GRAPH_PARTIAL_RETRIES applies.
+        """
+        value = request_data.get('retry_failed')
+        if value is None:
+            return GRAPH_PARTIAL_RETRIES
+        if isinstance(value, bool):
+            return 1 if value else 0
+        try:
+            return max(0, min(int(value), 3))
+        except (TypeError, ValueError):
+            return GRAPH_PARTIAL_RETRIES
+    
+    # Body fields that define a run's input (thread_id alone resumes a run)
+    _RUN_INPUT_FIELDS = ("resume_text", "resume_structured", "job_description")
+    
+    def _prepare_run(
+        self,
+        request_data: Dict[str, Any],
+        graph,
+        parse_request: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    ) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Resolve a run's thread id and initial graph state.
+        
+        Only an explicit ``thread_id`` resumes a run: when the graph is
+        checkpointed and already has that thread, the run is resumed from
+        its completed nodes and the rest of the body may be omitted. A body
+        that is sent anyway must match the thread's original input.
+        Without ``thread_id`` the run gets a new thread (the request's
+        correlation id, unless a run already used it).
+        
+        Returns:
+            (thread_id, initial_state), where initial_state is None for a
+            resumed run, or None if an error response was already sent
+        """
+        requested = request_data.get('thread_id')
+        if requested:
+            thread_id = sanitize_correlation_id(requested)
+            if has_thread(graph, thread_id):
+                if not any(request_data.get(key) for key in self._RUN_INPUT_FIELDS):
+                    logger.info(f"Resuming run {thread_id}")
+                    return thread_id, None
+                initial_state = parse_request(request_data)
+                if initial_state is None:
+                    return None
+                stored = stored_input_hash(graph, thread_id)
+                if stored is not None and stored != input_hash(initial_state):
+                    logger.warning(f"Run {thread_id} exists with a different input, refusing to resume it")
+                    self._send_error(409, f"thread_id {thread_id} belongs to a run with a different input")
+                    return None
+                logger.info(f"Resuming run {thread_id}")
+                return thread_id, None
+        else:
+            # A reused or fixed request id must never pick up another run's result
+            thread_id = sanitize_correlation_id(get_correlation_id())
+            if has_thread(graph, thread_id):
+                thread_id = f"{thread_id}-{uuid.uuid4().hex[:8]}"
+        initial_state = parse_request(request_data)
+        if initial_state is None:
+            return None
+        initial_state["input_hash"] = input_hash(initial_state)
+        return thread_id, initial_state
+    
+    def _parse_optimize_request(self, request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate an optimization request and return the initial graph state."""
+        # Extract required fields
+        resume_text = request_data.get('resume_text')
+        job_description = request_data.get('job_description')
+        resume_structured = request_data.get('resume_structured')  # Optional - if provided, skip extraction
+        
+        if not job_description:
+            logger.error("Missing job_description in optimization request")
+            self._send_error(400, "job_description is required")
+            return None
+        
+        if not resume_text and not resume_structured:
+            logger.error("Missing both resume_text and resume_structured in optimization request")
+            self._send_error(400, "Either resume_text or resume_structured is required")
+            return None
+        
+        initial_state = {
+            "job_description": job_description,
+            "resume_text": resume_text,  # Keep for summary extraction if needed
+            "incremental": bool(request_data.get('incremental', False)),
+        }
+        # When omitted, the graph's prepare_resume node extracts it from resume_text
+        if resume_structured:
+            initial_state["resume_structured"] = resume_structured
+        return initial_state
+    
     def _handle_analysis(self):
         """Handle resume analysis requests."""
-            # Parse request
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            try:
-                request_data = json.loads(post_data.decode('utf-8'))
-            except json.JSONDecodeError as e:
-                self._send_error(400, f"Invalid JSON: {e}")
+        try:
+            request_data = self._read_json_body()
+            if request_data is None:
                 return
-            
-            # Extract required fields
-            resume_text = request_data.get('resume_text')
-            job_description = request_data.get('job_description')
-            
-            if not resume_text or not job_description:
-                self._send_error(400, "resume_text and job_description are required")
+            run = self._prepare_run(request_data, app, self._parse_analysis_request)
+            if run is None:
                 return
+            thread_id, initial_state = run
             
             logger.info("Processing resume analysis request")
             
-            # Prepare initial state
-            initial_state = {
-                "resume_text": resume_text,
-                "job_description": job_description,
-            }
-            
-            # Invoke the LangGraph app
-            result = app.invoke(initial_state)
+            # Invoke the LangGraph app (failed sections are re-run if requested)
+            result = invoke_with_partial_retry(
+                app, initial_state, self._partial_retries(request_data), thread_id
+            )
             
-            # Extract final score
-            final_score_dict = result.get("final_score")
-            if not final_score_dict:
-                self._send_error(500, "No final_score in result")
+            try:
+                response_data = self._format_analysis_response(result)
+            except ValueError as e:
+                self._send_error(500, str(e))
                 return
-            
-            # Format response to match frontend expectations
-            overall_score = final_score_dict.get("overall_score", 0)
-            resume_structured = result.get("resume_structured", {})
-            
-            response_data = {
-                "success": True,
-                "data": {
-                    "analysisId": f"analysis_{os.urandom(8).hex()}",
-                    "overallScore": round(overall_score),
-                    "atsMatchPercentage": round(overall_score),
-                    "resumeStructured": resume_structured,  # Include structured resume data
-                    "analysis": {
-                        "overallScore": round(overall_score),
-                        "atsMatchPercentage": round(overall_score),
-                        "sectionScores": final_score_dict.get("section_scores", []),
-                        "comments": final_score_dict.get("comments", []),
-                        "strengths": self._extract_strengths(final_score_dict),
-                        "weaknesses": self._extract_weaknesses(final_score_dict),
-                        "nextSteps": self._extract_next_steps(final_score_dict),
-                        "aiGeneratedSummary": " ".join(final_score_dict.get("comments", [])) or "Analysis completed using multi-agent LangGraph system.",
-                    }
-                }
-            }
+            response_data["data"]["threadId"] = thread_id
             
             # Send response
             self._send_json(200, response_data)
             logger.info("Resume analysis completed successfully")
             
+        except Exception as e:
+            logger.error(f"Error processing analysis request: {e}")
+            logger.error(traceback.format_exc())
+            self._send_error(500, f"Internal server error: {str(e)}")
+    
     def _handle_optimize(self):
         """Handle resume optimization requests."""
         try:
-            # Parse request
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            try:
-                request_data = json.loads(post_data.decode('utf-8'))
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON in optimization request: {e}")
-                self._send_error(400, f"Invalid JSON: {e}")
+            request_data = self._read_json_body()
+            if request_data is None:
                 return
-            
-            # Extract required fields
-            resume_text = request_data.get('resume_text')
-            job_description = request_data.get('job_description')
-            resume_structured = request_data.get('resume_structured')  # Optional - if provided, skip extraction
-            
-            if not job_description:
-                logger.error("Missing job_description in optimization request")
-                self._send_error(400, "job_description is required")
-                return
-            
-            if not resume_text and not resume_structured:
-                logger.error("Missing both resume_text and resume_structured in optimization request")
-                self._send_error(400, "Either resume_text or resume_structured is required")
+            run = self._prepare_run(request_data, optimization_app, self._parse_optimize_request)
+            if run is None:
                 return
+            thread_id, initial_state = run
             
             logger.info("Processing resume optimization request")
             
-            # Extract resume first if structured data not provided (like ATS scoring does)
-            # This way the graph receives structured data and skips extraction = 5 calls total
-            if not resume_structured and resume_text:
-                logger.info("Extracting structured resume data first")
-                try:
-                    extract_state = {
-                        "resume_text": resume_text,
-                        "job_description": job_description,
-                    }
-                    extract_result = app.invoke(extract_state)  # Use ATS app to extract (1 call)
-                    resume_structured = extract_result.get("resume_structured", {})
-                    if not resume_structured:
-                        logger.error("Failed to extract structured resume data")
-                        self._send_error(500, "Failed to extract structured resume data")
-                        return
-                except Exception as e:
-                    logger.error(f"Error extracting resume: {e}")
-                    logger.error(traceback.format_exc())
-                    self._send_error(500, f"Failed to extract resume: {str(e)}")
-                    return
-            
-            # Prepare initial state with structured data (graph will skip extraction)
-            initial_state = {
-                "resume_structured": resume_structured,
-                "job_description": job_description,
-                "resume_text": resume_text,  # Keep for summary extraction if needed
-            }
-            
-            # Invoke the optimization LangGraph app (5 parallel calls, no extraction)
+            # Invoke the optimization LangGraph app; its prepare_resume node extracts the
+            # resume when only resume_text was sent (1 call) before the parallel section calls
             logger.info("Invoking optimization LangGraph app")
             try:
-                result = optimization_app.invoke(initial_state)
+                result = invoke_with_partial_retry(
+                    optimization_app, initial_state, self._partial_retries(request_data), thread_id
+                )
             except Exception as e:
                 logger.error(f"Error in optimization LangGraph app: {e}")
                 logger.error(traceback.format_exc())
                 self._send_error(500, f"Optimization failed: {str(e)}")
                 return
             
-            # Extract optimization result
-            optimization_result_dict = result.get("optimization_result")
-            resume_structured = result.get("resume_structured", {})
-            
-            if not optimization_result_dict:
-                logger.error("No optimization_result in result")
-                self._send_error(500, "No optimization_result in result")
+            try:
+                response_data = self._format_optimization_response(result)
+            except ValueError as e:
+                logger.error(str(e))
+                self._send_error(500, str(e))
                 return
-            
-            # Format response for frontend
-            response_data = {
-                "success": True,
-                "data": {
-                    "optimizationId": f"opt_{os.urandom(8).hex()}",
-                    "resumeStructured": resume_structured,
-                    "optimization": optimization_result_dict,
-                    "original": {
-                        "summary": resume_structured.get("summary", ""),
-                        "experience": resume_structured.get("experience", []),
-                        "skills": resume_structured.get("skills", []),
-                        "projects": resume_structured.get("projects", []),
-                        "education": resume_structured.get("education", []),
-                    }
-                }
-            }
+            response_data["data"]["threadId"] = thread_id
             
             # Send response
             self._send_json(200, response_data)
@@ -244,7 +543,246 @@ class ResumeAnalysisHandler(BaseHTTPRequestHandler):
             logger.error(traceback.format_exc())
             self._send_error(500, f"Internal server error: {str(e)}")
     
-    def _extract_strengths(self, final_score: Dict[str, Any]) -> list:
+    def _handle_analysis_stream(self):
+        """Handle resume analysis requests, streaming section scores as SSE."""
+        request_data = self._read_json_body()
+        if request_data is None:
+            return
+        run = self._prepare_run(request_data, app, self._parse_analysis_request)
+        if run is None:
+            return
+        thread_id, initial_state = run
+        
+        logger.info("Processing streaming resume analysis request")
+        self._stream_graph(
+            app,
+            initial_state,
+            section_prefix="score_",
+            section_event="section_score",
+            formatter=self._format_analysis_response,
+            retries=self._partial_retries(request_data),
+            thread_id=thread_id,
+        )
+    
+    def _handle_optimize_stream(self):
+        """Handle resume optimization requests, streaming section optimizations as SSE."""
+        request_data = self._read_json_body()
+        if request_data is None:
+            return
+        run = self._prepare_run(request_data, optimization_app, self._parse_optimize_request)
+        if run is None:
+            return
+        thread_id, initial_state = run
+        
+        logger.info("Processing streaming resume optimization request")
+        self._stream_graph(
+            optimization_app,
+            initial_state,
+            section_prefix="optimize_",
+            section_event="section_optimization",
+            formatter=self._format_optimization_response,
+            retries=self._partial_retries(request_data),
+            thread_id=thread_id,
+        )
+    
+    def _handle_job_submit(self):
+        """
+        Queue an analysis or optimization as a background job.
+        
+        The body is the same as for / or /optimize plus ``type``
+        ("analysis" or "optimization"). Responds 202 with the job id; poll
+        GET /jobs/{id} for status, partial section results and the result.
+        """
+        request_data = self._read_json_body()
+        if request_data is None:
+            return
+        
+        job_type = request_data.get('type', 'analysis')
+        if job_type == "analysis":
+            graph, parse_request = app, self._parse_analysis_request
+            section_prefix, formatter = "score_", self._format_analysis_response
+        elif job_type == "optimization":
+            graph, parse_request = optimization_app, self._parse_optimize_request
+            section_prefix, formatter = "optimize_", self._format_optimization_response
+        else:
+            self._send_error(400, "type must be 'analysis' or 'optimization'")
+            return
+        run = self._prepare_run(request_data, graph, parse_request)
+        if run is None:
+            return
+        thread_id, initial_state = run
+        
+        correlation_id = get_correlation_id()
+        retries = self._partial_retries(request_data)
+        try:
+            job = job_store.submit(
+                job_type,
+                lambda job: _run_graph_job(
+                    job, graph, initial_state, section_prefix, formatter, correlation_id, retries, thread_id
+                ),
+            )
+        except JobQueueFull as e:
+            logger.warning(f"Rejecting job submission: {e}")
+            retry_after = getattr(self.server, "retry_after", 5)
+            self._send_json(503, {
+                "success": False,
+                "error": "Too many pending jobs, please retry later",
+            }, headers={"Retry-After": str(retry_after)})
+            return
+        
+        self._send_json(202, {
+            "success": True,
+            "data": job.to_dict(),
+        }, headers={"Location": f"/jobs/{job.id}"})
+    
+    def _handle_job_status(self, job_id: str):
+        """Return the status, partial results and final result of a job."""
+        job = job_store.get(job_id)
+        if job is None:
+            self._send_error(404, f"Job not found: {job_id}")
+            return
+        self._send_json(200, {
+            "success": True,
+            "data": job.to_dict(),
+        })
+    
+    def _stream_graph(
+        self,
+        graph,
+        initial_state: Optional[Dict[str, Any]],
+        section_prefix: str,
+        section_event: str,
+        formatter: Callable[[Dict[str, Any]], Dict[str, Any]],
+        retries: int = 0,
+        thread_id: Optional[str] = None,
+    ):
+        """
+        Run a graph with LangGraph streaming and forward node results as SSE.
+        
+        Emits ``resume_structured`` once extraction finishes, ``section_partial``
+        for each item (an optimized entry, a score field) an agent completes
+        while its LLM response is still streaming, one ``section_event`` per
+        completed section node (which supersedes that section's partials),
+        ``section_failed`` per failed section node, then a final ``result``
+        event carrying the same payload as the non-streaming endpoint.
+        Failures become an ``error`` event since the 200 status has already
+        been sent.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        
+        result: Dict[str, Any] = dict(initial_state or {})
+        try:
+            with stream_partials():
+                for event, data in _iter_graph_events(
+                    graph, initial_state, section_prefix, result, retries, thread_id, partials=True,
+                ):
+                    if event in ("resume_structured", "section_partial", "section_failed"):
+                        self._send_sse(event, data)
+                    else:
+                        self._send_sse(section_event, data)
+            
+            response_data = formatter(result)
+            response_data["data"]["threadId"] = thread_id
+            self._send_sse("result", response_data)
+            logger.info("Streaming request completed successfully")
+            
+        except (BrokenPipeError, ConnectionResetError):
+            logger.warning("Client disconnected during streaming response")
+        except Exception as e:
+            logger.error(f"Error during streaming request: {e}")
+            logger.error(traceback.format_exc())
+            try:
+                self._send_sse("error", {"success": False, "error": str(e)})
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+    
+    def _send_sse(self, event: str, data: Any):
+        """Write one Server-Sent Event and flush it to the client."""
+        self.wfile.write(b"event: " + event.encode('utf-8') + b"\ndata: " + dumps_bytes(data) + b"\n\n")
+        self.wfile.flush()
+    
+    @staticmethod
+    def _format_analysis_response(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Shape a scoring graph result into the frontend response payload.
+        
+        Raises:
+            ValueError: If the result has no final_score
+        """
+        # Extract final score
+        final_score_dict = result.get("final_score")
+        if not final_score_dict:
+            raise ValueError("No final_score in result")
+        
+        # Format response to match frontend expectations
+        overall_score = final_score_dict.get("overall_score", 0)
+        resume_structured = result.get("resume_structured", {})
+        
+        return {
+            "success": True,
+            "data": {
+                "analysisId": f"analysis_{os.urandom(8).hex()}",
+                "overallScore": round(overall_score),
+                "atsMatchPercentage": round(overall_score),
+                "resumeStructured": resume_structured,  # Include structured resume data
+                "degraded": final_score_dict.get("degraded", False),
+                "failures": result.get("node_failures", []),
+                "skippedSections": final_score_dict.get("skipped_sections", {}),
+                "analysis": {
+                    "overallScore": round(overall_score),
+                    "atsMatchPercentage": round(overall_score),
+                    "sectionScores": final_score_dict.get("section_scores", []),
+                    "comments": final_score_dict.get("comments", []),
+                    "strengths": ResumeAnalysisHandler._extract_strengths(final_score_dict),
+                    "weaknesses": ResumeAnalysisHandler._extract_weaknesses(final_score_dict),
+                    "nextSteps": ResumeAnalysisHandler._extract_next_steps(final_score_dict),
+                    "aiGeneratedSummary": " ".join(final_score_dict.get("comments", [])) or "Analysis completed using multi-agent LangGraph system.",
+                }
+            }
+        }
+    
+    @staticmethod
+    def _format_optimization_response(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Shape an optimization graph result into the frontend response payload.
+        
+        Raises:
+            ValueError: If the result has no optimization_result
+        """
+        # Extract optimization result
+        optimization_result_dict = result.get("optimization_result")
+        resume_structured = result.get("resume_structured", {})
+        
+        if not optimization_result_dict:
+            raise ValueError("No optimization_result in result")
+        
+        # Format response for frontend
+        return {
+            "success": True,
+            "data": {
+                "optimizationId": f"opt_{os.urandom(8).hex()}",
+                "resumeStructured": resume_structured,
+                "optimization": optimization_result_dict,
+                "degraded": optimization_result_dict.get("degraded", False),
+                "failures": result.get("node_failures", []),
+                "skippedSections": optimization_result_dict.get("skipped_sections", {}),
+                "original": {
+                    "summary": resume_structured.get("summary", ""),
+                    "experience": resume_structured.get("experience", []),
+                    "skills": resume_structured.get("skills", []),
+                    "projects": resume_structured.get("projects", []),
+                    "education": resume_structured.get("education", []),
+                }
+            }
+        }
+    
+    @staticmethod
+    def _extract_strengths(final_score: Dict[str, Any]) -> list:
         """Extract strengths from final score."""
         strengths = []
         section_scores = final_score.get("section_scores", [])
@@ -255,7 +793,8 @@ class ResumeAnalysisHandler(BaseHTTPRequestHandler):
                     strengths.extend(reasons[:2])  # Top 2 reasons per strong section
         return strengths[:5]  # Limit to 5 total
     
-    def _extract_weaknesses(self, final_score: Dict[str, Any]) -> list:
+    @staticmethod
+    def _extract_weaknesses(final_score: Dict[str, Any]) -> list:
         """Extract weaknesses from final score."""
         weaknesses = []
         section_scores = final_score.get("section_scores", [])
@@ -266,7 +805,8 @@ class ResumeAnalysisHandler(BaseHTTPRequestHandler):
                     weaknesses.extend(missing[:2])  # Top 2 missing per weak section
         return weaknesses[:5]  # Limit to 5 total
     
-    def _extract_next_steps(self, final_score: Dict[str, Any]) -> list:
+    @staticmethod
+    def _extract_next_steps(final_score: Dict[str, Any]) -> list:
         """Extract next steps from final score."""
         next_steps = []
         section_scores = final_score.get("section_scores", [])
@@ -293,14 +833,16 @@ class ResumeAnalysisHandler(BaseHTTPRequestHandler):
         
         return next_steps[:5]
     
-    def _send_json(self, status: int, data: Dict[str, Any]):
+    def _send_json(self, status: int, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
         """Send JSON response."""
-        response_json = json.dumps(data)
+        body = dumps_bytes(data)
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(response_json.encode('utf-8'))
+        self.wfile.write(body)
     
     def _send_error(self, status: int, message: str):
         """Send error response."""
@@ -314,22 +856,64 @@ class ResumeAnalysisHandler(BaseHTTPRequestHandler):
         logger.info(f"{self.address_string()} - {format % args}")
 
 
-def run_server(port: int = None):
-    """Run the HTTP server."""
+def run_server(
+    port: int = None,
+    workers: int = None,
+    queue_size: int = None,
+    retry_after: int = None,
+    single_threaded: bool = False,
+):
+    """
+    Run the HTTP server.
+    
+    By default requests are served concurrently from a bounded worker pool.
+    When all workers are busy and the accept queue is full, new requests get
+    503 with a Retry-After header instead of waiting behind slow LLM calls.
+    
+    Args:
+        port: Port to listen on (defaults to PORT env var or 8000)
+        workers: Concurrent request workers (defaults to SERVER_WORKERS or 8)
+        queue_size: Requests allowed to wait for a worker (defaults to SERVER_QUEUE_SIZE or 16)
+        retry_after: Retry-After seconds sent when saturated (defaults to SERVER_RETRY_AFTER or 5)
+        single_threaded: Use the plain one-request-at-a-time HTTPServer
+    """
+    global _active_server
+    
     # Cloud Run sets PORT environment variable, use it if available
     if port is None:
         port = int(os.getenv("PORT", "8000"))
+    if workers is None:
+        workers = int(os.getenv("SERVER_WORKERS", "8"))
+    if queue_size is None:
+        queue_size = int(os.getenv("SERVER_QUEUE_SIZE", "16"))
+    if retry_after is None:
+        retry_after = int(os.getenv("SERVER_RETRY_AFTER", "5"))
     
     server_address = ('', port)
-    httpd = HTTPServer(server_address, ResumeAnalysisHandler)
+    if single_threaded:
+        httpd = HTTPServer(server_address, ResumeAnalysisHandler)
+        logger.info("Serving requests one at a time (single-threaded mode)")
+    else:
+        httpd = BoundedThreadPoolHTTPServer(
+            server_address,
+            ResumeAnalysisHandler,
+            max_workers=workers,
+            max_queue=queue_size,
+            retry_after=retry_after,
+        )
+        logger.info(f"Serving requests with {workers} workers, queue size {queue_size}")
+    _active_server = httpd
     logger.info(f"Starting HTTP server on port {port}")
     logger.info(f"Server ready at http://0.0.0.0:{port}")
     logger.info(f"Health check: http://0.0.0.0:{port}/health")
+    logger.info(f"Metrics: http://0.0.0.0:{port}/metrics")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         logger.info("Shutting down server...")
-        httpd.shutdown()
+    finally:
+        httpd.server_close()
+        job_store.shutdown()
 
 
 if __name__ == '__main__':
@@ -338,6 +922,15 @@ if __name__ == '__main__':
     default_port = int(os.getenv("PORT", "8000"))
     parser = argparse.ArgumentParser(description='Resume Analysis API Server')
     parser.add_argument('--port', type=int, default=None, help='Port to run server on (defaults to PORT env var or 8000)')
+    parser.add_argument('--workers', type=int, default=None, help='Concurrent request workers (defaults to SERVER_WORKERS env var or 8)')
+    parser.add_argument('--queue-size', type=int, default=None, help='Requests allowed to wait for a worker before returning 503 (defaults to SERVER_QUEUE_SIZE env var or 16)')
+    parser.add_argument('--retry-after', type=int, default=None, help='Retry-After seconds sent when saturated (defaults to SERVER_RETRY_AFTER env var or 5)')
+    parser.add_argument('--single-threaded', action='store_true', help='Serve one request at a time with the plain HTTPServer')
     args = parser.parse_args()
-    run_server(args.port if args.port is not None else default_port)
-
+    run_server(
+        args.port if args.port is not None else default_port,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        retry_after=args.retry_after,
+        single_threaded=args.single_threaded,
+    )
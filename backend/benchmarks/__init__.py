@@ -0,0 +1 @@
+"""Load and micro-benchmarks for the API server, graphs and utilities"""
@@ -0,0 +1,290 @@
+"""
+Micro-benchmark for the JSON repair parser.
+
+Compares parse_json_response (single-pass repair, src/utils/text_utils.py)
+with the clean_json_response + json.loads path it replaced, on a corpus of
+malformed LLM responses modeled on the failures seen from the extractor:
+code fences, prose around the JSON, stray Unicode before closing brackets,
+trailing commas, trailing garbage and truncated output. Reports whether each
+parser recovers the expected fields and its time per call.
+
+Usage (from the backend directory):
+    python -m benchmarks.json_repair_benchmark --repeat 2000 --output repair.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from src.utils.text_utils import parse_json_response  # noqa: E402
+
+EXTRACTION = {
+    "jobKeySkills": ["Python", "Go", "Kafka", "PostgreSQL", "Kubernetes", "Distributed systems"],
+    "jobKeyResponsibilities": [
+        "Design and scale the core platform services",
+        "Own reliability and observability of production systems",
+        "Mentor engineers and lead technical projects",
+    ],
+    "role": "Senior Backend Engineer",
+    "seniority": "senior",
+    "techStack": ["Python", "Go", "Kafka", "PostgreSQL", "Kubernetes", "Terraform", "AWS"],
+}
+
+OPTIMIZATIONS = [
+    {
+        "section_name": "experience",
+        "original_content": f"Senior Software Engineer, Acme Payments ({i})\n- Led migration of the settlement pipeline to Kafka",
+        "optimized_content": f"Senior Software Engineer, Acme Payments ({i})\n- Led the Kafka migration of the settlement "
+                             "pipeline, cutting end-to-end latency by 40% across 12 services",
+        "improvements": ["Quantified impact", "Added job keywords: Kafka, distributed systems"],
+        "keywords_added": ["Kafka", "distributed systems"],
+    }
+    for i in range(6)
+]
+
+_EXTRACTION_TEXT = json.dumps(EXTRACTION, indent=2, ensure_ascii=False)
+_OPTIMIZATIONS_TEXT = json.dumps(OPTIMIZATIONS, indent=2, ensure_ascii=False)
+
+
+def _build_corpus() -> List[Dict[str, Any]]:
+    """Cases of {name, text, expected}; expected holds the fields a parser must recover."""
+    complete = {key: EXTRACTION[key] for key in ("jobKeySkills", "jobKeyResponsibilities", "role")}
+    truncated_at = _EXTRACTION_TEXT.index('"seniority"')
+    return [
+        {"name": "valid", "text": json.dumps(EXTRACTION), "expected": EXTRACTION},
+        {"name": "valid_indented", "text": _EXTRACTION_TEXT, "expected": EXTRACTION},
+        {"name": "fenced", "text": f"```json\n{_EXTRACTION_TEXT}\n```", "expected": EXTRACTION},
+        {
+            "name": "prose_and_fence",
+            "text": f"Here is the extracted information:\n\n```json\n{_EXTRACTION_TEXT}\n```\n\n"
+                    "Let me know if you need anything else.",
+            "expected": EXTRACTION,
+        },
+        {
+            "name": "stray_unicode_before_bracket",
+            "text": _EXTRACTION_TEXT.replace('"Distributed systems"\n  ]', '"Distributed systems"\n  腮]'),
+            "expected": EXTRACTION,
+        },
+        {
+            "name": "stray_unicode_after_word",
+            "text": _EXTRACTION_TEXT.replace('"AWS"\n  ]', '"AWS",\n  腮​ ]'),
+            "expected": EXTRACTION,
+        },
+        {
+            "name": "trailing_commas",
+            "text": _EXTRACTION_TEXT.replace('"\n  ]', '",\n  ]').replace(']\n}', '],\n}'),
+            "expected": EXTRACTION,
+        },
+        {"name": "trailing_garbage", "text": _EXTRACTION_TEXT + "\n}\n```\nNote: seniority inferred.", "expected": EXTRACTION},
+        {
+            "name": "missing_comma",
+            "text": _EXTRACTION_TEXT.replace('"senior",', '"senior"'),
+            "expected": EXTRACTION,
+        },
+        {
+            "name": "invalid_escape",
+            "text": _EXTRACTION_TEXT.replace("Senior Backend Engineer", "Senior Backend Engineer \\ Platform"),
+            "expected": {**EXTRACTION, "role": "Senior Backend Engineer \\ Platform"},
+        },
+        {
+            "name": "truncated_after_comma",
+            "text": _EXTRACTION_TEXT[:truncated_at],
+            "expected": complete,
+        },
+        {
+            "name": "truncated_mid_string",
+            "text": _EXTRACTION_TEXT[:truncated_at + len('"seniority": "sen')],
+            "expected": {**complete, "seniority": "sen"},
+        },
+        {"name": "array_fenced", "text": f"```json\n{_OPTIMIZATIONS_TEXT}\n```", "expected": OPTIMIZATIONS},
+        {
+            "name": "array_truncated",
+            "text": _OPTIMIZATIONS_TEXT[:_OPTIMIZATIONS_TEXT.rindex('  {\n')],
+            "expected": OPTIMIZATIONS[:-1],
+        },
+    ]
+
+
+def legacy_clean_json_response(text: str) -> str:
+    """clean_json_response as it was before the single-pass parser (baseline only)."""
+    text = re.sub(r'```json\s*', '', text)
+    text = re.sub(r'```\s*', '', text)
+    text = text.strip()
+    json_match = re.search(r'\{.*\}', text, re.DOTALL)
+    if json_match:
+        text = json_match.group(0)
+    text = re.sub(r'(")\s*[^\s"\[\]{},:\w\-_\.]+\s*([\]}])', r'\1\2', text)
+    text = re.sub(r'(["\w])\s+[^\s"\[\]{},:\w\-_\.]+\s*([\]}])', r'\1\2', text)
+    cleaned = []
+    in_string = False
+    escape_next = False
+    for i, char in enumerate(text):
+        if escape_next:
+            cleaned.append(char)
+            escape_next = False
+            continue
+        if char == '\\':
+            escape_next = True
+            cleaned.append(char)
+            continue
+        if char == '"':
+            in_string = not in_string
+            cleaned.append(char)
+            continue
+        if in_string:
+            cleaned.append(char)
+            continue
+        if (char in ['{', '}', '[', ']', ',', ':', ' ', '\n', '\t', '\r'] or
+            char.isalnum() or
+            char in ['-', '_', '.', '+', 'E', 'e', 't', 'r', 'u', 'f', 'a', 'l', 's', 'n', 'N']):
+            cleaned.append(char)
+    text = ''.join(cleaned)
+    text = re.sub(r',(\s*[}\]])', r'\1', text)
+    brace_count = 0
+    bracket_count = 0
+    last_valid_pos = -1
+    in_string = False
+    escape_next = False
+    for i, char in enumerate(text):
+        if escape_next:
+            escape_next = False
+            continue
+        if char == '\\':
+            escape_next = True
+            continue
+        if char == '"' and not escape_next:
+            in_string = not in_string
+            continue
+        if not in_string:
+            if char == '{':
+                brace_count += 1
+            elif char == '}':
+                brace_count -= 1
+                if brace_count == 0 and bracket_count == 0:
+                    last_valid_pos = i
+                    break
+            elif char == '[':
+                bracket_count += 1
+            elif char == ']':
+                bracket_count -= 1
+    if last_valid_pos > 0:
+        text = text[:last_valid_pos + 1]
+    return text.strip()
+
+
+def _legacy_ascii_only(cleaned_json: str) -> str:
+    """The extractor's second strategy: drop non-ASCII characters outside strings."""
+    more_cleaned = []
+    in_str = False
+    escape = False
+    for char in cleaned_json:
+        if escape:
+            more_cleaned.append(char)
+            escape = False
+            continue
+        if char == '\\':
+            escape = True
+            more_cleaned.append(char)
+            continue
+        if char == '"':
+            in_str = not in_str
+            more_cleaned.append(char)
+            continue
+        if in_str:
+            more_cleaned.append(char)
+        elif ord(char) < 128 and (char.isprintable() or char in '\n\t\r'):
+            more_cleaned.append(char)
+    more_cleaned_str = re.sub(r',(\s*[}\]])', r'\1', ''.join(more_cleaned))
+    last_brace = more_cleaned_str.rfind('}')
+    if last_brace > 0:
+        more_cleaned_str = more_cleaned_str[:last_brace + 1]
+    return more_cleaned_str
+
+
+def legacy_parse(text: str) -> Any:
+    """The extractor's old path: clean_json_response, then the ASCII-only fallback."""
+    cleaned_json = legacy_clean_json_response(text)
+    try:
+        return json.loads(cleaned_json)
+    except json.JSONDecodeError:
+        return json.loads(_legacy_ascii_only(cleaned_json))
+
+
+PARSERS: Dict[str, Callable[[str], Any]] = {
+    "legacy": legacy_parse,
+    "single_pass": parse_json_response,
+}
+
+
+def _recovered(result: Any, expected: Any) -> bool:
+    """Whether a parse result carries the expected fields (or list) unchanged."""
+    if isinstance(expected, dict):
+        return isinstance(result, dict) and all(result.get(key) == value for key, value in expected.items())
+    return result == expected
+
+
+def run_case(case: Dict[str, Any], parser: Callable[[str], Any], repeat: int) -> Dict[str, Any]:
+    try:
+        ok = _recovered(parser(case["text"]), case["expected"])
+    except ValueError:
+        ok = False
+    # Failures are timed too: a parser that gives up still costs the caller
+    def call():
+        try:
+            parser(case["text"])
+        except ValueError:
+            pass
+    best = min(timeit.repeat(call, number=repeat, repeat=3)) / repeat
+    return {"ok": ok, "us_per_call": best * 1e6}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmark for the LLM JSON repair parser")
+    parser.add_argument("--repeat", type=int, default=1000, help="Calls per timing run (best of 3)")
+    parser.add_argument("--cases", help="Comma-separated case names (default: all)")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    corpus = _build_corpus()
+    if args.cases:
+        names = {name.strip() for name in args.cases.split(",")}
+        corpus = [case for case in corpus if case["name"] in names]
+
+    results = []
+    for case in corpus:
+        row = {"case": case["name"], "bytes": len(case["text"].encode("utf-8"))}
+        for name, parser in PARSERS.items():
+            row[name] = run_case(case, parser, args.repeat)
+        results.append(row)
+
+    print(f"{'case':<30} {'bytes':>6} {'legacy':>16} {'single_pass':>16} {'speedup':>8}")
+    for row in results:
+        legacy, single = row["legacy"], row["single_pass"]
+        cells = [
+            f"{entry['us_per_call']:>9.1f}us {'ok' if entry['ok'] else 'FAIL':>4}" for entry in (legacy, single)
+        ]
+        speedup = legacy["us_per_call"] / single["us_per_call"] if single["us_per_call"] else 0.0
+        print(f"{row['case']:<30} {row['bytes']:>6} {cells[0]:>16} {cells[1]:>16} {speedup:>7.1f}x")
+    for name in PARSERS:
+        recovered = sum(1 for row in results if row[name]["ok"])
+        print(f"{name}: recovered {recovered}/{len(results)} cases")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,453 @@
+"""
+End-to-end load benchmark for the API server and both LangGraph graphs.
+
+Drives the analysis and optimization graphs directly (graph invoke) and
+through the HTTP API (POST / and POST /optimize) at one or more concurrency
+levels, against the offline fake LLM backend by default. Reports
+throughput, p50/p95/p99 latency, per-node time (graph targets), CPU time
+and peak RSS, writes the results as JSON and can compare them against a
+saved baseline.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_benchmark --concurrency 1,8,32 --requests 64 \\
+        --output results.json
+    python -m benchmarks.load_benchmark --compare baseline.json --output after.json
+
+Exits with status 1 in compare mode if any metric regressed by more than
+--threshold.
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+TARGETS = ["graph-analysis", "graph-optimization", "http-analysis", "http-optimize"]
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com | +1 555 0100 | Berlin, Germany
+
+SUMMARY
+Backend engineer with 6 years of experience building distributed systems in Python and Go.
+
+SKILLS
+Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform, AWS, gRPC, Redis
+
+EXPERIENCE
+Senior Software Engineer, Acme Payments (2021 - Present)
+- Led migration of the settlement pipeline to Kafka, cutting end-to-end latency by 40%
+- Built an internal rate-limiting service handling 50k requests per second
+Software Engineer, Globex (2018 - 2021)
+- Developed REST and gRPC APIs for the merchant onboarding platform
+- Introduced contract testing across 12 services
+
+EDUCATION
+B.Sc. Computer Science, TU Munich (2014 - 2018)
+
+PROJECTS
+ledgerlite - open-source double-entry accounting library in Python (1.2k GitHub stars)
+"""
+
+SAMPLE_JD = """Senior Backend Engineer - Platform
+
+We are looking for a senior backend engineer to design and scale our core platform.
+Requirements:
+- 5+ years building production services in Python or Go
+- Experience with event streaming (Kafka), PostgreSQL and Kubernetes
+- Strong understanding of distributed systems, observability and reliability
+- Experience mentoring engineers and leading technical projects
+Nice to have: Terraform, AWS, payments domain experience.
+"""
+
+
+def _configure_environment(args: argparse.Namespace) -> None:
+    """Set backend settings before any src module reads them at import."""
+    os.environ["LLM_BACKEND"] = args.backend
+    os.environ["LLM_FAKE_LATENCY"] = args.latency
+    os.environ["LLM_FAKE_429_RATE"] = str(args.rate_429)
+    os.environ["LLM_FAKE_503_RATE"] = str(args.rate_503)
+    os.environ["LLM_FAKE_MALFORMED_RATE"] = str(args.malformed_rate)
+    os.environ["LLM_FAKE_SEED"] = str(args.seed)
+    # Cached responses would measure the cache, not the pipeline
+    os.environ["LLM_CACHE_ENABLED"] = "true" if args.cache else "false"
+    os.environ["LLM_RATE_LIMIT_RPM"] = str(args.rpm)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    return {
+        "p50": _percentile(values, 50) * 1000,
+        "p95": _percentile(values, 95) * 1000,
+        "p99": _percentile(values, 99) * 1000,
+        "mean": (statistics.fmean(values) if values else 0.0) * 1000,
+        "max": (max(values) if values else 0.0) * 1000,
+    }
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _request_inputs(index: int) -> Tuple[str, str]:
+    """Vary every request slightly so no layer can serve it from a cache."""
+    return f"{SAMPLE_RESUME}\nReference: benchmark-{index}\n", SAMPLE_JD
+
+
+class BenchmarkRunner:
+    """Runs benchmark targets and collects per-request measurements."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self._graphs: Dict[str, Any] = {}
+        self._server = None
+        self._server_thread: Optional[threading.Thread] = None
+        self._structured_resume: Optional[Dict[str, Any]] = None
+        self._setup_lock = threading.Lock()
+
+    # Graph targets
+
+    def _graph(self, name: str):
+        with self._setup_lock:
+            return self._build_graph(name)
+
+    def _build_graph(self, name: str):
+        if name not in self._graphs:
+            from src.graph.orchestrator import build_langgraph_app
+            from src.graph.optimization_orchestrator import build_optimization_app
+
+            builders = {"analysis": build_langgraph_app, "optimization": build_optimization_app}
+            self._graphs[name] = builders[name]()
+        return self._graphs[name]
+
+    def _optimization_state(self, index: int) -> Dict[str, Any]:
+        resume_text, job_description = _request_inputs(index)
+        with self._setup_lock:
+            if self._structured_resume is None:
+                # Extract once; the optimization graph is measured on its own
+                from src.agents.resume_extractor import extract_resume_node
+
+                self._structured_resume = extract_resume_node(
+                    {"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD}
+                )["resume_structured"]
+        return {
+            "resume_text": resume_text,
+            "job_description": job_description,
+            "resume_structured": self._structured_resume,
+        }
+
+    def _run_graph(self, name: str, index: int) -> Dict[str, float]:
+        """Invoke a graph once; return per-node durations in seconds."""
+        from src.utils.retry_utils import retry_budget
+        from src.config import LLM_RETRY_BUDGET
+
+        if name == "analysis":
+            resume_text, job_description = _request_inputs(index)
+            state = {"resume_text": resume_text, "job_description": job_description}
+        else:
+            state = self._optimization_state(index)
+
+        started: Dict[str, Tuple[str, float]] = {}
+        node_times: Dict[str, float] = {}
+        with retry_budget(LLM_RETRY_BUDGET):
+            for event in self._graph(name).stream(state, stream_mode="debug"):
+                payload = event.get("payload", {})
+                now = time.perf_counter()
+                if event.get("type") == "task":
+                    started[payload["id"]] = (payload["name"], now)
+                elif event.get("type") == "task_result" and payload.get("id") in started:
+                    node, start = started.pop(payload["id"])
+                    node_times[node] = node_times.get(node, 0.0) + (now - start)
+                    if payload.get("error"):
+                        raise RuntimeError(f"Node {node} failed: {payload['error']}")
+        return node_times
+
+    # HTTP targets
+
+    def _server_address(self) -> Tuple[str, int]:
+        if self.args.url:
+            host, _, port = self.args.url.replace("http://", "").rstrip("/").partition(":")
+            return host, int(port or 80)
+        with self._setup_lock:
+            return self._start_server()
+
+    def _start_server(self) -> Tuple[str, int]:
+        """Start the API server in-process on an ephemeral port (once)."""
+        if self._server is None:
+            import api_server
+            from src.server.bounded_server import BoundedThreadPoolHTTPServer
+            from src.utils.logging_utils import setup_logging
+
+            setup_logging(self.args.log_level)
+            self._server = BoundedThreadPoolHTTPServer(
+                ("127.0.0.1", 0),
+                api_server.ResumeAnalysisHandler,
+                max_workers=self.args.server_workers,
+                max_queue=self.args.server_queue,
+            )
+            self._server_thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._server_thread.start()
+        return self._server.server_address[:2]
+
+    def _run_http(self, path: str, index: int) -> Dict[str, float]:
+        """POST one request; raise on a non-200 response."""
+        resume_text, job_description = _request_inputs(index)
+        body = json.dumps({"resume_text": resume_text, "job_description": job_description})
+        host, port = self._server_address()
+        connection = http.client.HTTPConnection(host, port, timeout=self.args.timeout)
+        try:
+            connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = response.read()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: {payload[:200]!r}")
+        finally:
+            connection.close()
+        return {}
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    # Measurement
+
+    def _call(self, target: str, index: int) -> Dict[str, float]:
+        if target == "graph-analysis":
+            return self._run_graph("analysis", index)
+        if target == "graph-optimization":
+            return self._run_graph("optimization", index)
+        if target == "http-analysis":
+            return self._run_http("/", index)
+        if target == "http-optimize":
+            return self._run_http("/optimize", index)
+        raise ValueError(f"Unknown target: {target}")
+
+    def run(self, target: str, concurrency: int) -> Dict[str, Any]:
+        """Run one (target, concurrency) cell and return its summary."""
+        for index in range(self.args.warmup):
+            try:
+                self._call(target, -1 - index)
+            except Exception:
+                pass
+
+        latencies: List[float] = []
+        node_samples: Dict[str, List[float]] = {}
+        errors: Dict[str, int] = {}
+        lock = threading.Lock()
+
+        def one(index: int) -> None:
+            start = time.perf_counter()
+            try:
+                node_times = self._call(target, index)
+            except Exception as e:
+                with lock:
+                    key = type(e).__name__
+                    errors[key] = errors.get(key, 0) + 1
+                return
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                for node, seconds in node_times.items():
+                    node_samples.setdefault(node, []).append(seconds)
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(self.args.requests)))
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        completed = len(latencies)
+        return {
+            "target": target,
+            "concurrency": concurrency,
+            "requests": self.args.requests,
+            "completed": completed,
+            "errors": errors,
+            "wall_seconds": wall,
+            "throughput_rps": completed / wall if wall > 0 else 0.0,
+            "latency_ms": _summarize(latencies),
+            "node_ms": {node: _summarize(samples) for node, samples in sorted(node_samples.items())},
+            "cpu_seconds": cpu,
+            "cpu_ms_per_request": cpu / completed * 1000 if completed else 0.0,
+            "peak_rss_mb": _peak_rss_mb(),
+        }
+
+
+# Metrics compared against a baseline: (path, higher_is_better)
+COMPARED_METRICS = [
+    (("throughput_rps",), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p95"), False),
+    (("latency_ms", "p99"), False),
+    (("cpu_ms_per_request",), False),
+    (("peak_rss_mb",), False),
+]
+
+
+def _metric(result: Dict[str, Any], path: Tuple[str, ...]) -> float:
+    value: Any = result
+    for key in path:
+        value = value.get(key, 0.0)
+    return float(value)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Print a comparison table and return descriptions of regressions.
+
+    Cells are matched by (target, concurrency); cells missing from either
+    side are skipped.
+    """
+    base_cells = {(r["target"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"\n{'target':<20}{'conc':>5}  {'metric':<20}{'baseline':>12}{'current':>12}{'change':>9}")
+    for result in current.get("results", []):
+        key = (result["target"], result["concurrency"])
+        base = base_cells.get(key)
+        if base is None:
+            continue
+        for path, higher_is_better in COMPARED_METRICS:
+            before, after = _metric(base, path), _metric(result, path)
+            change = (after - before) / before if before else 0.0
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > threshold else ""
+            name = ".".join(path)
+            print(f"{key[0]:<20}{key[1]:>5}  {name:<20}{before:>12.2f}{after:>12.2f}{change:>+8.1%}{flag}")
+            if worse > threshold:
+                regressions.append(f"{key[0]} c={key[1]} {name}: {before:.2f} -> {after:.2f} ({change:+.1%})")
+    return regressions
+
+
+def _print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"\n{'target':<20}{'conc':>5}{'ok':>6}{'err':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'cpu ms/req':>12}{'rss MB':>9}")
+    for r in results:
+        print(
+            f"{r['target']:<20}{r['concurrency']:>5}{r['completed']:>6}{sum(r['errors'].values()):>5}"
+            f"{r['throughput_rps']:>9.2f}{r['latency_ms']['p50']:>10.0f}{r['latency_ms']['p95']:>10.0f}"
+            f"{r['latency_ms']['p99']:>10.0f}{r['cpu_ms_per_request']:>12.1f}{r['peak_rss_mb']:>9.1f}"
+        )
+        for node, summary in r["node_ms"].items():
+            print(f"    {node:<28} p50 {summary['p50']:>8.0f} ms   p95 {summary['p95']:>8.0f} ms")
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load benchmark for the resume matching backend")
+    parser.add_argument("--targets", default=",".join(TARGETS),
+                        help=f"Comma-separated targets ({', '.join(TARGETS)})")
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per (target, concurrency) cell")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured requests before each cell")
+    parser.add_argument("--backend", default="fake", help="LLM_BACKEND to use (default: fake)")
+    parser.add_argument("--latency", default="lognormal:0.2,0.3", help="Fake LLM latency spec")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fake 429 probability per call")
+    parser.add_argument("--rate-503", type=float, default=0.0, help="Fake 503 probability per call")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fake malformed JSON probability")
+    parser.add_argument("--seed", type=int, default=0, help="Fake backend seed")
+    parser.add_argument("--rpm", type=float, default=0, help="LLM_RATE_LIMIT_RPM (0 disables)")
+    parser.add_argument("--cache", action="store_true", help="Leave the LLM response cache enabled")
+    parser.add_argument("--url", help="Benchmark an already running server (host:port) instead of in-process")
+    parser.add_argument("--server-workers", type=int, default=8, help="In-process server worker threads")
+    parser.add_argument("--server-queue", type=int, default=64, help="In-process server queue size")
+    parser.add_argument("--timeout", type=float, default=300, help="HTTP request timeout in seconds")
+    parser.add_argument("--log-level", default="WARNING", help="Log level while benchmarking")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative regression that fails compare mode (default: 0.10)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        print(f"Unknown targets: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    _configure_environment(args)
+    from src.utils.logging_utils import setup_logging
+
+    setup_logging(args.log_level)
+
+    runner = BenchmarkRunner(args)
+    results = []
+    try:
+        for target in targets:
+            for concurrency in levels:
+                print(f"Running {target} at concurrency {concurrency}...", flush=True)
+                results.append(runner.run(target, concurrency))
+    finally:
+        runner.shutdown()
+
+    _print_results(results)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions beyond threshold.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Micro-benchmark for the JSON request, node and response paths.
+
+Times each step of a request's JSON round-trip with the code it replaced
+and with the current helpers (src/utils/serialization_utils.py and
+src/utils/resume_utils.py):
+
+- request: decoding the POST body (bytes -> str -> json.loads vs loads(bytes))
+- node: turning an LLM response into validated models (json.loads +
+  Model(**data) vs model_validate_json through a cached TypeAdapter), and
+  giving the ten section nodes of an analyze + optimize request their
+  prompt JSON (each validating the resume and dumping its section vs one
+  prepare_resume whose sections they share)
+- response: encoding the result (json.dumps().encode() vs dumps_bytes)
+
+Both JSON backends are timed when orjson is installed; the "current" column
+is whatever JSON_BACKEND selects.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization_benchmark --repeat 2000 --output serialization.json
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from src.models.schemas import ResumeStructured, SectionScore, SectionOptimization  # noqa: E402
+from src.utils.resume_utils import RESUME_SECTIONS, prepare_resume  # noqa: E402
+from src.utils.serialization_utils import dumps_bytes, json_backend, loads, try_validate_json  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from benchmarks.json_repair_benchmark import OPTIMIZATIONS  # noqa: E402
+from benchmarks.load_benchmark import SAMPLE_JD, SAMPLE_RESUME  # noqa: E402
+
+RESUME = {
+    "contact_info": {"name": "Jane Doe", "email": "jane.doe@example.com", "location": "Berlin, Germany"},
+    "skills": [{"name": name, "level": "expert"} for name in ("Python", "Go", "PostgreSQL", "Kafka", "Kubernetes")],
+    "experience": [
+        {
+            "job_title": "Senior Software Engineer",
+            "company": f"Acme Payments {i}",
+            "start_date": "2021",
+            "end_date": "Present",
+            "responsibilities": [
+                "Led migration of the settlement pipeline to Kafka, cutting end-to-end latency by 40%",
+                "Built an internal rate-limiting service handling 50k requests per second",
+            ],
+        }
+        for i in range(4)
+    ],
+    "education": [{"degree": "B.Sc.", "field_of_study": "Computer Science", "institution": "TU Munich"}],
+    "projects": [{"name": "ratelimit", "description": "Token bucket rate limiter", "technologies": ["Go", "Redis"]}],
+    "meta": {"seniority_level": "senior", "domains": ["fintech"], "languages": ["English", "German"]},
+}
+
+SCORE = {
+    "section_name": "experience",
+    "score": 82.5,
+    "reasons": ["6 years of backend experience", "Led a Kafka migration at scale"],
+    "missing_requirements": ["No Terraform in production"],
+}
+
+
+def _legacy_score(text: str) -> SectionScore:
+    return SectionScore(**json.loads(text))
+
+
+def _legacy_optimizations(text: str) -> List[SectionOptimization]:
+    return [SectionOptimization(**item) for item in json.loads(text)]
+
+
+# Section read by each scoring and optimization node (the summary optimizer reads the resume text)
+NODE_SECTIONS = RESUME_SECTIONS + ("experience", "skills", "projects", "education")
+
+
+def _legacy_node_sections(resume_structured: Dict[str, Any]) -> List[str]:
+    prompts = []
+    for section in NODE_SECTIONS:
+        resume = ResumeStructured(**resume_structured)
+        data = resume.meta.model_dump() if section == "meta" else [item.model_dump() for item in getattr(resume, section)]
+        prompts.append(json.dumps(data, indent=2))
+    return prompts
+
+
+def _shared_node_sections(resume_structured: Dict[str, Any]) -> List[str]:
+    sections = prepare_resume(resume_structured)["resume_sections"]
+    return [sections[section] for section in NODE_SECTIONS]
+
+
+def _cases() -> List[Dict[str, Any]]:
+    """Cases of {name, stage, legacy, current[, orjson]} callables."""
+    request_body = json.dumps({"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD}).encode("utf-8")
+    score_text = json.dumps(SCORE)
+    optimizations_text = json.dumps(OPTIMIZATIONS, indent=2)
+    resume_text = json.dumps(RESUME)
+    response = {
+        "resume_structured": ResumeStructured(**RESUME).model_dump(),
+        "section_scores": [SCORE] * 5,
+        "optimizations": OPTIMIZATIONS,
+        "overall_score": 78.4,
+    }
+    cases = [
+        {
+            "name": "request_body",
+            "stage": "request",
+            "legacy": lambda: json.loads(request_body.decode("utf-8")),
+            "current": lambda: loads(request_body),
+            "orjson": orjson and (lambda: orjson.loads(request_body)),
+        },
+        {
+            "name": "section_score",
+            "stage": "node",
+            "legacy": lambda: _legacy_score(score_text),
+            "current": lambda: try_validate_json(SectionScore, score_text),
+        },
+        {
+            "name": "optimization_list",
+            "stage": "node",
+            "legacy": lambda: _legacy_optimizations(optimizations_text),
+            "current": lambda: try_validate_json(List[SectionOptimization], optimizations_text),
+        },
+        {
+            "name": "resume_structured",
+            "stage": "node",
+            "legacy": lambda: ResumeStructured(**json.loads(resume_text)),
+            "current": lambda: try_validate_json(ResumeStructured, resume_text),
+        },
+        {
+            "name": "node_sections",
+            "stage": "node",
+            "legacy": lambda: _legacy_node_sections(RESUME),
+            "current": lambda: _shared_node_sections(RESUME),
+        },
+        {
+            "name": "response_body",
+            "stage": "response",
+            "legacy": lambda: json.dumps(response).encode("utf-8"),
+            "current": lambda: dumps_bytes(response),
+            "orjson": orjson and (lambda: orjson.dumps(response)),
+        },
+    ]
+    return cases
+
+
+def _time(func: Callable[[], Any], repeat: int) -> float:
+    """Best-of-3 microseconds per call."""
+    return min(timeit.repeat(func, number=repeat, repeat=3)) / repeat * 1e6
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmark for JSON parsing, validation and encoding")
+    parser.add_argument("--repeat", type=int, default=1000, help="Calls per timing run (best of 3)")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = []
+    for case in _cases():
+        row = {"case": case["name"], "stage": case["stage"]}
+        for column in ("legacy", "current", "orjson"):
+            if case.get(column):
+                row[column] = _time(case[column], args.repeat)
+        results.append(row)
+
+    print(f"JSON backend: {json_backend()}")
+    print(f"{'stage':<9} {'case':<20} {'legacy':>10} {'current':>10} {'orjson':>10} {'speedup':>8}")
+    for row in results:
+        orjson_cell = f"{row['orjson']:>8.1f}us" if "orjson" in row else f"{'-':>10}"
+        speedup = row["legacy"] / row["current"] if row["current"] else 0.0
+        print(
+            f"{row['stage']:<9} {row['case']:<20} {row['legacy']:>8.1f}us {row['current']:>8.1f}us "
+            f"{orjson_cell} {speedup:>7.1f}x"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "backend": json_backend(), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,6 +29,10 @@ setup(
         "python-dotenv>=1.0.0",
         "typing-extensions>=4.8.0",
     ],
+    extras_require={
+        # Faster JSON for API request and response bodies (JSON_BACKEND=auto picks it up)
+        "fast-json": ["orjson>=3.9"],
+    },
     package_dir={"": "."},  # Root directory contains src/
     include_package_data=True,
 )
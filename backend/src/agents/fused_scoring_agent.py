@@ -0,0 +1,173 @@
+"""
+Fused Scoring Agent.
+
+Scores every resume section against the job description in a single LLM
+call, sending the JD once instead of once per section agent. Each returned
+SectionScore is validated on its own; sections that are missing or invalid
+are left to the per-section scoring agents.
+"""
+
+from typing import Dict, Any, List
+import json
+from src.config import get_llm
+from src.models.schemas import SectionScore
+from src.utils.llm_utils import call_llm
+from src.utils.json_stream_utils import model_items, partial_item_writer
+from src.utils.logging_utils import get_logger
+from src.utils.resume_utils import resume_sections
+from src.utils.text_utils import format_job_requirements, truncate_for_prompt
+from src.utils.schema_utils import (
+    json_generation_config,
+    schema_prompt_block,
+    SECTION_SCORE_LIST_SCHEMA,
+)
+
+logger = get_logger(__name__)
+
+# Scored sections, in prompt order, with the dimension each one covers
+FUSED_SECTIONS = {
+    "skills": "technical and soft skills, and their levels, against the required skills",
+    "experience": "work history, responsibilities, achievements and years of experience",
+    "education": "degrees, fields of study and certifications (relevant experience can compensate for education gaps)",
+    "projects": "personal or professional projects, technologies used and impact",
+    "meta": "seniority level, domain experience and languages",
+}
+
+
+def fused_scoring_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LangGraph node function to score all remaining sections in one call.
+
+    Sections whose ``<section>_score`` is already in the state (e.g. on a
+    partial retry) or that are gated (``section_gates``) are not scored.
+
+    Expects in state:
+        - resume_structured: dict - Structured resume data
+        - job_description: str - Job description text
+        - jd_analysis: dict - Optional shared JD analysis (requirements for the prompt)
+
+    Returns updated state with:
+        - fused_scores: dict - SectionScore dicts by section name, only for
+          sections that were returned and passed validation
+
+    Args:
+        state: LangGraph state dictionary
+
+    Returns:
+        Updated state with fused_scores key
+    """
+    resume_structured = state.get("resume_structured")
+    job_description = state.get("job_description")
+
+    if not resume_structured or not job_description:
+        raise ValueError("resume_structured and job_description are required in state")
+
+    gated = state.get("section_gates") or {}
+    sections = [
+        section for section in FUSED_SECTIONS
+        if state.get(f"{section}_score") is None and section not in gated
+    ]
+    if not sections:
+        return {"fused_scores": {}}
+
+    logger.info(f"Starting fused scoring of {', '.join(sections)}")
+
+    # Section JSON, validated and serialized once per request
+    candidate_json = resume_sections(state)
+    candidate_sections = "\n\n".join(
+        f"CANDIDATE {section.upper()}:\n{candidate_json[section]}"
+        for section in sections
+    )
+    dimensions = "\n".join(f"- {section}: {FUSED_SECTIONS[section]}" for section in sections)
+
+    # Get the LLM; one score object per section needs more room than a single agent
+    model = get_llm(temperature=0.1, max_output_tokens=8192)
+
+    # Truncate JD if needed
+    jd_truncated = truncate_for_prompt(job_description, max_chars=8000)
+    job_requirements = format_job_requirements(state.get("jd_analysis"))
+
+    # Build system prompt
+    system_prompt = f"""You are an expert technical recruiter. You score each section of the candidate's resume against the job description, each on its own dimension:
+{dimensions}
+
+Scoring Rules (0-100), applied to each section independently:
+- 90-100: Strong match on most key requirements for that section.
+- 60-89: Partial match. Some requirements met, important ones missing or insufficient.
+- 30-59: Weak match. Few requirements met or significant gaps in critical areas.
+- 0-29: Almost no alignment.
+
+Return a JSON array with exactly one object per section, each strictly matching the provided schema with:
+- section_name: the section's name
+- score: numeric score 0-100
+- reasons: list of specific reasons for the score (what matches, what's good)
+- missing_requirements: list of that section's requirements missing from the job description"""
+
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
+
+Return a JSON array where each object has this structure:
+{
+  "section_name": "<section>",
+  "score": 0-100,
+  "reasons": ["reason1", "reason2"],
+  "missing_requirements": ["requirement1", "requirement2"]
+}""")
+
+    # Build user prompt
+    user_prompt = f"""Score each of the candidate's resume sections against this job description.
+
+Sections to score: {', '.join(sections)}
+
+JOB DESCRIPTION:
+{jd_truncated}{job_requirements}
+
+{candidate_sections}
+
+Analyze how well each section matches the job requirements and provide a detailed score with reasons for every section listed.{output_format}
+
+Return ONLY the JSON array, nothing else."""
+
+    # Combine prompts
+    full_prompt = f"{system_prompt}\n\n{user_prompt}"
+
+    # Call Vertex AI with JSON output
+    response_text = call_llm(
+        model,
+        full_prompt,
+        generation_config=json_generation_config(SECTION_SCORE_LIST_SCHEMA),
+        agent_name="fused_scoring",
+        on_item=partial_item_writer(state, None, model_items(SectionScore)),
+    )
+    logger.debug(f"Raw fused scoring response: {response_text[:200]}...")
+
+    try:
+        score_list = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON response: {e}")
+        raise ValueError(f"Failed to parse fused scoring response as JSON: {e}")
+    if isinstance(score_list, dict):
+        # Tolerate {"sections": [...]} or a single object
+        score_list = score_list.get("sections", [score_list])
+    if not isinstance(score_list, list):
+        raise ValueError(f"Fused scoring response is not a list: {type(score_list).__name__}")
+
+    # Validate each section on its own so one bad entry doesn't discard the rest
+    fused_scores: Dict[str, dict] = {}
+    for score_data in score_list:
+        if not isinstance(score_data, dict):
+            continue
+        section = score_data.get("section_name")
+        if section not in sections or section in fused_scores:
+            continue
+        try:
+            fused_scores[section] = SectionScore(**score_data).model_dump()
+        except Exception as e:
+            logger.warning(f"Fused {section} score failed validation: {e}")
+
+    missing: List[str] = [section for section in sections if section not in fused_scores]
+    if missing:
+        logger.warning(f"Fused scoring missing or invalid for {', '.join(missing)}, falling back to section agents")
+    logger.info(f"Fused scoring successful for {len(fused_scores)}/{len(sections)} sections")
+
+    return {"fused_scores": fused_scores}
@@ -7,10 +7,18 @@ Scores how well the candidate's metadata (seniority, domains, languages) matches
 from typing import Dict, Any
 import json
 from src.config import get_llm
-from src.models.schemas import SectionScore, ResumeStructured
+from src.models.schemas import SectionScore
+from src.utils.llm_utils import call_llm
+from src.utils.json_stream_utils import model_fields, partial_item_writer
 from src.utils.logging_utils import get_logger
-from src.utils.text_utils import truncate_for_prompt
-from src.utils.schema_utils import clean_schema_for_vertex_ai
+from src.utils.resume_utils import resume_sections
+from src.utils.serialization_utils import try_validate_json
+from src.utils.text_utils import format_job_requirements, truncate_for_prompt
+from src.utils.schema_utils import (
+    json_generation_config,
+    schema_prompt_block,
+    SECTION_SCORE_SCHEMA,
+)
 
 logger = get_logger(__name__)
 
@@ -22,6 +30,7 @@ def meta_scoring_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Expects in state:
         - resume_structured: dict - Structured resume data
         - job_description: str - Job description text
+        - jd_analysis: dict - Optional shared JD analysis (requirements for the prompt)
     
     Returns updated state with:
         - meta_score: dict - SectionScore for meta information
@@ -40,21 +49,15 @@ def meta_scoring_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     logger.info("Starting meta information section scoring")
     
-    # Parse resume structured data
-    try:
-        resume = ResumeStructured(**resume_structured)
-    except Exception as e:
-        logger.error(f"Failed to parse resume_structured: {e}")
-        raise ValueError(f"Invalid resume_structured data: {e}")
-    
-    # Extract meta data
-    meta_data = resume.meta.model_dump()
+    # Section JSON for the prompt, validated and serialized once per request
+    meta_json = resume_sections(state)["meta"]
     
     # Get the LLM
     model = get_llm(temperature=0.1, max_output_tokens=2048)
     
     # Truncate JD if needed
     jd_truncated = truncate_for_prompt(job_description, max_chars=8000)
+    job_requirements = format_job_requirements(state.get("jd_analysis"))
     
     # Build system prompt
     system_prompt = """You are an expert technical recruiter. You score the candidate's META INFORMATION (seniority level, domains, languages) against the job description for a specific dimension.
@@ -71,24 +74,27 @@ Return a JSON object strictly matching the provided schema with:
 - reasons: list of specific reasons for the score (what matches, what's good)
 - missing_requirements: list of meta requirements missing (e.g., specific seniority level, domain experience, language requirements)"""
 
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
+
+Return a JSON object with this exact structure:
+{
+  "section_name": "meta",
+  "score": 0-100,
+  "reasons": ["reason1", "reason2"],
+  "missing_requirements": ["requirement1", "requirement2"]
+}""")
+    
     # Build user prompt
     user_prompt = f"""Score the candidate's meta information against this job description:
 
 JOB DESCRIPTION:
-{jd_truncated}
+{jd_truncated}{job_requirements}
 
 CANDIDATE META INFORMATION:
-{json.dumps(meta_data, indent=2)}
-
-Analyze how well the candidate's seniority level, domain experience, and languages match the job requirements and provide a detailed score with reasons.
+{meta_json}
 
-Return a JSON object with this exact structure:
-{{
-  "section_name": "meta",
-  "score": 0-100,
-  "reasons": ["reason1", "reason2"],
-  "missing_requirements": ["requirement1", "requirement2"]
-}}
+Analyze how well the candidate's seniority level, domain experience, and languages match the job requirements and provide a detailed score with reasons.{output_format}
 
 Return ONLY the JSON object, nothing else."""
 
@@ -97,30 +103,29 @@ Return ONLY the JSON object, nothing else."""
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
         # Call Vertex AI with JSON output
-        response = model.generate_content(
+        response_text = call_llm(
+            model,
             full_prompt,
-            generation_config={
-                "response_mime_type": "application/json",
-            }
+            generation_config=json_generation_config(SECTION_SCORE_SCHEMA),
+            agent_name="meta_scoring",
+            on_item=partial_item_writer(state, "meta", model_fields(SectionScore)),
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw meta scoring response: {response_text[:200]}...")
         
-        # Parse JSON
-        score_data = json.loads(response_text)
+        # Parse and validate straight from the response text; the slow path reports what's wrong
+        validated_score = try_validate_json(SectionScore, response_text)
+        if validated_score is None:
+            score_data = json.loads(response_text)
+            try:
+                validated_score = SectionScore(**score_data)
+            except Exception as e:
+                logger.error(f"Validation failed: {e}")
+                logger.error(f"Invalid data: {json.dumps(score_data, indent=2)}")
+                raise ValueError(f"Meta score data failed validation: {e}")
         
-        # Validate by instantiating Pydantic model
-        try:
-            validated_score = SectionScore(**score_data)
-            # Ensure section_name is correct
-            validated_score.section_name = "meta"
-            logger.info(f"Meta scoring successful: {validated_score.score}/100")
-        except Exception as e:
-            logger.error(f"Validation failed: {e}")
-            logger.error(f"Invalid data: {json.dumps(score_data, indent=2)}")
-            raise ValueError(f"Meta score data failed validation: {e}")
+        # Ensure section_name is correct
+        validated_score.section_name = "meta"
+        logger.info(f"Meta scoring successful: {validated_score.score}/100")
         
         # Return as dict for state
         return {
@@ -9,6 +9,7 @@ should receive more focus based on the job description.
 from typing import Dict, Any
 import json
 from src.config import get_llm
+from src.utils.llm_utils import call_llm
 from src.utils.logging_utils import get_logger
 from src.utils.text_utils import truncate_for_prompt
 
@@ -107,15 +108,14 @@ Determine which sections should receive the most emphasis and assign weights acc
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
         # Call Vertex AI with JSON output
-        response = model.generate_content(
+        response_text = call_llm(
+            model,
             full_prompt,
             generation_config={
                 "response_mime_type": "application/json",
-            }
+            },
+            agent_name="orchestrator_optimization",
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw orchestrator response: {response_text[:200]}...")
         
         # Parse JSON
@@ -4,13 +4,22 @@ Projects Scoring Agent.
 Scores how well the candidate's projects match the job description requirements.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 import json
 from src.config import get_llm
-from src.models.schemas import SectionScore, ResumeStructured, SectionOptimization
+from src.models.schemas import SectionScore, SectionOptimization
+from src.utils.llm_utils import call_llm
+from src.utils.json_stream_utils import model_fields, model_items, partial_item_writer
 from src.utils.logging_utils import get_logger
-from src.utils.text_utils import truncate_for_prompt
-from src.utils.schema_utils import clean_schema_for_vertex_ai
+from src.utils.resume_utils import resume_sections
+from src.utils.serialization_utils import try_validate_json
+from src.utils.text_utils import format_job_requirements, truncate_for_prompt
+from src.utils.schema_utils import (
+    json_generation_config,
+    schema_prompt_block,
+    SECTION_OPTIMIZATION_LIST_SCHEMA,
+    SECTION_SCORE_SCHEMA,
+)
 
 logger = get_logger(__name__)
 
@@ -22,6 +31,7 @@ def projects_scoring_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Expects in state:
         - resume_structured: dict - Structured resume data
         - job_description: str - Job description text
+        - jd_analysis: dict - Optional shared JD analysis (requirements for the prompt)
     
     Returns updated state with:
         - projects_score: dict - SectionScore for projects
@@ -40,21 +50,15 @@ def projects_scoring_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     logger.info("Starting projects section scoring")
     
-    # Parse resume structured data
-    try:
-        resume = ResumeStructured(**resume_structured)
-    except Exception as e:
-        logger.error(f"Failed to parse resume_structured: {e}")
-        raise ValueError(f"Invalid resume_structured data: {e}")
-    
-    # Extract projects data
-    projects_data = [proj.model_dump() for proj in resume.projects]
+    # Section JSON for the prompt, validated and serialized once per request
+    projects_json = resume_sections(state)["projects"]
     
     # Get the LLM
     model = get_llm(temperature=0.1, max_output_tokens=2048)
     
     # Truncate JD if needed
     jd_truncated = truncate_for_prompt(job_description, max_chars=8000)
+    job_requirements = format_job_requirements(state.get("jd_analysis"))
     
     # Build system prompt
     system_prompt = """You are an expert technical recruiter. You score the candidate's PROJECTS section against the job description for a specific dimension.
@@ -71,24 +75,27 @@ Return a JSON object strictly matching the provided schema with:
 - reasons: list of specific reasons for the score (what matches, what's good)
 - missing_requirements: list of project requirements missing (e.g., specific technologies, types of projects, demonstrated impact)"""
 
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
+
+Return a JSON object with this exact structure:
+{
+  "section_name": "projects",
+  "score": 0-100,
+  "reasons": ["reason1", "reason2"],
+  "missing_requirements": ["requirement1", "requirement2"]
+}""")
+    
     # Build user prompt
     user_prompt = f"""Score the candidate's projects against this job description:
 
 JOB DESCRIPTION:
-{jd_truncated}
+{jd_truncated}{job_requirements}
 
 CANDIDATE PROJECTS:
-{json.dumps(projects_data, indent=2)}
+{projects_json}
 
-Analyze how well the candidate's projects match the job requirements and provide a detailed score with reasons.
-
-Return a JSON object with this exact structure:
-{{
-  "section_name": "projects",
-  "score": 0-100,
-  "reasons": ["reason1", "reason2"],
-  "missing_requirements": ["requirement1", "requirement2"]
-}}
+Analyze how well the candidate's projects match the job requirements and provide a detailed score with reasons.{output_format}
 
 Return ONLY the JSON object, nothing else."""
 
@@ -97,30 +104,29 @@ Return ONLY the JSON object, nothing else."""
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
         # Call Vertex AI with JSON output
-        response = model.generate_content(
+        response_text = call_llm(
+            model,
             full_prompt,
-            generation_config={
-                "response_mime_type": "application/json",
-            }
+            generation_config=json_generation_config(SECTION_SCORE_SCHEMA),
+            agent_name="projects_scoring",
+            on_item=partial_item_writer(state, "projects", model_fields(SectionScore)),
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw projects scoring response: {response_text[:200]}...")
         
-        # Parse JSON
-        score_data = json.loads(response_text)
+        # Parse and validate straight from the response text; the slow path reports what's wrong
+        validated_score = try_validate_json(SectionScore, response_text)
+        if validated_score is None:
+            score_data = json.loads(response_text)
+            try:
+                validated_score = SectionScore(**score_data)
+            except Exception as e:
+                logger.error(f"Validation failed: {e}")
+                logger.error(f"Invalid data: {json.dumps(score_data, indent=2)}")
+                raise ValueError(f"Projects score data failed validation: {e}")
         
-        # Validate by instantiating Pydantic model
-        try:
-            validated_score = SectionScore(**score_data)
-            # Ensure section_name is correct
-            validated_score.section_name = "projects"
-            logger.info(f"Projects scoring successful: {validated_score.score}/100")
-        except Exception as e:
-            logger.error(f"Validation failed: {e}")
-            logger.error(f"Invalid data: {json.dumps(score_data, indent=2)}")
-            raise ValueError(f"Projects score data failed validation: {e}")
+        # Ensure section_name is correct
+        validated_score.section_name = "projects"
+        logger.info(f"Projects scoring successful: {validated_score.score}/100")
         
         # Return as dict for state
         return {
@@ -143,6 +149,7 @@ def projects_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Expects in state:
         - resume_structured: dict - Structured resume data
         - job_description: str - Job description text
+        - jd_analysis: dict - Optional shared JD analysis (requirements for the prompt)
     
     Returns updated state with:
         - projects_optimizations: list - List of SectionOptimization for each project
@@ -161,17 +168,10 @@ def projects_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     logger.info("Starting projects section optimization")
     
-    # Parse resume structured data
-    try:
-        resume = ResumeStructured(**resume_structured)
-    except Exception as e:
-        logger.error(f"Failed to parse resume_structured: {e}")
-        raise ValueError(f"Invalid resume_structured data: {e}")
-    
-    # Extract projects data
-    projects_data = [proj.model_dump() for proj in resume.projects]
+    # Section JSON for the prompt, validated and serialized once per request
+    projects_json = resume_sections(state)["projects"]
     
-    if not projects_data:
+    if not resume_structured.get("projects"):
         logger.warning("No projects data found, returning empty optimizations")
         return {"projects_optimizations": []}
     
@@ -180,9 +180,22 @@ def projects_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     # Truncate JD if needed
     jd_truncated = truncate_for_prompt(job_description, max_chars=4000)
+    job_requirements = format_job_requirements(state.get("jd_analysis"))
+    
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
+
+Return a JSON array where each object has this structure:
+{
+  "section_name": "projects",
+  "original_content": "original project name, description, technologies, and impact",
+  "optimized_content": "optimized version with better keywords and impact statements",
+  "improvements": ["improvement1", "improvement2", ...],
+  "keywords_added": ["keyword1", "keyword2", ...]
+}""")
     
     # Build system prompt
-    system_prompt = """You are an expert resume writer specializing in ATS optimization. Your task is to rewrite project descriptions to better match a job description.
+    system_prompt = f"""You are an expert resume writer specializing in ATS optimization. Your task is to rewrite project descriptions to better match a job description.
 
 Guidelines:
 - Use strong action verbs (Built, Developed, Designed, Implemented, etc.)
@@ -191,16 +204,7 @@ Guidelines:
 - Emphasize problem-solving and results
 - Show relevance to the job role
 - Keep descriptions concise but impactful
-- Focus on technical depth and business impact
-
-Return a JSON array where each object has this structure:
-{
-  "section_name": "projects",
-  "original_content": "original project name, description, technologies, and impact",
-  "optimized_content": "optimized version with better keywords and impact statements",
-  "improvements": ["improvement1", "improvement2", ...],
-  "keywords_added": ["keyword1", "keyword2", ...]
-}
+- Focus on technical depth and business impact{output_format}
 
 Return ONLY the JSON array, nothing else."""
 
@@ -208,10 +212,10 @@ Return ONLY the JSON array, nothing else."""
     user_prompt = f"""Optimize these projects for the following job:
 
 JOB DESCRIPTION:
-{jd_truncated}
+{jd_truncated}{job_requirements}
 
 CANDIDATE PROJECTS:
-{json.dumps(projects_data, indent=2)}
+{projects_json}
 
 Rewrite each project to better match the job description. Emphasize relevant technologies, impact, and problem-solving."""
 
@@ -220,56 +224,60 @@ Rewrite each project to better match the job description. Emphasize relevant tec
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
         # Call Vertex AI with JSON output
-        response = model.generate_content(
+        response_text = call_llm(
+            model,
             full_prompt,
-            generation_config={
-                "response_mime_type": "application/json",
-            }
+            generation_config=json_generation_config(SECTION_OPTIMIZATION_LIST_SCHEMA),
+            agent_name="projects_optimization",
+            on_item=partial_item_writer(state, "projects", model_items(SectionOptimization, section_name="projects")),
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw projects optimization response: {response_text[:300]}...")
         
-        # Parse JSON array
-        optimizations_data = json.loads(response_text)
-        
-        if not isinstance(optimizations_data, list):
-            optimizations_data = [optimizations_data]
-        
-        # Validate each optimization
-        validated_optimizations = []
-        for idx, opt_data in enumerate(optimizations_data):
-            try:
-                # Fix: Ensure optimized_content is a string, not a list
-                if isinstance(opt_data.get("optimized_content"), list):
-                    opt_data["optimized_content"] = " ".join(opt_data["optimized_content"])
-                if isinstance(opt_data.get("original_content"), list):
-                    opt_data["original_content"] = " ".join(opt_data["original_content"])
-                
-                validated = SectionOptimization(**opt_data)
+        # Parse and validate straight from the response text; the slow path repairs entries one by one
+        validated_optimizations = try_validate_json(List[SectionOptimization], response_text)
+        if validated_optimizations is not None:
+            for validated in validated_optimizations:
                 validated.section_name = "projects"
-                validated_optimizations.append(validated)
-            except Exception as e:
-                logger.warning(f"Failed to validate project optimization {idx}: {e}")
-                # Create a fallback optimization
-                if isinstance(opt_data, dict):
-                    # Fix: Convert list to string if needed
-                    optimized_content = opt_data.get("optimized_content", "")
-                    if isinstance(optimized_content, list):
-                        optimized_content = " ".join(optimized_content)
-                    original_content = opt_data.get("original_content", "")
-                    if isinstance(original_content, list):
-                        original_content = " ".join(original_content)
+        else:
+            # Parse JSON array
+            optimizations_data = json.loads(response_text)
+            
+            if not isinstance(optimizations_data, list):
+                optimizations_data = [optimizations_data]
+            
+            # Validate each optimization
+            validated_optimizations = []
+            for idx, opt_data in enumerate(optimizations_data):
+                try:
+                    # Fix: Ensure optimized_content is a string, not a list
+                    if isinstance(opt_data.get("optimized_content"), list):
+                        opt_data["optimized_content"] = " ".join(opt_data["optimized_content"])
+                    if isinstance(opt_data.get("original_content"), list):
+                        opt_data["original_content"] = " ".join(opt_data["original_content"])
                     
-                    fallback = SectionOptimization(
-                        section_name="projects",
-                        original_content=original_content,
-                        optimized_content=optimized_content,
-                        improvements=opt_data.get("improvements", []),
-                        keywords_added=opt_data.get("keywords_added", [])
-                    )
-                    validated_optimizations.append(fallback)
+                    validated = SectionOptimization(**opt_data)
+                    validated.section_name = "projects"
+                    validated_optimizations.append(validated)
+                except Exception as e:
+                    logger.warning(f"Failed to validate project optimization {idx}: {e}")
+                    # Create a fallback optimization
+                    if isinstance(opt_data, dict):
+                        # Fix: Convert list to string if needed
+                        optimized_content = opt_data.get("optimized_content", "")
+                        if isinstance(optimized_content, list):
+                            optimized_content = " ".join(optimized_content)
+                        original_content = opt_data.get("original_content", "")
+                        if isinstance(original_content, list):
+                            original_content = " ".join(original_content)
+                        
+                        fallback = SectionOptimization(
+                            section_name="projects",
+                            original_content=original_content,
+                            optimized_content=optimized_content,
+                            improvements=opt_data.get("improvements", []),
+                            keywords_added=opt_data.get("keywords_added", [])
+                        )
+                        validated_optimizations.append(fallback)
         
         logger.info(f"Projects optimization successful: {len(validated_optimizations)} projects optimized")
         
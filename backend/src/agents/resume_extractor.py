@@ -9,8 +9,15 @@ from typing import Dict, Any
 import json
 from src.config import get_llm
 from src.models.schemas import ResumeStructured
+from src.utils.llm_utils import call_llm
 from src.utils.logging_utils import get_logger
+from src.utils.resume_utils import prepare_resume, resume_state
 from src.utils.text_utils import clean_resume_text
+from src.utils.schema_utils import (
+    json_generation_config,
+    schema_prompt_block,
+    RESUME_STRUCTURED_SCHEMA,
+)
 
 logger = get_logger(__name__)
 
@@ -24,6 +31,7 @@ def extract_resume_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     Returns updated state with:
         - resume_structured: dict - Structured resume data compatible with ResumeStructured
+        - resume_sections: dict - Prompt-ready JSON of each section (src.utils.resume_utils)
     
     Args:
         state: LangGraph state dictionary
@@ -43,9 +51,6 @@ def extract_resume_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # Get the LLM
     model = get_llm(temperature=0.1, max_output_tokens=4096)
     
-    # Get JSON schema from Pydantic model for prompt description
-    raw_schema = ResumeStructured.model_json_schema()
-    
     # Build system prompt with schema description
     system_prompt = """You are a resume parsing assistant. Extract information from the resume and populate the JSON schema fields accurately.
 
@@ -62,59 +67,62 @@ Rules:
 - Be precise and accurate in extraction
 - Return ONLY valid JSON, no markdown, no code blocks, no explanatory text"""
 
-    # Build user prompt with schema structure
-    user_prompt = f"""Extract structured information from the following resume:
-
-{cleaned_text}
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
 
 Return a JSON object with this exact structure:
-{{
-  "contact_info": {{
+{
+  "contact_info": {
     "name": "string or null",
     "email": "string or null",
     "phone": "string or null",
     "location": "string or null"
-  }},
+  },
   "skills": [
-    {{
+    {
       "name": "string",
       "level": "string or null (beginner/intermediate/expert)",
       "years_experience": "number or null"
-    }}
+    }
   ],
   "experience": [
-    {{
+    {
       "job_title": "string or null",
       "company": "string or null",
       "start_date": "string or null",
       "end_date": "string or null",
       "is_current": "boolean or null",
       "responsibilities": ["string"]
-    }}
+    }
   ],
   "education": [
-    {{
+    {
       "degree": "string or null",
       "field_of_study": "string or null",
       "institution": "string or null",
       "start_date": "string or null",
       "end_date": "string or null"
-    }}
+    }
   ],
   "projects": [
-    {{
+    {
       "name": "string or null",
       "description": "string or null",
       "technologies": ["string"],
       "impact": "string or null"
-    }}
+    }
   ],
-  "meta": {{
+  "meta": {
     "seniority_level": "string or null (junior/mid/senior)",
     "domains": ["string"],
     "languages": ["string"]
-  }}
-}}
+  }
+}""")
+    
+    # Build user prompt with schema structure
+    user_prompt = f"""Extract structured information from the following resume:
+
+{cleaned_text}{output_format}
 
 Return ONLY the JSON object, nothing else."""
 
@@ -122,16 +130,13 @@ Return ONLY the JSON object, nothing else."""
         # Combine prompts
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
-        # Call Vertex AI with JSON output (no schema to avoid proto issues)
-        response = model.generate_content(
+        # Call Vertex AI with JSON output (and the cleaned schema when enabled)
+        response_text = call_llm(
+            model,
             full_prompt,
-            generation_config={
-                "response_mime_type": "application/json",
-            }
+            generation_config=json_generation_config(RESUME_STRUCTURED_SCHEMA),
+            agent_name="extract_resume",
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw extraction response: {response_text[:200]}...")
         
         # Parse JSON
@@ -146,10 +151,8 @@ Return ONLY the JSON object, nothing else."""
             logger.error(f"Invalid data: {json.dumps(resume_data, indent=2)}")
             raise ValueError(f"Extracted resume data failed validation: {e}")
         
-        # Return as dict for state
-        return {
-            "resume_structured": validated_resume.model_dump()
-        }
+        # Return as dict for state, with the prompt-ready sections
+        return resume_state(validated_resume)
         
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON response: {e}")
@@ -159,3 +162,25 @@ Return ONLY the JSON object, nothing else."""
         logger.error(f"Resume extraction failed: {e}")
         raise
 
+
+def prepare_resume_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Prepare resume data - extract if needed, otherwise use provided structured data.
+    If structured data is provided, skip extraction (no API call); it is only validated.
+    If only text is provided, extract structured data (1 API call).
+    Either way the resume is validated here once for the whole graph run.
+    """
+    resume_structured = state.get("resume_structured")
+    resume_text = state.get("resume_text")
+    
+    # If structured data already provided, skip extraction (no API call)
+    if resume_structured:
+        logger.info("Using provided structured resume data - skipping extraction")
+        return prepare_resume(resume_structured)
+    
+    # Otherwise extract from text (1 API call)
+    if resume_text:
+        logger.info("Extracting structured resume from text")
+        return extract_resume_node(state)
+    
+    raise ValueError("Either resume_structured or resume_text must be provided")
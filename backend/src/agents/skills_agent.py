@@ -7,10 +7,19 @@ Scores how well the candidate's skills match the job description requirements.
 from typing import Dict, Any
 import json
 from src.config import get_llm
-from src.models.schemas import SectionScore, ResumeStructured, SectionOptimization
+from src.models.schemas import SectionScore, SectionOptimization
+from src.utils.llm_utils import call_llm
+from src.utils.json_stream_utils import model_fields, partial_item_writer
 from src.utils.logging_utils import get_logger
-from src.utils.text_utils import truncate_for_prompt
-from src.utils.schema_utils import clean_schema_for_vertex_ai
+from src.utils.resume_utils import resume_sections, validated_resume
+from src.utils.serialization_utils import try_validate_json
+from src.utils.text_utils import format_job_requirements, truncate_for_prompt
+from src.utils.schema_utils import (
+    json_generation_config,
+    schema_prompt_block,
+    SECTION_OPTIMIZATION_SCHEMA,
+    SECTION_SCORE_SCHEMA,
+)
 
 logger = get_logger(__name__)
 
@@ -22,6 +31,7 @@ def skills_scoring_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Expects in state:
         - resume_structured: dict - Structured resume data
         - job_description: str - Job description text
+        - jd_analysis: dict - Optional shared JD analysis (requirements for the prompt)
     
     Returns updated state with:
         - skills_score: dict - SectionScore for skills
@@ -40,21 +50,15 @@ def skills_scoring_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     logger.info("Starting skills section scoring")
     
-    # Parse resume structured data
-    try:
-        resume = ResumeStructured(**resume_structured)
-    except Exception as e:
-        logger.error(f"Failed to parse resume_structured: {e}")
-        raise ValueError(f"Invalid resume_structured data: {e}")
-    
-    # Extract skills data
-    skills_data = [skill.model_dump() for skill in resume.skills]
+    # Section JSON for the prompt, validated and serialized once per request
+    skills_json = resume_sections(state)["skills"]
     
     # Get the LLM
     model = get_llm(temperature=0.1, max_output_tokens=2048)
     
     # Truncate JD if needed
     jd_truncated = truncate_for_prompt(job_description, max_chars=8000)
+    job_requirements = format_job_requirements(state.get("jd_analysis"))
     
     # Build system prompt
     system_prompt = """You are an expert technical recruiter. You score the candidate's SKILLS section against the job description for a specific dimension.
@@ -71,24 +75,27 @@ Return a JSON object strictly matching the provided schema with:
 - reasons: list of specific reasons for the score (what matches, what's good)
 - missing_requirements: list of skills or skill levels missing from the job description"""
 
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
+
+Return a JSON object with this exact structure:
+{
+  "section_name": "skills",
+  "score": 0-100,
+  "reasons": ["reason1", "reason2"],
+  "missing_requirements": ["requirement1", "requirement2"]
+}""")
+    
     # Build user prompt
     user_prompt = f"""Score the candidate's skills against this job description:
 
 JOB DESCRIPTION:
-{jd_truncated}
+{jd_truncated}{job_requirements}
 
 CANDIDATE SKILLS:
-{json.dumps(skills_data, indent=2)}
-
-Analyze how well the candidate's skills match the job requirements and provide a detailed score with reasons.
+{skills_json}
 
-Return a JSON object with this exact structure:
-{{
-  "section_name": "skills",
-  "score": 0-100,
-  "reasons": ["reason1", "reason2"],
-  "missing_requirements": ["requirement1", "requirement2"]
-}}
+Analyze how well the candidate's skills match the job requirements and provide a detailed score with reasons.{output_format}
 
 Return ONLY the JSON object, nothing else."""
 
@@ -97,30 +104,29 @@ Return ONLY the JSON object, nothing else."""
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
         # Call Vertex AI with JSON output
-        response = model.generate_content(
+        response_text = call_llm(
+            model,
             full_prompt,
-            generation_config={
-                "response_mime_type": "application/json",
-            }
+            generation_config=json_generation_config(SECTION_SCORE_SCHEMA),
+            agent_name="skills_scoring",
+            on_item=partial_item_writer(state, "skills", model_fields(SectionScore)),
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw skills scoring response: {response_text[:200]}...")
         
-        # Parse JSON
-        score_data = json.loads(response_text)
+        # Parse and validate straight from the response text; the slow path reports what's wrong
+        validated_score = try_validate_json(SectionScore, response_text)
+        if validated_score is None:
+            score_data = json.loads(response_text)
+            try:
+                validated_score = SectionScore(**score_data)
+            except Exception as e:
+                logger.error(f"Validation failed: {e}")
+                logger.error(f"Invalid data: {json.dumps(score_data, indent=2)}")
+                raise ValueError(f"Skills score data failed validation: {e}")
         
-        # Validate by instantiating Pydantic model
-        try:
-            validated_score = SectionScore(**score_data)
-            # Ensure section_name is correct
-            validated_score.section_name = "skills"
-            logger.info(f"Skills scoring successful: {validated_score.score}/100")
-        except Exception as e:
-            logger.error(f"Validation failed: {e}")
-            logger.error(f"Invalid data: {json.dumps(score_data, indent=2)}")
-            raise ValueError(f"Skills score data failed validation: {e}")
+        # Ensure section_name is correct
+        validated_score.section_name = "skills"
+        logger.info(f"Skills scoring successful: {validated_score.score}/100")
         
         # Return as dict for state
         return {
@@ -143,6 +149,7 @@ def skills_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Expects in state:
         - resume_structured: dict - Structured resume data
         - job_description: str - Job description text
+        - jd_analysis: dict - Optional shared JD analysis (requirements for the prompt)
     
     Returns updated state with:
         - skills_optimization: dict - SectionOptimization for skills
@@ -161,15 +168,8 @@ def skills_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     logger.info("Starting skills section optimization")
     
-    # Parse resume structured data
-    try:
-        resume = ResumeStructured(**resume_structured)
-    except Exception as e:
-        logger.error(f"Failed to parse resume_structured: {e}")
-        raise ValueError(f"Invalid resume_structured data: {e}")
-    
-    # Extract skills data
-    skills_data = [skill.model_dump() for skill in resume.skills]
+    # Skills as validated once per request
+    skills_data = validated_resume(state)["skills"]
     
     # Format current skills as text
     current_skills_text = ", ".join([skill.get("name", "") for skill in skills_data])
@@ -181,9 +181,22 @@ def skills_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     
     # Truncate JD if needed
     jd_truncated = truncate_for_prompt(job_description, max_chars=4000)
+    job_requirements = format_job_requirements(state.get("jd_analysis"))
+    
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
+
+Return a JSON object with this exact structure:
+{
+  "section_name": "skills",
+  "original_content": "original skills list",
+  "optimized_content": "optimized skills list with better organization and JD keywords",
+  "improvements": ["improvement1", "improvement2", ...],
+  "keywords_added": ["keyword1", "keyword2", ...]
+}""")
     
     # Build system prompt
-    system_prompt = """You are an expert resume writer specializing in ATS optimization. Your task is to optimize a skills section to better match a job description.
+    system_prompt = f"""You are an expert resume writer specializing in ATS optimization. Your task is to optimize a skills section to better match a job description.
 
 Guidelines:
 - Include all relevant skills from the job description that the candidate likely has
@@ -192,16 +205,7 @@ Guidelines:
 - Prioritize skills mentioned in the JD
 - Group related skills together
 - Don't add skills the candidate doesn't have, but suggest relevant ones they might have
-- Format as a clean, scannable list
-
-Return a JSON object with this exact structure:
-{
-  "section_name": "skills",
-  "original_content": "original skills list",
-  "optimized_content": "optimized skills list with better organization and JD keywords",
-  "improvements": ["improvement1", "improvement2", ...],
-  "keywords_added": ["keyword1", "keyword2", ...]
-}
+- Format as a clean, scannable list{output_format}
 
 Return ONLY the JSON object, nothing else."""
 
@@ -212,7 +216,7 @@ CURRENT SKILLS:
 {current_skills_text}
 
 JOB DESCRIPTION:
-{jd_truncated}
+{jd_truncated}{job_requirements}
 
 Rewrite the skills section to better match the job description. Include relevant skills from the JD that align with the candidate's background."""
 
@@ -221,36 +225,38 @@ Rewrite the skills section to better match the job description. Include relevant
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
         # Call Vertex AI with JSON output
-        response = model.generate_content(
+        response_text = call_llm(
+            model,
             full_prompt,
-            generation_config={
-                "response_mime_type": "application/json",
-            }
+            generation_config=json_generation_config(SECTION_OPTIMIZATION_SCHEMA),
+            agent_name="skills_optimization",
+            on_item=partial_item_writer(state, "skills", model_fields(SectionOptimization)),
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw skills optimization response: {response_text[:200]}...")
         
-        # Parse JSON
-        optimization_data = json.loads(response_text)
-        
-        # Fix: Ensure optimized_content is a string, not a list
-        if isinstance(optimization_data.get("optimized_content"), list):
-            optimization_data["optimized_content"] = " ".join(optimization_data["optimized_content"])
-        if isinstance(optimization_data.get("original_content"), list):
-            optimization_data["original_content"] = " ".join(optimization_data["original_content"])
+        # Parse and validate straight from the response text; the slow path repairs list-valued content
+        validated_optimization = try_validate_json(SectionOptimization, response_text)
+        if validated_optimization is None:
+            # Parse JSON
+            optimization_data = json.loads(response_text)
+            
+            # Fix: Ensure optimized_content is a string, not a list
+            if isinstance(optimization_data.get("optimized_content"), list):
+                optimization_data["optimized_content"] = " ".join(optimization_data["optimized_content"])
+            if isinstance(optimization_data.get("original_content"), list):
+                optimization_data["original_content"] = " ".join(optimization_data["original_content"])
+            
+            # Validate by instantiating Pydantic model
+            try:
+                validated_optimization = SectionOptimization(**optimization_data)
+            except Exception as e:
+                logger.error(f"Validation failed: {e}")
+                logger.error(f"Invalid data: {json.dumps(optimization_data, indent=2)}")
+                raise ValueError(f"Skills optimization data failed validation: {e}")
         
-        # Validate by instantiating Pydantic model
-        try:
-            validated_optimization = SectionOptimization(**optimization_data)
-            # Ensure section_name is correct
-            validated_optimization.section_name = "skills"
-            logger.info("Skills optimization successful")
-        except Exception as e:
-            logger.error(f"Validation failed: {e}")
-            logger.error(f"Invalid data: {json.dumps(optimization_data, indent=2)}")
-            raise ValueError(f"Skills optimization data failed validation: {e}")
+        # Ensure section_name is correct
+        validated_optimization.section_name = "skills"
+        logger.info("Skills optimization successful")
         
         # Return as dict for state
         return {
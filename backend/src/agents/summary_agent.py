@@ -9,12 +9,44 @@ from typing import Dict, Any
 import json
 from src.config import get_llm
 from src.models.schemas import SectionOptimization
+from src.utils.llm_utils import call_llm
+from src.utils.json_stream_utils import model_fields, partial_item_writer
 from src.utils.logging_utils import get_logger
-from src.utils.text_utils import truncate_for_prompt
+from src.utils.serialization_utils import try_validate_json
+from src.utils.text_utils import format_job_requirements, truncate_for_prompt
+from src.utils.schema_utils import (
+    json_generation_config,
+    schema_prompt_block,
+    SECTION_OPTIMIZATION_SCHEMA,
+)
 
 logger = get_logger(__name__)
 
 
+def extract_current_summary(resume_text: str) -> str:
+    """
+    Take the resume's summary as its first paragraph (first 300 chars).
+    
+    Args:
+        resume_text: Raw resume text (may be empty)
+    
+    Returns:
+        Current summary, or a generic placeholder if there is none
+    """
+    current_summary = ""
+    
+    if resume_text:
+        # Extract from first paragraph of resume
+        paragraphs = resume_text.split('\n\n')
+        if paragraphs:
+            current_summary = paragraphs[0][:300]  # First 300 chars
+    
+    if not current_summary:
+        current_summary = "Experienced professional seeking new opportunities."
+    
+    return current_summary
+
+
 def summary_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     LangGraph node function to optimize summary section.
@@ -22,6 +54,7 @@ def summary_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     Expects in state:
         - resume_structured: dict - Structured resume data
         - job_description: str - Job description text
+        - jd_analysis: dict - Optional shared JD analysis (requirements for the prompt)
     
     Returns updated state with:
         - summary_optimization: dict - SectionOptimization for summary
@@ -41,27 +74,30 @@ def summary_optimization_node(state: Dict[str, Any]) -> Dict[str, Any]:
     logger.info("Starting summary section optimization")
     
     # Extract current summary from resume text (from resume_text if available)
-    resume_text = state.get("resume_text", "")
-    current_summary = ""
-    
-    if resume_text:
-        # Extract from first paragraph of resume
-        paragraphs = resume_text.split('\n\n')
-        if paragraphs:
-            current_summary = paragraphs[0][:300]  # First 300 chars
-    
-    if not current_summary:
-        current_summary = "Experienced professional seeking new opportunities."
+    current_summary = extract_current_summary(state.get("resume_text", ""))
     
     # Get the LLM
     model = get_llm(temperature=0.3, max_output_tokens=1024)
     
     # Truncate inputs
     jd_truncated = truncate_for_prompt(job_description, max_chars=4000)
+    job_requirements = format_job_requirements(state.get("jd_analysis"))
     summary_truncated = current_summary[:500] if len(current_summary) > 500 else current_summary
     
+    # Output format in prose, unless response_schema enforces it
+    output_format = schema_prompt_block("""
+
+Return a JSON object with this exact structure:
+{
+  "section_name": "summary",
+  "original_content": "original summary text",
+  "optimized_content": "optimized summary text",
+  "improvements": ["improvement1", "improvement2", ...],
+  "keywords_added": ["keyword1", "keyword2", ...]
+}""")
+    
     # Build system prompt
-    system_prompt = """You are an expert resume writer specializing in ATS (Applicant Tracking System) optimization. Your task is to rewrite a resume summary/objective to better match a job description.
+    system_prompt = f"""You are an expert resume writer specializing in ATS (Applicant Tracking System) optimization. Your task is to rewrite a resume summary/objective to better match a job description.
 
 Guidelines:
 - Use strong action verbs (e.g., "Led", "Developed", "Implemented", "Optimized")
@@ -72,16 +108,7 @@ Guidelines:
 - Use professional, confident language
 - Avoid generic phrases like "hard-working" or "team player"
 - Focus on quantifiable achievements when possible
-- Make it specific to the role
-
-Return a JSON object with this exact structure:
-{
-  "section_name": "summary",
-  "original_content": "original summary text",
-  "optimized_content": "optimized summary text",
-  "improvements": ["improvement1", "improvement2", ...],
-  "keywords_added": ["keyword1", "keyword2", ...]
-}
+- Make it specific to the role{output_format}
 
 Return ONLY the JSON object, nothing else."""
 
@@ -92,7 +119,7 @@ CURRENT SUMMARY:
 {summary_truncated}
 
 JOB DESCRIPTION:
-{jd_truncated}
+{jd_truncated}{job_requirements}
 
 Rewrite the summary to better match this job description while maintaining authenticity. Include relevant keywords naturally."""
 
@@ -101,34 +128,36 @@ Rewrite the summary to better match this job description while maintaining authe
         full_prompt = f"{system_prompt}\n\n{user_prompt}"
         
         # Call Vertex AI with JSON output
-        response = model.generate_content(
+        response_text = call_llm(
+            model,
             full_prompt,
-            generation_config={
-                "response_mime_type": "application/json",
-            }
+            generation_config=json_generation_config(SECTION_OPTIMIZATION_SCHEMA),
+            agent_name="summary_optimization",
+            on_item=partial_item_writer(state, "summary", model_fields(SectionOptimization)),
         )
-        
-        # Parse the JSON response
-        response_text = response.text
         logger.debug(f"Raw summary optimization response: {response_text[:200]}...")
         
-        # Parse JSON
-        optimization_data = json.loads(response_text)
-        
-        # Fix: Ensure optimized_content is a string, not a list
-        if isinstance(optimization_data.get("optimized_content"), list):
-            optimization_data["optimized_content"] = " ".join(optimization_data["optimized_content"])
+        # Parse and validate straight from the response text; the slow path repairs list-valued content
+        validated_optimization = try_validate_json(SectionOptimization, response_text)
+        if validated_optimization is None:
+            # Parse JSON
+            optimization_data = json.loads(response_text)
+            
+            # Fix: Ensure optimized_content is a string, not a list
+            if isinstance(optimization_data.get("optimized_content"), list):
+                optimization_data["optimized_content"] = " ".join(optimization_data["optimized_content"])
+            
+            # Validate by instantiating Pydantic model
+            try:
+                validated_optimization = SectionOptimization(**optimization_data)
+            except Exception as e:
+                logger.error(f"Validation failed: {e}")
+                logger.error(f"Invalid data: {json.dumps(optimization_data, indent=2)}")
+                raise ValueError(f"Summary optimization data failed validation: {e}")
         
-        # Validate by instantiating Pydantic model
-        try:
-            validated_optimization = SectionOptimization(**optimization_data)
-            # Ensure section_name is correct
-            validated_optimization.section_name = "summary"
-            logger.info("Summary optimization successful")
-        except Exception as e:
-            logger.error(f"Validation failed: {e}")
-            logger.error(f"Invalid data: {json.dumps(optimization_data, indent=2)}")
-            raise ValueError(f"Summary optimization data failed validation: {e}")
+        # Ensure section_name is correct
+        validated_optimization.section_name = "summary"
+        logger.info("Summary optimization successful")
         
         # Return as dict for state
         return {
@@ -5,8 +5,11 @@ Reads environment variables and provides helpers to initialize
 Vertex AI generative model clients compatible with LangGraph.
 """
 
+import functools
 import os
-from typing import Optional
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
 from dotenv import load_dotenv
 import vertexai
 from vertexai.generative_models import GenerativeModel
@@ -22,6 +25,91 @@ GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-2.5-flash")
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 STAGING_BUCKET = os.getenv("STAGING_BUCKET")  # GCS bucket for staging files (e.g., gs://bucket-name)
 
+# LLM response cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "resume_matcher_llm_cache.sqlite3"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "100"))
+
+# LLM rate limiting (0 disables a budget; both are off by default). To stay
+# under the project's Vertex AI quota, set these to the "Generate content
+# requests per minute" and "tokens per minute" quota of GEMINI_MODEL_NAME in
+# VERTEX_AI_LOCATION (Cloud console > IAM & Admin > Quotas), divided by the
+# number of server processes unless LLM_RATE_LIMIT_SHARED_PATH is set.
+LLM_RATE_LIMIT_RPM = float(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+LLM_RATE_LIMIT_TPM = float(os.getenv("LLM_RATE_LIMIT_TPM", "0"))
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "120"))
+LLM_RATE_LIMIT_SHARED_PATH = os.getenv("LLM_RATE_LIMIT_SHARED_PATH")  # SQLite file to share budgets across processes
+
+# LLM retries and deadlines
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BUDGET = int(os.getenv("LLM_RETRY_BUDGET", "6"))  # Retries allowed per API request
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "60"))  # Seconds per attempt, 0 disables
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))  # SDK calls in flight, timed-out ones included
+
+# Streaming generation: stream responses and report completed JSON items early,
+# only for API requests that stream partial results to the client
+LLM_STREAMING_ENABLED = os.getenv("LLM_STREAMING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Hedged LLM requests (duplicate a call that runs past a latency percentile)
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+LLM_HEDGE_MAX_PER_REQUEST = int(os.getenv("LLM_HEDGE_MAX_PER_REQUEST", "2"))
+
+# Constrained decoding: pass cleaned Pydantic schemas as response_schema
+LLM_RESPONSE_SCHEMA = os.getenv("LLM_RESPONSE_SCHEMA", "false").lower() in ("1", "true", "yes")
+
+# LLM backend: "vertex" (default) or "fake" for offline load tests
+LLM_BACKEND = os.getenv("LLM_BACKEND", "vertex").lower()
+LLM_FAKE_LATENCY = os.getenv("LLM_FAKE_LATENCY", "lognormal:1.5,0.4")  # See src/llm/fake_backend.py
+LLM_FAKE_429_RATE = float(os.getenv("LLM_FAKE_429_RATE", "0"))
+LLM_FAKE_503_RATE = float(os.getenv("LLM_FAKE_503_RATE", "0"))
+LLM_FAKE_MALFORMED_RATE = float(os.getenv("LLM_FAKE_MALFORMED_RATE", "0"))
+LLM_FAKE_SEED = int(os.getenv("LLM_FAKE_SEED", "0"))
+
+# Partial failures: re-run only the failed section nodes up to this many times per request
+GRAPH_PARTIAL_RETRIES = int(os.getenv("GRAPH_PARTIAL_RETRIES", "0"))
+
+# Section result store for incremental re-scoring (keyed by section content + normalized JD)
+SECTION_CACHE_ENABLED = os.getenv("SECTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SECTION_CACHE_PATH = os.getenv("SECTION_CACHE_PATH", os.path.join(tempfile.gettempdir(), "resume_matcher_section_cache.sqlite3"))
+SECTION_CACHE_TTL_SECONDS = float(os.getenv("SECTION_CACHE_TTL_SECONDS", "604800"))
+SECTION_CACHE_MAX_MB = float(os.getenv("SECTION_CACHE_MAX_MB", "50"))
+
+# Scoring mode: "sections" (one LLM call per section) or "fused" (one call for all sections)
+SCORING_MODE = os.getenv("SCORING_MODE", "sections").lower()
+
+# Optimization fan-out: entries per batch are packed to this output-token estimate, at most this many batches per section
+OPTIMIZATION_BATCH_OUTPUT_TOKENS = int(os.getenv("OPTIMIZATION_BATCH_OUTPUT_TOKENS", "1200"))
+OPTIMIZATION_MAX_BATCHES = int(os.getenv("OPTIMIZATION_MAX_BATCHES", "4"))
+
+# Section gating: answer empty or irrelevant sections with placeholders instead of LLM calls
+SECTION_GATING_ENABLED = os.getenv("SECTION_GATING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Also skip sections that don't apply to the job (e.g. education when the JD names no education
+# requirement) and leave them out of the overall score; this changes scores, so it is opt-in
+SECTION_GATING_EXCLUDE_NOT_APPLICABLE = os.getenv("SECTION_GATING_EXCLUDE_NOT_APPLICABLE", "false").lower() in ("1", "true", "yes")
+
+# Job description analysis (requirements + section weights), shared by every request for the same JD.
+# Off by default: it costs two sequential LLM calls per new JD and changes overall scores
+JD_ANALYSIS_ENABLED = os.getenv("JD_ANALYSIS_ENABLED", "false").lower() in ("1", "true", "yes")
+# Share of the analysis' section weights in the scoring weights (0 = always the default weights)
+JD_ANALYSIS_WEIGHT_BLEND = float(os.getenv("JD_ANALYSIS_WEIGHT_BLEND", "0.5"))
+JD_ANALYSIS_MEMORY_ENTRIES = int(os.getenv("JD_ANALYSIS_MEMORY_ENTRIES", "256"))
+
+# Graph checkpointing: SQLite file for resumable requests (unset disables)
+GRAPH_CHECKPOINT_PATH = os.getenv("GRAPH_CHECKPOINT_PATH")
+GRAPH_CHECKPOINT_TTL_SECONDS = float(os.getenv("GRAPH_CHECKPOINT_TTL_SECONDS", "86400"))
+
+# JSON library for API bodies: "auto" (orjson if installed), "orjson" or "json"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
+# Request tracing: comma-separated exporters ("otlp-json", "chrome"), empty disables export
+TRACE_EXPORTERS = [name.strip().lower() for name in os.getenv("TRACE_EXPORTERS", "").split(",") if name.strip()]
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(tempfile.gettempdir(), "resume_matcher_traces"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "resume-matcher-backend")
+
 # Initialize Vertex AI with credentials if provided
 if GOOGLE_CLOUD_PROJECT:
     if GOOGLE_APPLICATION_CREDENTIALS and os.path.exists(GOOGLE_APPLICATION_CREDENTIALS):
@@ -39,13 +127,108 @@ if GOOGLE_CLOUD_PROJECT:
         vertexai.init(project=GOOGLE_CLOUD_PROJECT, location=VERTEX_AI_LOCATION)
 
 
+# Memoized model instances keyed by (model_name, temperature, max_output_tokens)
+_llm_registry: Dict[Tuple[str, float, int], Any] = {}
+_llm_registry_lock = threading.Lock()
+_shared_prediction_client = None
+
+# (temperature, max_output_tokens) combinations used by the agents, for warm-up
+AGENT_LLM_CONFIGS = [
+    (0.1, 2048),
+    (0.1, 4096),
+    (0.1, 8192),
+    (0.3, 1024),
+    (0.3, 2048),
+    (0.3, 4096),
+]
+
+
+def _share_prediction_client(model: GenerativeModel) -> None:
+    """
+    Point the model at the process-wide prediction client.
+    
+    GenerativeModel creates its PredictionServiceClient lazily through a
+    cached property, one per instance. Seeding that property with a single
+    shared client means every model reuses the same gRPC channel and its
+    connection pool instead of opening its own. Callers hold the registry lock.
+    """
+    global _shared_prediction_client
+    client_property = getattr(type(model), "_prediction_client", None)
+    if not isinstance(client_property, functools.cached_property):
+        return
+    if _shared_prediction_client is None:
+        try:
+            _shared_prediction_client = model._prediction_client
+        except Exception:
+            # Leave the client lazy; credential errors surface on the first call as before
+            return
+    else:
+        model.__dict__["_prediction_client"] = _shared_prediction_client
+
+
+def _create_vertex_model(model_name: str, temperature: float, max_output_tokens: int) -> GenerativeModel:
+    """Backend factory for Vertex AI Gemini models."""
+    if not GOOGLE_CLOUD_PROJECT:
+        raise ValueError(
+            "GOOGLE_CLOUD_PROJECT environment variable must be set. "
+            "Please set it in your .env file or environment."
+        )
+    model = GenerativeModel(
+        model_name=model_name,
+        generation_config={
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        },
+    )
+    _share_prediction_client(model)
+    return model
+
+
+def _create_fake_model(model_name: str, temperature: float, max_output_tokens: int) -> Any:
+    """Backend factory for the offline fake (LLM_BACKEND=fake)."""
+    from src.llm.fake_backend import FakeGenerativeModel
+    
+    # Distinct name so fake responses never share response-cache entries with real ones
+    return FakeGenerativeModel(
+        model_name=f"fake/{model_name}",
+        generation_config={
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        },
+    )
+
+
+# Backend name -> factory(model_name, temperature, max_output_tokens)
+_llm_backends: Dict[str, Callable[[str, float, int], Any]] = {
+    "vertex": _create_vertex_model,
+    "fake": _create_fake_model,
+}
+
+
+def register_llm_backend(name: str, factory: Callable[[str, float, int], Any]) -> None:
+    """
+    Register a model factory selectable with LLM_BACKEND=<name>.
+    
+    The factory receives (model_name, temperature, max_output_tokens) and must
+    return an object with a GenerativeModel-compatible generate_content.
+    """
+    _llm_backends[name.lower()] = factory
+
+
 def get_llm(
     model_name: Optional[str] = None,
     temperature: float = 0.1,
     max_output_tokens: int = 2048,
 ) -> GenerativeModel:
     """
-    Get a Vertex AI GenerativeModel instance compatible with LangGraph.
+    Get a generative model instance compatible with LangGraph.
+    
+    The backend is chosen by LLM_BACKEND: Vertex AI by default, or the
+    offline fake for load tests. Instances are memoized by (model_name,
+    temperature, max_output_tokens) and Vertex models share one underlying
+    prediction client, so repeated node calls don't pay model setup or open
+    new connections. Models are stateless between calls and safe to share
+    across threads.
     
     Args:
         model_name: Model name (defaults to GEMINI_MODEL_NAME from env)
@@ -53,26 +236,50 @@ def get_llm(
         max_output_tokens: Maximum output tokens (default: 2048)
     
     Returns:
-        GenerativeModel instance configured for structured output
+        GenerativeModel (or backend-compatible) instance configured for structured output
     
     Raises:
-        ValueError: If GOOGLE_CLOUD_PROJECT is not set
+        ValueError: If LLM_BACKEND is unknown, or GOOGLE_CLOUD_PROJECT is not
+            set for the Vertex backend
     """
-    if not GOOGLE_CLOUD_PROJECT:
+    factory = _llm_backends.get(LLM_BACKEND)
+    if factory is None:
         raise ValueError(
-            "GOOGLE_CLOUD_PROJECT environment variable must be set. "
-            "Please set it in your .env file or environment."
+            f"Unknown LLM_BACKEND '{LLM_BACKEND}'. Available: {', '.join(sorted(_llm_backends))}"
         )
     
     model_name = model_name or GEMINI_MODEL_NAME
+    key = (model_name, float(temperature), int(max_output_tokens))
     
-    return GenerativeModel(
-        model_name=model_name,
-        generation_config={
-            "temperature": temperature,
-            "max_output_tokens": max_output_tokens,
-        },
-    )
+    model = _llm_registry.get(key)
+    if model is not None:
+        return model
+    
+    with _llm_registry_lock:
+        model = _llm_registry.get(key)
+        if model is None:
+            model = factory(model_name, float(temperature), int(max_output_tokens))
+            _llm_registry[key] = model
+    
+    return model
+
+
+def warm_up_llm_clients(model_name: Optional[str] = None) -> int:
+    """
+    Pre-create the models used by the agents and the shared prediction client.
+    
+    Intended to run once at startup so the first requests don't pay client
+    construction and credential loading.
+    
+    Args:
+        model_name: Model name (defaults to GEMINI_MODEL_NAME from env)
+    
+    Returns:
+        Number of models in the registry after warm-up
+    """
+    for temperature, max_output_tokens in AGENT_LLM_CONFIGS:
+        get_llm(model_name=model_name, temperature=temperature, max_output_tokens=max_output_tokens)
+    return len(_llm_registry)
 
 
 def get_project_id() -> str:
@@ -0,0 +1,98 @@
+"""
+Resumable graph runs on top of a LangGraph checkpointer.
+
+When the graphs are compiled with a checkpointer (GRAPH_CHECKPOINT_PATH),
+every run is keyed by a thread id. Running again with the id of an
+interrupted run resumes it: LangGraph reloads the last checkpoint and the
+writes of nodes that already completed, and executes only the rest. Running
+with the id of a finished run returns its stored result without any LLM
+calls.
+
+A fresh run stores a hash of its input (``input_hash``) in the state, so a
+later request naming the same thread with a different body can be rejected
+instead of silently receiving the stored run's result.
+"""
+
+import hashlib
+import json
+import uuid
+from typing import Dict, Any, Optional, Tuple
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def thread_config(graph, thread_id: Optional[str], round_index: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Build the invoke config for a run.
+    
+    Args:
+        graph: Compiled graph
+        thread_id: Caller-chosen run id (generated if the graph is checkpointed and none is given)
+        round_index: Partial-retry round; later rounds get their own thread so
+            the retried run doesn't inherit the previous round's failures
+    
+    Returns:
+        Config with configurable.thread_id, or None if the graph has no checkpointer
+    """
+    if getattr(graph, "checkpointer", None) is None:
+        return None
+    # Both graphs share one checkpointer, so the stored id is scoped by graph
+    thread_id = f"{graph.name}:{thread_id or uuid.uuid4().hex}"
+    if round_index:
+        thread_id = f"{thread_id}:retry-{round_index}"
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def resume_input(
+    graph,
+    initial_state: Optional[Dict[str, Any]],
+    config: Optional[Dict[str, Any]],
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Decide whether a run starts fresh or resumes a checkpointed thread.
+    
+    Args:
+        graph: Compiled graph
+        initial_state: Input for a fresh run
+        config: Config from thread_config
+    
+    Returns:
+        (input, values): input to pass to invoke/stream (None resumes the
+        thread) and the state already checkpointed for it ({} for a fresh run)
+    """
+    if config is None:
+        return initial_state, {}
+    snapshot = graph.get_state(config)
+    if not snapshot.values:
+        return initial_state, {}
+    thread_id = config["configurable"]["thread_id"]
+    if snapshot.next:
+        logger.info(f"Resuming thread {thread_id}: pending nodes {', '.join(snapshot.next)}")
+    else:
+        logger.info(f"Thread {thread_id} already completed, returning stored result")
+    return None, dict(snapshot.values)
+
+
+def has_thread(graph, thread_id: str) -> bool:
+    """True if the graph has checkpointed state for thread_id."""
+    config = thread_config(graph, thread_id)
+    return config is not None and bool(graph.get_state(config).values)
+
+
+def input_hash(initial_state: Dict[str, Any]) -> str:
+    """Hex SHA-256 of a run's initial state (without its own input_hash)."""
+    payload = json.dumps(
+        {key: value for key, value in initial_state.items() if key != "input_hash"},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stored_input_hash(graph, thread_id: str) -> Optional[str]:
+    """The input_hash checkpointed with thread_id, or None (no thread, or stored before hashing)."""
+    config = thread_config(graph, thread_id)
+    if config is None:
+        return None
+    return graph.get_state(config).values.get("input_hash")
@@ -0,0 +1,221 @@
+"""
+Per-entry fan-out for the list-valued optimization sections.
+
+The experience, projects and education optimizers rewrite every entry of
+their section in one call, so a senior resume with many roles produces one
+long, slow response that may be truncated into invalid JSON. Instead the
+entries are split into small batches sized to an output-token budget and
+dispatched in parallel with LangGraph's Send (map-style) API; each batch
+runs the unchanged agent on a resume sliced down to its entries. The
+section's ``optimize_<section>`` node then merges the batch results in the
+original entry order.
+
+Concurrency is bounded by capping the number of batches per section
+(OPTIMIZATION_MAX_BATCHES); past the cap, entries are spread evenly over
+the allowed batches.
+"""
+
+import functools
+import json
+import math
+from typing import Dict, Any, Callable, List, Optional, Union
+from langgraph.types import Send
+from src import config
+from src.graph.incremental import has_stored_result
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import REGISTRY
+from src.utils.resume_utils import resume_sections, section_json, validated_resume
+
+logger = get_logger(__name__)
+
+ENTRY_BATCHES = REGISTRY.histogram(
+    "optimization_entry_batches",
+    "Batches dispatched per optimized section",
+    ("section",),
+    buckets=(1, 2, 3, 4, 6, 8, 12),
+)
+
+# Output tokens per batch beyond the entries themselves (JSON keys, improvements, keywords)
+_BATCH_OVERHEAD_TOKENS = 150
+
+
+def estimate_output_tokens(entry: Any) -> int:
+    """
+    Rough output-token estimate for optimizing one entry.
+
+    The response repeats the entry as original_content and rewrites it as
+    optimized_content, at about 4 characters per token.
+    """
+    return 2 * len(json.dumps(entry, default=str)) // 4 + _BATCH_OVERHEAD_TOKENS
+
+
+def plan_entry_batches(entries: List[Any]) -> List[List[int]]:
+    """
+    Split a section's entries into batches of entry indexes.
+
+    Consecutive entries are packed while their estimated output stays within
+    OPTIMIZATION_BATCH_OUTPUT_TOKENS (a batch always holds at least one
+    entry); if that yields more than OPTIMIZATION_MAX_BATCHES batches, the
+    entries are spread evenly over that many instead.
+
+    Args:
+        entries: The section's entries, in resume order
+
+    Returns:
+        Lists of entry indexes, in order; empty for an empty section
+    """
+    batches: List[List[int]] = []
+    budget = config.OPTIMIZATION_BATCH_OUTPUT_TOKENS
+    used = 0
+    for index, entry in enumerate(entries):
+        tokens = estimate_output_tokens(entry)
+        if batches and used + tokens <= budget:
+            batches[-1].append(index)
+            used += tokens
+        else:
+            batches.append([index])
+            used = tokens
+
+    max_batches = max(config.OPTIMIZATION_MAX_BATCHES, 1)
+    if len(batches) > max_batches:
+        size = math.ceil(len(entries) / max_batches)
+        batches = [list(range(start, min(start + size, len(entries)))) for start in range(0, len(entries), size)]
+    return batches
+
+
+def _batch_state(state: Dict[str, Any], section: str, indexes: List[int]) -> Dict[str, Any]:
+    """Slice the state's resume, and its prompt-ready section, down to the given entries of one section."""
+    resume_structured = dict(validated_resume(state))
+    entries = resume_structured.get(section) or []
+    resume_structured[section] = [entries[index] for index in indexes]
+    return {
+        "resume_structured": resume_structured,
+        "resume_sections": {**resume_sections(state), section: section_json(resume_structured[section])},
+        "job_description": state.get("job_description"),
+        "jd_analysis": state.get("jd_analysis"),
+    }
+
+
+def _batch_results(state: Dict[str, Any], section: str) -> Dict[int, dict]:
+    """Latest result per batch index for a section (a retry round appends newer ones)."""
+    results: Dict[int, dict] = {}
+    for batch in state.get("entry_batches") or []:
+        if batch.get("section") == section:
+            results[batch["index"]] = batch
+    return results
+
+
+def route_entry_batches(section: str, node_name: str, output_key: str, batch_node: str) -> Callable:
+    """
+    Build the conditional edge that fans a section out into batches.
+
+    The section goes straight to ``node_name`` (no batches) when its output
+    is already in the state, it is gated, an incremental run has a stored
+    result for it, or it has no entries; batches that already succeeded in
+    an earlier round are not re-dispatched.
+
+    Args:
+        section: Resume section (e.g., "experience")
+        node_name: Collecting node (e.g., "optimize_experience")
+        output_key: State key the collecting node writes
+        batch_node: Node that optimizes one batch
+
+    Returns:
+        Edge function returning ``node_name`` or a list of Sends to ``batch_node``
+    """
+    def route(state: Dict[str, Any]) -> Union[str, List[Send]]:
+        if (
+            state.get(output_key) is not None
+            or section in (state.get("section_gates") or {})
+            or has_stored_result(node_name, state)
+        ):
+            return node_name
+
+        entries = (state.get("resume_structured") or {}).get(section) or []
+        completed = {
+            index for index, batch in _batch_results(state, section).items()
+            if "optimizations" in batch
+        }
+        sends = [
+            Send(batch_node, {**_batch_state(state, section, indexes), "batch_index": index})
+            for index, indexes in enumerate(plan_entry_batches(entries))
+            if index not in completed
+        ]
+        if not sends:
+            return node_name
+        ENTRY_BATCHES.observe(len(sends), section=section)
+        logger.info(f"Optimizing {len(entries)} {section} entries in {len(sends)} parallel batch(es)")
+        return sends
+
+    # LangGraph names branches after the function; one per section on the same node
+    route.__name__ = f"route_{section}_batches"
+    return route
+
+
+def entry_batch_node(section: str, output_key: str, func: Callable) -> Callable:
+    """
+    Wrap a section optimizer to run on one batch dispatched by route_entry_batches.
+
+    Args:
+        section: Resume section (e.g., "experience")
+        output_key: State key the optimizer writes
+        func: Section optimization node
+
+    Returns:
+        Node function taking the Send payload and appending
+        ``{"section", "index", "optimizations" | "error"}`` to entry_batches
+    """
+    @functools.wraps(func)
+    def node(payload: Dict[str, Any]) -> Dict[str, Any]:
+        index = payload["batch_index"]
+        try:
+            optimizations = func(payload).get(output_key) or []
+        except Exception as e:
+            # Reported by the collecting node so the section fails as a whole
+            logger.warning(f"{section} batch {index} failed: {type(e).__name__}: {e}")
+            return {"entry_batches": [{"section": section, "index": index, "error": f"{type(e).__name__}: {e}"}]}
+        return {"entry_batches": [{"section": section, "index": index, "optimizations": optimizations}]}
+
+    return node
+
+
+def collect_entry_batches(section: str, output_key: str, func: Callable) -> Callable:
+    """
+    Build the node that merges a section's batch results in entry order.
+
+    Batches that were never dispatched (e.g. an incremental lookup that
+    expired between routing and collection) are optimized inline.
+
+    Args:
+        section: Resume section (e.g., "experience")
+        output_key: State key to write the merged list to
+        func: Section optimization node, for inline batches
+
+    Returns:
+        Node function returning ``{output_key: [SectionOptimization dicts]}``
+
+    Raises:
+        ValueError: If any batch failed; the section is then reported as
+            failed and a partial retry re-dispatches only the failed batches
+    """
+    @functools.wraps(func)
+    def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        entries = (state.get("resume_structured") or {}).get(section) or []
+        results = _batch_results(state, section)
+
+        merged: List[dict] = []
+        errors: List[str] = []
+        for index, indexes in enumerate(plan_entry_batches(entries)):
+            batch: Optional[dict] = results.get(index)
+            if batch is None:
+                batch = {"optimizations": func(_batch_state(state, section, indexes)).get(output_key) or []}
+            if "error" in batch:
+                errors.append(f"batch {index}: {batch['error']}")
+                continue
+            merged.extend(batch["optimizations"])
+
+        if errors:
+            raise ValueError(f"{len(errors)} {section} batch(es) failed: {'; '.join(errors)}")
+        return {output_key: merged}
+
+    return node
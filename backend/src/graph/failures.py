@@ -0,0 +1,135 @@
+"""
+Partial-failure handling for the scoring and optimization graphs.
+
+Section nodes are wrapped with ``tolerate_failure`` so an exception (bad
+JSON, quota, timeout) is recorded as a NodeFailure in ``node_failures``
+instead of failing the whole graph. The aggregation and merge nodes then
+build a result from the sections that completed and flag it as degraded.
+
+Because a wrapped node skips itself when its output is already in the
+state, re-invoking a graph with a previous result re-runs only the nodes
+that failed (``invoke_with_partial_retry`` / ``partial_retry_state``).
+"""
+
+import functools
+from typing import Dict, Any, Callable, List, Optional
+from src.graph.checkpointing import resume_input, thread_config
+from src.models.schemas import NodeFailure
+from src.utils.llm_utils import RETRYABLE_LLM_ERRORS
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# State keys that are recomputed on every run rather than carried into a retry
+_DERIVED_KEYS = ("node_failures", "final_score", "optimization_result")
+
+
+def _is_retryable(error: Exception) -> bool:
+    # ValueError covers unparseable or invalid model output, which a fresh
+    # sample usually fixes; anything else is likely a bug in the node
+    return isinstance(error, RETRYABLE_LLM_ERRORS + (ValueError,))
+
+
+def skip_if_completed(node_name: str, output_key: str, func: Callable) -> Callable:
+    """Wrap a node so it returns no update when ``output_key`` is already in the state."""
+    @functools.wraps(func)
+    def wrapper(state, *args, **kwargs):
+        if state.get(output_key) is not None:
+            logger.info(f"Reusing completed {node_name} result")
+            return {}
+        return func(state, *args, **kwargs)
+    
+    return wrapper
+
+
+def tolerate_failure(node_name: str, section: str, output_key: str, func: Callable) -> Callable:
+    """
+    Wrap a section node so failures are recorded in the state instead of raised.
+    
+    Args:
+        node_name: Node name as registered with add_node (e.g., "score_skills")
+        section: Resume section the node handles (e.g., "skills")
+        output_key: State key the node writes (e.g., "skills_score")
+        func: Node function taking the state dict
+    
+    Returns:
+        Wrapped node function returning either the node's update, an empty
+        update if ``output_key`` is already present, or
+        ``{"node_failures": [NodeFailure as dict]}``
+    """
+    func = skip_if_completed(node_name, output_key, func)
+    
+    @functools.wraps(func)
+    def wrapper(state, *args, **kwargs):
+        try:
+            return func(state, *args, **kwargs)
+        except Exception as e:
+            logger.warning(f"{node_name} failed, continuing without {section}: {type(e).__name__}: {e}")
+            failure = NodeFailure(
+                node=node_name,
+                section=section,
+                error_type=type(e).__name__,
+                message=str(e)[:500],
+                retryable=_is_retryable(e),
+            )
+            return {"node_failures": [failure.model_dump()]}
+    
+    return wrapper
+
+
+def failed_sections(state: Dict[str, Any]) -> List[str]:
+    """Sections recorded as failed in the state, in node order."""
+    sections: List[str] = []
+    for failure in state.get("node_failures") or []:
+        if failure.get("section") not in sections:
+            sections.append(failure.get("section"))
+    return sections
+
+
+def partial_retry_state(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Build the input for re-running only the failed nodes of a graph result.
+    
+    Completed section outputs are kept so their nodes skip; failures and the
+    aggregated result are dropped so they are recomputed.
+    
+    Returns:
+        State to invoke the same graph with, or None if no retryable node failed
+    """
+    failures = result.get("node_failures") or []
+    if not any(failure.get("retryable", True) for failure in failures):
+        return None
+    return {key: value for key, value in result.items() if key not in _DERIVED_KEYS}
+
+
+def invoke_with_partial_retry(
+    graph,
+    initial_state: Optional[Dict[str, Any]],
+    retries: int = 0,
+    thread_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Invoke a graph, then re-run only its failed section nodes up to ``retries`` times.
+    
+    Args:
+        graph: Compiled scoring or optimization graph
+        initial_state: Graph input (may be None when resuming thread_id)
+        retries: Extra rounds allowed for failed nodes (0 returns the first result)
+        thread_id: Run id for checkpointed graphs; an interrupted or finished
+            run with this id is resumed instead of started again
+    
+    Returns:
+        Final graph state; ``node_failures`` lists what still failed
+    """
+    config = thread_config(graph, thread_id)
+    graph_input, _ = resume_input(graph, initial_state, config)
+    result = graph.invoke(graph_input, config)
+    for attempt in range(retries):
+        retry_state = partial_retry_state(result)
+        if retry_state is None:
+            break
+        logger.info(f"Re-running failed sections {failed_sections(result)} (round {attempt + 1}/{retries})")
+        config = thread_config(graph, thread_id, attempt + 1)
+        graph_input, _ = resume_input(graph, retry_state, config)
+        result = graph.invoke(graph_input, config)
+    return result
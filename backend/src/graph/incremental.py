@@ -0,0 +1,180 @@
+"""
+Incremental re-scoring: reuse section results whose input hasn't changed.
+
+Every scoring and optimization node depends on exactly one slice of the
+request: its section of ResumeStructured (the summary optimizer: the
+resume's first paragraph) plus the job description. Node outputs are stored
+under a hash of that slice, the whitespace-normalized JD and the settings
+that shape the prompt and output: the job requirements from the JD analysis,
+LLM_RESPONSE_SCHEMA and the section gating config. In incremental
+mode (``incremental`` in the graph state) a node whose input hash is already
+stored returns the stored output without calling the LLM, so after editing
+one section only that section's node runs and the result is re-aggregated.
+
+Outputs are always stored (when SECTION_CACHE_ENABLED), so the first full
+run seeds later incremental runs. Only a node's own output is stored:
+scores taken from a fused scoring call never reach the store.
+"""
+
+import functools
+import hashlib
+import json
+import threading
+from typing import Dict, Any, Callable, Optional
+from src import config
+from src.agents.summary_agent import extract_current_summary
+from src.utils.cache_utils import LLMResponseCache
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import REGISTRY
+from src.utils.text_utils import format_job_requirements, normalize_whitespace
+
+logger = get_logger(__name__)
+
+# Bump when prompts or output handling change so stale results aren't reused
+SECTION_RESULT_VERSION = 3
+
+SECTION_RESULT_LOOKUPS = REGISTRY.counter(
+    "section_result_lookups",
+    "Incremental-mode lookups of stored section results, by node and result (hit/miss)",
+    ("node", "result"),
+)
+
+
+def _resume_section(section: str) -> Callable[[Dict[str, Any]], Any]:
+    return lambda state: (state.get("resume_structured") or {}).get(section)
+
+
+# Node name -> the slice of state (besides the JD) its output depends on
+SECTION_INPUTS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "score_skills": _resume_section("skills"),
+    "score_experience": _resume_section("experience"),
+    "score_education": _resume_section("education"),
+    "score_projects": _resume_section("projects"),
+    "score_meta": _resume_section("meta"),
+    "optimize_summary": lambda state: extract_current_summary(state.get("resume_text") or ""),
+    "optimize_experience": _resume_section("experience"),
+    "optimize_skills": _resume_section("skills"),
+    "optimize_projects": _resume_section("projects"),
+    "optimize_education": _resume_section("education"),
+}
+
+_store: Optional[LLMResponseCache] = None
+_store_disabled = not config.SECTION_CACHE_ENABLED
+_store_lock = threading.Lock()
+
+
+def get_section_store() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide section result store, creating it on first use.
+
+    Returns:
+        The shared store (an LLMResponseCache on its own file), or None if
+        disabled or the file could not be opened
+    """
+    global _store, _store_disabled
+    if _store_disabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None and not _store_disabled:
+                try:
+                    _store = LLMResponseCache(
+                        config.SECTION_CACHE_PATH,
+                        ttl_seconds=config.SECTION_CACHE_TTL_SECONDS,
+                        max_bytes=int(config.SECTION_CACHE_MAX_MB * 1024 * 1024),
+                    )
+                    logger.info(f"Section result store enabled at {config.SECTION_CACHE_PATH}")
+                except Exception as e:
+                    logger.warning(f"Failed to open section result store, incremental mode disabled: {e}")
+                    _store_disabled = True
+    return _store
+
+
+def section_input_hash(node_name: str, state: Dict[str, Any]) -> str:
+    """
+    Hash exactly the input a section node depends on.
+
+    Args:
+        node_name: Node name (a key of SECTION_INPUTS)
+        state: Graph state
+
+    Returns:
+        Hex SHA-256 of the node, its section content, the normalized JD, the
+        job requirements added to its prompt, the model identity and the
+        config that changes its prompt or output
+    """
+    payload = json.dumps(
+        {
+            "node": node_name,
+            "version": SECTION_RESULT_VERSION,
+            "model": f"{config.LLM_BACKEND}/{config.GEMINI_MODEL_NAME}",
+            "section": SECTION_INPUTS[node_name](state),
+            "job_description": normalize_whitespace(state.get("job_description") or ""),
+            "job_requirements": format_job_requirements(state.get("jd_analysis")),
+            "response_schema": config.LLM_RESPONSE_SCHEMA,
+            "section_gating": [config.SECTION_GATING_ENABLED, config.SECTION_GATING_EXCLUDE_NOT_APPLICABLE],
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def has_stored_result(node_name: str, state: Dict[str, Any]) -> bool:
+    """
+    Whether an incremental run would reuse a stored output for this node.
+
+    Lets callers that prepare work for a node (e.g. dispatching its batches)
+    skip it; doesn't count as a lookup.
+    """
+    if not state.get("incremental"):
+        return False
+    store = get_section_store()
+    if store is None:
+        return False
+    try:
+        return store.get(section_input_hash(node_name, state)) is not None
+    except Exception:
+        return False
+
+
+def reuse_section_result(node_name: str, output_key: str, func: Callable) -> Callable:
+    """
+    Wrap a section node so unchanged inputs reuse the stored output.
+
+    Args:
+        node_name: Node name (a key of SECTION_INPUTS)
+        output_key: State key the node writes
+        func: Node function taking the state dict
+
+    Returns:
+        Wrapped node function; in incremental mode a stored output is
+        returned as ``{output_key: output}`` without running the node
+    """
+    @functools.wraps(func)
+    def wrapper(state, *args, **kwargs):
+        store = get_section_store()
+        if store is None:
+            return func(state, *args, **kwargs)
+
+        key = section_input_hash(node_name, state)
+        if state.get("incremental"):
+            try:
+                stored = store.get(key)
+            except Exception as e:
+                logger.warning(f"Section result lookup failed for {node_name}: {e}")
+                stored = None
+            SECTION_RESULT_LOOKUPS.inc(node=node_name, result="hit" if stored is not None else "miss")
+            if stored is not None:
+                logger.info(f"Reusing stored {node_name} result, section unchanged")
+                return {output_key: json.loads(stored)}
+
+        update = func(state, *args, **kwargs)
+        if update and update.get(output_key) is not None:
+            try:
+                store.set(key, json.dumps(update[output_key]))
+            except Exception as e:
+                logger.warning(f"Section result store failed for {node_name}: {e}")
+        return update
+
+    return wrapper
@@ -0,0 +1,250 @@
+"""
+Job description analysis shared across requests.
+
+Runs the extractor agent (key skills, responsibilities, role, seniority,
+tech stack) and the orchestrator agent (section weights, focus areas) once
+per job description. Results are keyed by a hash of the whitespace-normalized
+JD and kept in memory and in the section result store, so the many candidates
+applying to one posting share a single analysis. Concurrent requests for a JD
+whose analysis is still running wait for it instead of starting their own.
+
+The analysis feeds the section prompts (a compact requirements block) and
+aggregate_scores (section weights, blended with and bounded by the defaults).
+It is off unless JD_ANALYSIS_ENABLED is set, and best effort: if it fails,
+the graphs use the raw JD and the default weights.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from src import config
+from src.agents.extractor_agent import extractor_optimization_node
+from src.agents.orchestrator_agent import orchestrator_optimization_node
+from src.graph.incremental import get_section_store
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import REGISTRY
+from src.utils.text_utils import normalize_whitespace
+
+logger = get_logger(__name__)
+
+# Bump when the extractor/orchestrator prompts or output handling change
+JD_ANALYSIS_VERSION = 1
+
+JD_ANALYSIS_LOOKUPS = REGISTRY.counter(
+    "jd_analysis_lookups",
+    "JD analysis lookups, by where the result came from (memory/store/inflight/computed)",
+    ("result",),
+)
+
+# Scoring sections the orchestrator weighs; meta (seniority, domains,
+# languages) has no counterpart in its output and keeps its default weight
+SCORING_WEIGHT_SECTIONS = ("skills", "experience", "education", "projects")
+
+# An analysis can move a section's weight to at most this factor above or below its default
+WEIGHT_CLAMP_FACTOR = 2.0
+
+
+class _InFlight:
+    """An analysis being computed by one request and awaited by others."""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+
+
+_memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_inflight: Dict[str, _InFlight] = {}
+_lock = threading.Lock()
+
+
+def jd_hash(job_description: str) -> str:
+    """
+    Hash a job description for analysis sharing.
+
+    Args:
+        job_description: Raw job description text
+
+    Returns:
+        Hex SHA-256 of the whitespace-normalized JD and the model identity
+    """
+    payload = json.dumps(
+        {
+            "kind": "jd_analysis",
+            "version": JD_ANALYSIS_VERSION,
+            "model": f"{config.LLM_BACKEND}/{config.GEMINI_MODEL_NAME}",
+            "job_description": normalize_whitespace(job_description),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _compute(job_description: str) -> Dict[str, Any]:
+    """Run the extractor then the orchestrator agent (2 LLM calls)."""
+    state: Dict[str, Any] = {"job_description": job_description}
+    state.update(extractor_optimization_node(state))
+    state.update(orchestrator_optimization_node(state))
+    state.pop("job_description")
+    return state
+
+
+def _remember(key: str, analysis: Dict[str, Any]) -> None:
+    """Add an analysis to the in-memory LRU. Caller holds the lock."""
+    _memory[key] = analysis
+    _memory.move_to_end(key)
+    while len(_memory) > max(config.JD_ANALYSIS_MEMORY_ENTRIES, 0):
+        _memory.popitem(last=False)
+
+
+def _load(key: str) -> Optional[Dict[str, Any]]:
+    store = get_section_store()
+    if store is None:
+        return None
+    try:
+        stored = store.get(key)
+        return json.loads(stored) if stored is not None else None
+    except Exception as e:
+        logger.warning(f"JD analysis lookup failed: {e}")
+        return None
+
+
+def _save(key: str, analysis: Dict[str, Any]) -> None:
+    store = get_section_store()
+    if store is None:
+        return
+    try:
+        store.set(key, json.dumps(analysis))
+    except Exception as e:
+        logger.warning(f"JD analysis store failed: {e}")
+
+
+def get_jd_analysis(job_description: str) -> Dict[str, Any]:
+    """
+    Get the analysis of a job description, computing it at most once.
+
+    Looks in memory, then the persistent store; on a miss the first caller
+    runs the analysis while concurrent callers for the same JD wait for its
+    result (or its exception).
+
+    Args:
+        job_description: Raw job description text
+
+    Returns:
+        Dict with job_key_skills, job_key_responsibilities, job_role,
+        job_seniority, job_tech_stack, section_weights, focus_areas and
+        optimization_strategy
+
+    Raises:
+        Whatever the extractor or orchestrator agent raised
+    """
+    key = jd_hash(job_description)
+    with _lock:
+        cached = _memory.get(key)
+        if cached is not None:
+            _memory.move_to_end(key)
+            JD_ANALYSIS_LOOKUPS.inc(result="memory")
+            return cached
+        inflight = _inflight.get(key)
+        leader = inflight is None
+        if leader:
+            inflight = _inflight[key] = _InFlight()
+
+    if not leader:
+        JD_ANALYSIS_LOOKUPS.inc(result="inflight")
+        logger.info("Waiting for in-flight analysis of this job description")
+        inflight.event.wait()
+        if inflight.error is not None:
+            raise inflight.error
+        return inflight.result
+
+    try:
+        analysis = _load(key)
+        if analysis is not None:
+            JD_ANALYSIS_LOOKUPS.inc(result="store")
+            logger.info("Reusing stored job description analysis")
+        else:
+            JD_ANALYSIS_LOOKUPS.inc(result="computed")
+            analysis = _compute(job_description)
+            _save(key, analysis)
+        inflight.result = analysis
+        with _lock:
+            _remember(key, analysis)
+        return analysis
+    except Exception as e:
+        inflight.error = e
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        inflight.event.set()
+
+
+def analyze_jd_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LangGraph node function to attach the shared JD analysis to the state.
+
+    Expects in state:
+        - job_description: str - Job description text
+
+    Returns updated state with:
+        - jd_analysis: dict - See get_jd_analysis; empty if disabled or failed
+
+    Args:
+        state: LangGraph state dictionary
+
+    Returns:
+        Updated state with jd_analysis key
+    """
+    job_description = state.get("job_description")
+    if not config.JD_ANALYSIS_ENABLED or not job_description:
+        return {"jd_analysis": {}}
+    try:
+        return {"jd_analysis": get_jd_analysis(job_description)}
+    except Exception as e:
+        logger.warning(f"Job description analysis failed, using the raw JD and default weights: {e}")
+        return {"jd_analysis": {}}
+
+
+def scoring_weights(
+    jd_analysis: Optional[Dict[str, Any]],
+    default_weights: Dict[str, float],
+    blend: Optional[float] = None,
+) -> Dict[str, float]:
+    """
+    Blend the analysis' section weights into the default scoring weights.
+
+    The analysis redistributes the default weight of skills, experience,
+    education and projects among them; each proposed weight is clamped to
+    within WEIGHT_CLAMP_FACTOR of its default and blended with it, so a
+    model's weighting can shift scores but not dominate them.
+
+    Args:
+        jd_analysis: Output of analyze_jd_node (may be None or empty)
+        default_weights: Weights used when the analysis has none or they're invalid
+        blend: Share of the analysis' weights, 0-1 (defaults to JD_ANALYSIS_WEIGHT_BLEND)
+
+    Returns:
+        Weights for skills, experience, education, projects and meta, summing to 1.0
+    """
+    blend = min(max(config.JD_ANALYSIS_WEIGHT_BLEND if blend is None else blend, 0.0), 1.0)
+    section_weights = (jd_analysis or {}).get("section_weights") or {}
+    proposed = {section: section_weights.get(section) for section in SCORING_WEIGHT_SECTIONS}
+    if blend == 0 or not all(isinstance(weight, (int, float)) and weight >= 0 for weight in proposed.values()):
+        return dict(default_weights)
+    total = sum(proposed.values())
+    if total <= 0:
+        return dict(default_weights)
+
+    share = sum(default_weights[section] for section in SCORING_WEIGHT_SECTIONS)
+    weights = dict(default_weights)
+    for section, weight in proposed.items():
+        default = default_weights[section]
+        clamped = min(max(weight / total * share, default / WEIGHT_CLAMP_FACTOR), default * WEIGHT_CLAMP_FACTOR)
+        weights[section] = (1 - blend) * default + blend * clamped
+    total = sum(weights.values())
+    return {section: weight / total for section, weight in weights.items()}
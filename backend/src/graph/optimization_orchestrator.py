@@ -1,20 +1,29 @@
 """
 LangGraph Orchestrator for Multi-Agent Resume Optimization.
 
-Orchestrates the flow: Parallel Section Optimization → Merge Results
+Orchestrates the flow: Resume Preparation + JD Analysis → Section Gating → Parallel Section Optimization → Merge Results
+Experience, projects and education entries are optimized in parallel batches (src.graph.entry_batching).
 Similar to ATS scoring - receives structured resume directly, no extraction needed.
 """
 
-from typing import TypedDict, Optional, List
-from langgraph.graph import StateGraph, END
+import operator
+from typing import Annotated, TypedDict, Optional, List
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import StateGraph, START, END
 from src.models.schemas import ResumeStructured, OptimizationResult, SectionOptimization
-from src.agents.resume_extractor import extract_resume_node
+from src.agents.resume_extractor import prepare_resume_node
 from src.agents.summary_agent import summary_optimization_node
 from src.agents.experience_agent import experience_optimization_node
 from src.agents.skills_agent import skills_optimization_node
 from src.agents.projects_agent import projects_optimization_node
 from src.agents.education_agent import education_optimization_node
+from src.graph.failures import failed_sections, skip_if_completed, tolerate_failure
+from src.graph.entry_batching import collect_entry_batches, entry_batch_node, route_entry_batches
+from src.graph.incremental import reuse_section_result
+from src.graph.jd_analysis import analyze_jd_node
+from src.graph.section_gating import gate_optimization_sections_node, gate_section, skipped_sections
 from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import instrument_node
 
 logger = get_logger(__name__)
 
@@ -24,18 +33,28 @@ class OptimizationState(TypedDict, total=False):
     resume_text: str
     job_description: str
     resume_structured: dict  # ResumeStructured as dict
+    resume_sections: dict  # Section name -> prompt-ready JSON, shared read-only by the nodes (src.utils.resume_utils)
+    jd_analysis: dict  # Shared JD requirements and section weights (src.graph.jd_analysis)
+    section_gates: dict  # Section name -> placeholder gate for sections that skip the LLM (src.graph.section_gating)
     summary_optimization: dict  # SectionOptimization as dict
     experience_optimizations: List[dict]  # List of SectionOptimization as dict
     skills_optimization: dict  # SectionOptimization as dict
     projects_optimizations: List[dict]  # List of SectionOptimization as dict
     education_optimizations: List[dict]  # List of SectionOptimization as dict
     optimization_result: dict  # OptimizationResult as dict
+    node_failures: Annotated[List[dict], operator.add]  # NodeFailure dicts from failed section nodes
+    entry_batches: Annotated[List[dict], operator.add]  # Per-batch results of the experience/projects/education fan-out
+    incremental: bool  # Reuse stored results for sections whose content didn't change
+    input_hash: str  # Hash of the run's initial input, checked when a request resumes its thread (src.graph.checkpointing)
 
 
 def merge_optimizations_node(state: OptimizationState) -> OptimizationState:
     """
     Merge all section optimizations into a final OptimizationResult.
     
+    Sections whose node failed are left out and the result is flagged as
+    degraded.
+    
     Args:
         state: Current optimization state with all section optimizations
     
@@ -121,6 +140,10 @@ def merge_optimizations_node(state: OptimizationState) -> OptimizationState:
     if total_sections > 0:
         overall_improvements.append(f"Optimized {total_sections} section(s) for better ATS match")
     
+    failed = failed_sections(state)
+    if failed:
+        overall_improvements.append(f"Partial result: {', '.join(failed)} could not be optimized")
+    
     # Create OptimizationResult
     optimization_result = OptimizationResult(
         summary=summary,
@@ -128,48 +151,45 @@ def merge_optimizations_node(state: OptimizationState) -> OptimizationState:
         skills=skills,
         projects=projects,
         education=education,
-        overall_improvements=overall_improvements
+        overall_improvements=overall_improvements,
+        degraded=bool(failed),
+        failed_sections=failed,
+        skipped_sections=skipped_sections(state),
     )
     
-    logger.info(f"Optimization merge complete: {total_sections} sections optimized")
+    if failed:
+        logger.warning(f"Optimization merge complete: {total_sections} sections optimized (degraded, failed: {', '.join(failed)})")
+    else:
+        logger.info(f"Optimization merge complete: {total_sections} sections optimized")
     
     return {
         "optimization_result": optimization_result.model_dump()
     }
 
 
-def prepare_resume_node(state: OptimizationState) -> OptimizationState:
-    """
-    Prepare resume data - extract if needed, otherwise use provided structured data.
-    If structured data is provided, skip extraction (no API call).
-    If only text is provided, extract structured data (1 API call).
-    """
-    resume_structured = state.get("resume_structured")
-    resume_text = state.get("resume_text")
-    
-    # If structured data already provided, skip extraction (no API call)
-    if resume_structured:
-        logger.info("Using provided structured resume data - skipping extraction")
-        return {}  # No-op, structured data already in state
-    
-    # Otherwise extract from text (1 API call)
-    if resume_text:
-        logger.info("Extracting structured resume from text")
-        result = extract_resume_node(state)
-        return result
-    
-    raise ValueError("Either resume_structured or resume_text must be provided")
-
-
-def build_optimization_app() -> StateGraph:
+def build_optimization_app(checkpointer: Optional[BaseCheckpointSaver] = None) -> StateGraph:
     """
     Build and compile the LangGraph optimization application.
     
     Similar to ATS scoring architecture:
-    - Extract/prepare resume first (1 call)
-    - Then run 5 parallel optimization agents (5 calls)
+    - Extract/prepare resume first (1 call), alongside the JD analysis
+      (2 calls with JD_ANALYSIS_ENABLED, only for a JD not analyzed before;
+      see src.graph.jd_analysis)
+    - Then run 5 parallel optimization agents (5 calls); experience, projects
+      and education fan out into one call per batch of entries
     - Merge results
-    - Total: 6 API calls (same as ATS scoring)
+    - Total: 6 API calls per request once the JD has been analyzed, plus one
+      per extra batch
+    
+    Failing optimization nodes are recorded in node_failures and merged
+    into a degraded partial result; see src.graph.failures. With
+    ``incremental`` set, unchanged sections reuse stored optimizations
+    (src.graph.incremental). Empty or irrelevant sections are answered
+    with placeholders and no LLM call (src.graph.section_gating).
+    
+    Args:
+        checkpointer: Optional checkpoint saver; when given, runs invoked with
+            a thread_id can be resumed after a crash or timeout
     
     Returns:
         Compiled LangGraph StateGraph ready for execution
@@ -180,37 +200,78 @@ def build_optimization_app() -> StateGraph:
     workflow = StateGraph(OptimizationState)
     
     # Add nodes
-    workflow.add_node("prepare_resume", prepare_resume_node)  # Extract or use structured resume
-    workflow.add_node("optimize_summary", summary_optimization_node)
-    workflow.add_node("optimize_experience", experience_optimization_node)
-    workflow.add_node("optimize_skills", skills_optimization_node)
-    workflow.add_node("optimize_projects", projects_optimization_node)
-    workflow.add_node("optimize_education", education_optimization_node)
-    workflow.add_node("merge_optimizations", merge_optimizations_node)
+    workflow.add_node("prepare_resume", skip_if_completed(  # Extract or use structured resume
+        "prepare_resume", "resume_sections",
+        instrument_node("optimization", "prepare_resume", prepare_resume_node),
+    ))
+    workflow.add_node("analyze_jd", skip_if_completed(
+        "analyze_jd", "jd_analysis",
+        instrument_node("optimization", "analyze_jd", analyze_jd_node),
+    ))
+    workflow.add_node("gate_sections", skip_if_completed(
+        "gate_sections", "section_gates",
+        instrument_node("optimization", "gate_sections", gate_optimization_sections_node),
+    ))
+    batched_sections = ("experience", "projects", "education")
+    for section, output_key, node in (
+        ("summary", "summary_optimization", summary_optimization_node),
+        ("experience", "experience_optimizations", experience_optimization_node),
+        ("skills", "skills_optimization", skills_optimization_node),
+        ("projects", "projects_optimizations", projects_optimization_node),
+        ("education", "education_optimizations", education_optimization_node),
+    ):
+        if section in batched_sections:
+            # Batches run the agent on slices of the section; optimize_<section> merges them
+            workflow.add_node(f"{section}_batch", instrument_node(
+                "optimization", f"{section}_batch", entry_batch_node(section, output_key, node),
+            ))
+            node = collect_entry_batches(section, output_key, node)
+        workflow.add_node(f"optimize_{section}", tolerate_failure(
+            f"optimize_{section}", section, output_key,
+            gate_section(section, output_key, reuse_section_result(
+                f"optimize_{section}", output_key,
+                instrument_node("optimization", f"optimize_{section}", node),
+            )),
+        ))
+    workflow.add_node("merge_optimizations", instrument_node("optimization", "merge_optimizations", merge_optimizations_node))
     
     # Define edges - same pattern as ATS scoring
-    # Start → prepare_resume
-    workflow.set_entry_point("prepare_resume")
-    
-    # prepare_resume → all section optimization nodes (parallel fan-out)
-    workflow.add_edge("prepare_resume", "optimize_summary")
-    workflow.add_edge("prepare_resume", "optimize_experience")
-    workflow.add_edge("prepare_resume", "optimize_skills")
-    workflow.add_edge("prepare_resume", "optimize_projects")
-    workflow.add_edge("prepare_resume", "optimize_education")
-    
-    # All section nodes → merge_optimizations (fan-in)
-    workflow.add_edge("optimize_summary", "merge_optimizations")
-    workflow.add_edge("optimize_experience", "merge_optimizations")
-    workflow.add_edge("optimize_skills", "merge_optimizations")
-    workflow.add_edge("optimize_projects", "merge_optimizations")
-    workflow.add_edge("optimize_education", "merge_optimizations")
+    # Start → prepare_resume and analyze_jd (in parallel)
+    workflow.add_edge(START, "prepare_resume")
+    workflow.add_edge(START, "analyze_jd")
+    
+    # prepare_resume + analyze_jd → gate_sections
+    workflow.add_edge(["prepare_resume", "analyze_jd"], "gate_sections")
+    
+    # gate_sections → all section optimization nodes (parallel fan-out)
+    workflow.add_edge("gate_sections", "optimize_summary")
+    workflow.add_edge("gate_sections", "optimize_skills")
+    
+    # gate_sections → batches of entries (map-style Send) → optimize_<section>
+    # merging them in order, or straight to optimize_<section> when no batch is needed
+    for section, output_key in (
+        ("experience", "experience_optimizations"),
+        ("projects", "projects_optimizations"),
+        ("education", "education_optimizations"),
+    ):
+        workflow.add_conditional_edges(
+            "gate_sections",
+            route_entry_batches(section, f"optimize_{section}", output_key, f"{section}_batch"),
+            [f"{section}_batch", f"optimize_{section}"],
+        )
+        workflow.add_edge(f"{section}_batch", f"optimize_{section}")
+    
+    # All section nodes → merge_optimizations (fan-in; batched sections finish a step later)
+    workflow.add_edge(
+        ["optimize_summary", "optimize_experience", "optimize_skills", "optimize_projects", "optimize_education"],
+        "merge_optimizations",
+    )
     
     # merge_optimizations → END
     workflow.add_edge("merge_optimizations", END)
     
     # Compile the graph
-    app = workflow.compile()
+    app = workflow.compile(checkpointer=checkpointer, name="optimization")
     logger.info("LangGraph optimization application compiled successfully")
     
     return app
@@ -1,40 +1,113 @@
 """
 LangGraph Orchestrator for Multi-Agent Resume Matching.
 
-Orchestrates the flow: Resume Extraction → Parallel Section Scoring → Score Aggregation
+Orchestrates the flow: Resume Extraction + JD Analysis → Section Gating → (Fused Scoring) → Parallel Section Scoring → Score Aggregation
 """
 
-from typing import TypedDict, Optional, List
-from langgraph.graph import StateGraph, END
+import functools
+import operator
+from typing import Annotated, Callable, TypedDict, Optional, List
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import StateGraph, START, END
+from src import config
 from src.models.schemas import ResumeStructured, SectionScore, FinalScore
-from src.agents.resume_extractor import extract_resume_node
+from src.agents.resume_extractor import prepare_resume_node
 from src.agents.skills_agent import skills_scoring_node
 from src.agents.experience_agent import experience_scoring_node
 from src.agents.education_agent import education_scoring_node
 from src.agents.projects_agent import projects_scoring_node
 from src.agents.meta_agent import meta_scoring_node
+from src.agents.fused_scoring_agent import fused_scoring_node
+from src.graph.failures import failed_sections, skip_if_completed, tolerate_failure
+from src.graph.incremental import reuse_section_result
+from src.graph.jd_analysis import analyze_jd_node, scoring_weights
+from src.graph.section_gating import gate_scoring_sections_node, gate_section, not_applicable_sections, skipped_sections
 from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import instrument_node
 
 logger = get_logger(__name__)
 
+# Section weights used when the JD analysis provides none
+DEFAULT_SECTION_WEIGHTS = {
+    "skills": 0.35,
+    "experience": 0.35,
+    "education": 0.15,
+    "projects": 0.10,
+    "meta": 0.05,
+}
+
 
 class OrchestratorState(TypedDict, total=False):
     """LangGraph state type for the orchestrator."""
     resume_text: str
     job_description: str
     resume_structured: dict  # ResumeStructured as dict
+    resume_sections: dict  # Section name -> prompt-ready JSON, shared read-only by the nodes (src.utils.resume_utils)
+    jd_analysis: dict  # Shared JD requirements and section weights (src.graph.jd_analysis)
     skills_score: dict  # SectionScore as dict
     experience_score: dict  # SectionScore as dict
     education_score: dict  # SectionScore as dict
     projects_score: dict  # SectionScore as dict
     meta_score: dict  # SectionScore as dict
     final_score: dict  # FinalScore as dict
+    node_failures: Annotated[List[dict], operator.add]  # NodeFailure dicts from failed section nodes
+    incremental: bool  # Reuse stored results for sections whose content didn't change
+    input_hash: str  # Hash of the run's initial input, checked when a request resumes its thread (src.graph.checkpointing)
+    scoring_mode: str  # "sections" or "fused"; defaults to SCORING_MODE
+    fused_scores: dict  # Section name -> SectionScore dict from the fused scoring call
+    section_gates: dict  # Section name -> placeholder gate for sections that skip the LLM (src.graph.section_gating)
+
+
+SCORING_MODES = ("sections", "fused")
+
+
+def fused_scoring_stage(state: OrchestratorState) -> OrchestratorState:
+    """
+    Score every section in one LLM call when fused mode is selected.
+    
+    A no-op in "sections" mode and for incremental requests, which usually
+    re-score only a section or two. If the call fails, every section falls
+    back to its own scoring node.
+    
+    Args:
+        state: Current orchestrator state with resume_structured
+    
+    Returns:
+        Updated state with fused_scores, or no update when not in fused mode
+    """
+    if (state.get("scoring_mode") or config.SCORING_MODE) != "fused" or state.get("incremental"):
+        return {}
+    try:
+        return fused_scoring_node(state)
+    except Exception as e:
+        logger.warning(f"Fused scoring failed, falling back to section agents: {type(e).__name__}: {e}")
+        return {"fused_scores": {}}
+
+
+def prefer_fused_score(section: str, output_key: str, func: Callable) -> Callable:
+    """Wrap a section scoring node so a valid fused score is used instead of calling the LLM."""
+    @functools.wraps(func)
+    def wrapper(state, *args, **kwargs):
+        score = (state.get("fused_scores") or {}).get(section)
+        if score is not None:
+            logger.info(f"Using fused {section} score")
+            return {output_key: score}
+        return func(state, *args, **kwargs)
+    
+    return wrapper
 
 
 def aggregate_scores_node(state: OrchestratorState) -> OrchestratorState:
     """
     Aggregate all section scores into a final weighted score.
     
+    Section weights are DEFAULT_SECTION_WEIGHTS, blended with the JD
+    analysis' weights when it ran (scoring_weights). Sections that failed or are missing are left
+    out and the remaining weights renormalized; the result is then flagged
+    as degraded. With SECTION_GATING_EXCLUDE_NOT_APPLICABLE, gated sections
+    that don't apply to the job are left out the same way but don't degrade
+    the result.
+    
     Args:
         state: Current orchestrator state with all section scores
     
@@ -44,13 +117,7 @@ def aggregate_scores_node(state: OrchestratorState) -> OrchestratorState:
     logger.info("Aggregating section scores")
     
     # Weights for each section
-    weights = {
-        "skills": 0.35,
-        "experience": 0.35,
-        "education": 0.15,
-        "projects": 0.10,
-        "meta": 0.05,
-    }
+    weights = scoring_weights(state.get("jd_analysis"), DEFAULT_SECTION_WEIGHTS)
     
     # Collect all section scores
     section_scores: List[SectionScore] = []
@@ -66,7 +133,13 @@ def aggregate_scores_node(state: OrchestratorState) -> OrchestratorState:
         "meta": state.get("meta_score"),
     }
     
+    failed = failed_sections(state)
+    not_applicable = not_applicable_sections(state)
+    
     for section_name, score_dict in section_keys.items():
+        if section_name in not_applicable:
+            logger.debug(f"{section_name}: not applicable, excluded from the overall score")
+            continue
         if score_dict:
             try:
                 score_obj = SectionScore(**score_dict)
@@ -77,8 +150,12 @@ def aggregate_scores_node(state: OrchestratorState) -> OrchestratorState:
                 logger.debug(f"{section_name}: {score_obj.score}/100 (weight: {weight})")
             except Exception as e:
                 logger.warning(f"Failed to parse {section_name} score: {e}")
+                if section_name not in failed:
+                    failed.append(section_name)
         else:
             logger.warning(f"Missing score for section: {section_name}")
+            if section_name not in failed:
+                failed.append(section_name)
     
     # Calculate overall score
     if total_weight > 0:
@@ -115,24 +192,54 @@ def aggregate_scores_node(state: OrchestratorState) -> OrchestratorState:
     else:
         comments.insert(0, "Weak match. Significant improvements needed to align with job requirements.")
     
+    if not_applicable:
+        comments.append(f"Not scored: {', '.join(not_applicable)} (not applicable to this resume and job).")
+    if failed:
+        comments.append(f"Partial result: {', '.join(failed)} could not be scored and were excluded from the overall score.")
+    
     # Create FinalScore
     final_score = FinalScore(
         overall_score=round(overall_score, 2),
         section_scores=section_scores,
-        comments=comments
+        comments=comments,
+        degraded=bool(failed),
+        failed_sections=failed,
+        skipped_sections=skipped_sections(state),
     )
     
-    logger.info(f"Final aggregated score: {overall_score:.2f}/100")
+    if failed:
+        logger.warning(f"Final aggregated score: {overall_score:.2f}/100 (degraded, failed: {', '.join(failed)})")
+    else:
+        logger.info(f"Final aggregated score: {overall_score:.2f}/100")
     
     return {
         "final_score": final_score.model_dump()
     }
 
 
-def build_langgraph_app() -> StateGraph:
+def build_langgraph_app(checkpointer: Optional[BaseCheckpointSaver] = None) -> StateGraph:
     """
     Build and compile the LangGraph application.
     
+    A failing section node doesn't fail the graph: it is recorded in
+    node_failures and aggregate_scores returns a degraded partial score.
+    Nodes whose output is already in the input state are skipped, so
+    invoking the graph with a previous result re-runs only what failed.
+    With ``incremental`` set, scoring nodes whose section and JD are
+    unchanged since a previous run reuse its output (src.graph.incremental).
+    With JD_ANALYSIS_ENABLED, the JD is analyzed alongside resume
+    extraction, once per distinct JD across requests (src.graph.jd_analysis). In fused mode (``scoring_mode``
+    or SCORING_MODE) one call scores all sections and the section nodes
+    only run for sections it didn't return valid scores for. Empty or
+    irrelevant sections are answered with placeholders and no LLM call
+    (src.graph.section_gating). The resume is validated once, when it is
+    extracted or when a provided resume_structured is prepared, and the
+    section nodes share its prompt-ready sections (src.utils.resume_utils).
+    
+    Args:
+        checkpointer: Optional checkpoint saver; when given, runs invoked with
+            a thread_id can be resumed after a crash or timeout
+    
     Returns:
         Compiled LangGraph StateGraph ready for execution
     """
@@ -142,24 +249,57 @@ def build_langgraph_app() -> StateGraph:
     workflow = StateGraph(OrchestratorState)
     
     # Add nodes
-    workflow.add_node("extract_resume", extract_resume_node)
-    workflow.add_node("score_skills", skills_scoring_node)
-    workflow.add_node("score_experience", experience_scoring_node)
-    workflow.add_node("score_education", education_scoring_node)
-    workflow.add_node("score_projects", projects_scoring_node)
-    workflow.add_node("score_meta", meta_scoring_node)
-    workflow.add_node("aggregate_scores", aggregate_scores_node)
+    workflow.add_node("extract_resume", skip_if_completed(
+        "extract_resume", "resume_sections",
+        instrument_node("analysis", "extract_resume", prepare_resume_node),
+    ))
+    workflow.add_node("analyze_jd", skip_if_completed(
+        "analyze_jd", "jd_analysis",
+        instrument_node("analysis", "analyze_jd", analyze_jd_node),
+    ))
+    workflow.add_node("gate_sections", skip_if_completed(
+        "gate_sections", "section_gates",
+        instrument_node("analysis", "gate_sections", gate_scoring_sections_node),
+    ))
+    workflow.add_node("fused_scoring", skip_if_completed(
+        "fused_scoring", "fused_scores",
+        instrument_node("analysis", "fused_scoring", fused_scoring_stage),
+    ))
+    for section, node in (
+        ("skills", skills_scoring_node),
+        ("experience", experience_scoring_node),
+        ("education", education_scoring_node),
+        ("projects", projects_scoring_node),
+        ("meta", meta_scoring_node),
+    ):
+        workflow.add_node(f"score_{section}", tolerate_failure(
+            f"score_{section}", section, f"{section}_score",
+            # A fused score is returned before the section store, which only holds the section agent's own scores
+            gate_section(section, f"{section}_score", prefer_fused_score(
+                section, f"{section}_score",
+                reuse_section_result(
+                    f"score_{section}", f"{section}_score",
+                    instrument_node("analysis", f"score_{section}", node),
+                ),
+            )),
+        ))
+    workflow.add_node("aggregate_scores", instrument_node("analysis", "aggregate_scores", aggregate_scores_node))
     
     # Define edges
-    # Start → extract_resume
-    workflow.set_entry_point("extract_resume")
+    # Start → extract_resume and analyze_jd (in parallel)
+    workflow.add_edge(START, "extract_resume")
+    workflow.add_edge(START, "analyze_jd")
+    
+    # extract_resume + analyze_jd → gate_sections → fused_scoring (a no-op unless fused mode is selected)
+    workflow.add_edge(["extract_resume", "analyze_jd"], "gate_sections")
+    workflow.add_edge("gate_sections", "fused_scoring")
     
-    # extract_resume → all section scoring nodes (parallel fan-out)
-    workflow.add_edge("extract_resume", "score_skills")
-    workflow.add_edge("extract_resume", "score_experience")
-    workflow.add_edge("extract_resume", "score_education")
-    workflow.add_edge("extract_resume", "score_projects")
-    workflow.add_edge("extract_resume", "score_meta")
+    # fused_scoring → all section scoring nodes (parallel fan-out)
+    workflow.add_edge("fused_scoring", "score_skills")
+    workflow.add_edge("fused_scoring", "score_experience")
+    workflow.add_edge("fused_scoring", "score_education")
+    workflow.add_edge("fused_scoring", "score_projects")
+    workflow.add_edge("fused_scoring", "score_meta")
     
     # All section nodes → aggregate_scores (fan-in)
     workflow.add_edge("score_skills", "aggregate_scores")
@@ -172,7 +312,7 @@ def build_langgraph_app() -> StateGraph:
     workflow.add_edge("aggregate_scores", END)
     
     # Compile the graph
-    app = workflow.compile()
+    app = workflow.compile(checkpointer=checkpointer, name="analysis")
     logger.info("LangGraph application compiled successfully")
     
     return app
@@ -0,0 +1,248 @@
+"""
+Section gating: skip LLM calls for empty or irrelevant sections.
+
+A gate node runs after extraction and the JD analysis, before the section
+fan-out, and decides from the structured resume and simple JD signals
+whether each section needs an LLM call. For sections that don't, it records
+a reason and a deterministic placeholder output in ``section_gates``; the
+wrapped section node then returns the placeholder instead of calling the
+model. Gates marked not applicable are only used with
+SECTION_GATING_EXCLUDE_NOT_APPLICABLE, since they leave the section out of
+the overall score; otherwise those sections are scored by the LLM as usual.
+
+Many student resumes have no projects or meta information, and many job
+descriptions state no education requirement, so these calls were pure
+waste.
+"""
+
+import functools
+import re
+from typing import Dict, Any, Callable, List, Optional
+from src import config
+from src.models.schemas import SectionScore, SectionOptimization
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import REGISTRY
+from src.utils.resume_utils import validated_resume
+
+logger = get_logger(__name__)
+
+SECTIONS_GATED = REGISTRY.counter(
+    "sections_gated",
+    "Section nodes answered with a placeholder instead of an LLM call",
+    ("graph", "section"),
+)
+
+# JD signals; a false positive only means the section gets an LLM call as before
+_EDUCATION_PATTERN = re.compile(
+    r"\b(degree|bachelor\w*|master'?s|ph\.?d|doctorate|mba|b\.?tech|m\.?tech|bsc|msc|[bm]\.?[sa]\.?"
+    r"|diploma|graduate|graduation|university|college|education\w*|certifi\w*|qualification\w*)\b",
+    re.IGNORECASE,
+)
+_PROJECTS_PATTERN = re.compile(
+    r"\b(projects?|portfolio|github|gitlab|open[- ]source|hackathons?|side work)\b",
+    re.IGNORECASE,
+)
+_ENTRY_LEVEL_PATTERN = re.compile(
+    r"\b(intern|internship|entry[- ]level|new grad\w*|fresher|freshers|graduate program"
+    r"|no (prior |previous )?experience (is )?(required|necessary))\b",
+    re.IGNORECASE,
+)
+
+
+def _gate(reason: str, output: Any, applicable: bool = True) -> Dict[str, Any]:
+    return {"reason": reason, "output": output, "applicable": applicable}
+
+
+def _placeholder_score(section: str, reason: str, missing: List[str]) -> dict:
+    return SectionScore(
+        section_name=section,
+        score=0,
+        reasons=[reason],
+        missing_requirements=missing,
+    ).model_dump()
+
+
+def _parse_resume(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    try:
+        return validated_resume(state)
+    except Exception as e:
+        # Leave validation errors to the section nodes, which report them per section
+        logger.warning(f"Section gating skipped, resume_structured is invalid: {e}")
+        return None
+
+
+def _meta_is_empty(resume: Dict[str, Any]) -> bool:
+    meta = resume.get("meta") or {}
+    return not (meta.get("seniority_level") or meta.get("domains") or meta.get("languages"))
+
+
+def scoring_gates(resume: Dict[str, Any], job_description: str, jd_analysis: Dict[str, Any]) -> Dict[str, dict]:
+    """
+    Decide which scoring sections can be answered without an LLM call.
+
+    Args:
+        resume: Validated resume (ResumeStructured as dict)
+        job_description: Raw job description text
+        jd_analysis: Shared JD analysis (may be empty)
+
+    Returns:
+        Section name -> gate ({"reason", "output", "applicable"}) for gated sections
+    """
+    gates: Dict[str, dict] = {}
+    key_skills = list(jd_analysis.get("job_key_skills") or []) + list(jd_analysis.get("job_tech_stack") or [])
+    responsibilities = list(jd_analysis.get("job_key_responsibilities") or [])
+
+    if not resume.get("skills"):
+        reason = "No skills listed on the resume"
+        gates["skills"] = _gate(reason, _placeholder_score("skills", reason, key_skills[:5]))
+
+    if not resume.get("experience"):
+        if _ENTRY_LEVEL_PATTERN.search(job_description):
+            reason = "No work experience listed; the job description is entry level"
+            gates["experience"] = _gate(reason, _placeholder_score("experience", reason, []), applicable=False)
+        else:
+            reason = "No work experience listed on the resume"
+            gates["experience"] = _gate(reason, _placeholder_score("experience", reason, responsibilities[:3]))
+
+    if not _EDUCATION_PATTERN.search(job_description):
+        reason = "The job description states no education requirement"
+        gates["education"] = _gate(reason, _placeholder_score("education", reason, []), applicable=False)
+    elif not resume.get("education"):
+        reason = "No education listed, but the job description mentions education requirements"
+        gates["education"] = _gate(reason, _placeholder_score(
+            "education", reason, ["Education requirements stated in the job description"],
+        ))
+
+    if not resume.get("projects"):
+        if _PROJECTS_PATTERN.search(job_description):
+            reason = "No projects listed, but the job description asks for project work or a portfolio"
+            gates["projects"] = _gate(reason, _placeholder_score("projects", reason, ["Relevant projects or portfolio"]))
+        else:
+            reason = "No projects listed and the job description doesn't ask for any"
+            gates["projects"] = _gate(reason, _placeholder_score("projects", reason, []), applicable=False)
+
+    if _meta_is_empty(resume):
+        reason = "No seniority, domain or language information on the resume"
+        gates["meta"] = _gate(reason, _placeholder_score("meta", reason, []), applicable=False)
+
+    return gates
+
+
+def _format_education(item: Any) -> str:
+    degree = " in ".join(part for part in (item.get("degree"), item.get("field_of_study")) if part)
+    dates = " - ".join(part for part in (item.get("start_date"), item.get("end_date")) if part)
+    text = ", ".join(part for part in (degree, item.get("institution")) if part)
+    return f"{text} ({dates})" if dates else text
+
+
+def optimization_gates(resume: Dict[str, Any], job_description: str, jd_analysis: Dict[str, Any]) -> Dict[str, dict]:
+    """
+    Decide which optimization sections can be answered without an LLM call.
+
+    The summary is never gated since it is rewritten from the resume text.
+
+    Args:
+        resume: Validated resume (ResumeStructured as dict)
+        job_description: Raw job description text
+        jd_analysis: Shared JD analysis (may be empty)
+
+    Returns:
+        Section name -> gate ({"reason", "output", "applicable"}) for gated sections
+    """
+    gates: Dict[str, dict] = {}
+
+    if not resume.get("experience"):
+        gates["experience"] = _gate("No work experience listed on the resume", [])
+
+    if not resume.get("projects"):
+        gates["projects"] = _gate("No projects listed on the resume", [])
+
+    if not resume.get("education"):
+        gates["education"] = _gate("No education listed on the resume", [])
+    elif not _EDUCATION_PATTERN.search(job_description):
+        reason = "The job description states no education requirement"
+        gates["education"] = _gate(reason, [
+            SectionOptimization(
+                section_name="education",
+                original_content=_format_education(item),
+                optimized_content=_format_education(item),
+                improvements=[f"Left unchanged: {reason.lower()}"],
+            ).model_dump()
+            for item in resume["education"]
+        ])
+
+    if not resume.get("skills"):
+        # Suggesting skills from the JD alone would claim skills the candidate may not have
+        key_skills = list(jd_analysis.get("job_key_skills") or [])[:10]
+        advice = "Add a skills section listing the skills you have"
+        if key_skills:
+            advice += f"; the job asks for: {', '.join(key_skills)}"
+        gates["skills"] = _gate("No skills listed on the resume", SectionOptimization(
+            section_name="skills",
+            original_content="No skills listed",
+            optimized_content="",
+            improvements=[advice],
+        ).model_dump())
+
+    return gates
+
+
+def _gate_sections(graph_name: str, decide: Callable, state: Dict[str, Any]) -> Dict[str, Any]:
+    if not config.SECTION_GATING_ENABLED:
+        return {"section_gates": {}}
+    resume = _parse_resume(state)
+    if resume is None:
+        return {"section_gates": {}}
+    gates = decide(resume, state.get("job_description") or "", state.get("jd_analysis") or {})
+    if not config.SECTION_GATING_EXCLUDE_NOT_APPLICABLE:
+        gates = {section: gate for section, gate in gates.items() if gate["applicable"]}
+    for section, gate in gates.items():
+        SECTIONS_GATED.inc(graph=graph_name, section=section)
+        logger.info(f"Skipping LLM call for {section}: {gate['reason']}")
+    return {"section_gates": gates}
+
+
+def gate_scoring_sections_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """LangGraph node recording the scoring graph's gates (scoring_gates) in ``section_gates``."""
+    return _gate_sections("analysis", scoring_gates, state)
+
+
+def gate_optimization_sections_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """LangGraph node recording the optimization graph's gates (optimization_gates) in ``section_gates``."""
+    return _gate_sections("optimization", optimization_gates, state)
+
+
+def gate_section(section: str, output_key: str, func: Callable) -> Callable:
+    """
+    Wrap a section node so a gated section returns its placeholder output.
+
+    Args:
+        section: Section the node handles (a key of ``section_gates``)
+        output_key: State key the node writes
+        func: Node function taking the state dict
+
+    Returns:
+        Wrapped node function returning ``{output_key: placeholder}`` for a
+        gated section, otherwise the node's own update
+    """
+    @functools.wraps(func)
+    def wrapper(state, *args, **kwargs):
+        gate = (state.get("section_gates") or {}).get(section)
+        if gate is not None:
+            return {output_key: gate["output"]}
+        return func(state, *args, **kwargs)
+
+    return wrapper
+
+
+def skipped_sections(state: Dict[str, Any]) -> Dict[str, str]:
+    """Section name -> reason for every gated section in the state."""
+    return {section: gate["reason"] for section, gate in (state.get("section_gates") or {}).items()}
+
+
+def not_applicable_sections(state: Dict[str, Any]) -> List[str]:
+    """Gated sections that don't apply to the job and are left out of the overall score."""
+    return [
+        section for section, gate in (state.get("section_gates") or {}).items()
+        if not gate.get("applicable", True)
+    ]
@@ -0,0 +1 @@
+"""Pluggable LLM backends used behind config.get_llm"""
@@ -0,0 +1,323 @@
+"""
+Offline fake LLM backend for load tests and benchmarks.
+
+FakeGenerativeModel mimics the parts of vertexai's GenerativeModel that the
+agents use (generate_content returning an object with .text and
+usage_metadata, or an iterator of such chunks with stream=True; like Vertex
+AI, a stream ends with a chunk that carries only the usage and whose .text
+raises ValueError). Responses are schema-valid JSON for whichever output the
+prompt asks for (SectionScore, SectionOptimization, ResumeStructured, or the
+JD extraction / weighting objects) and are deterministic per prompt and seed.
+Latency, 429/503 errors and malformed JSON are drawn from a configurable
+profile so the server and graphs can be exercised without Vertex AI quota.
+
+Enable with LLM_BACKEND=fake.
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional, Callable, Union
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+from src import config
+from src.utils.logging_utils import get_logger
+from src.utils.schema_utils import (
+    RESUME_STRUCTURED_SCHEMA,
+    SECTION_OPTIMIZATION_LIST_SCHEMA,
+    SECTION_OPTIMIZATION_SCHEMA,
+    SECTION_SCORE_SCHEMA,
+)
+
+logger = get_logger(__name__)
+
+_WORDS = [
+    "python", "kubernetes", "leadership", "distributed", "systems", "api",
+    "design", "testing", "cloud", "data", "pipelines", "mentoring", "sql",
+    "latency", "scalable", "react", "ownership", "analytics", "security",
+]
+
+# Streamed responses: characters per chunk, and the share of the latency spent before the first chunk
+_STREAM_CHUNK_CHARS = 64
+_STREAM_FIRST_CHUNK_SHARE = 0.25
+
+_JD_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "jobKeySkills": {"type": "array", "items": {"type": "string"}},
+        "jobKeyResponsibilities": {"type": "array", "items": {"type": "string"}},
+        "role": {"type": "string"},
+        "seniority": {"type": "string", "enum": ["junior", "mid", "senior", "lead", "principal"]},
+        "techStack": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
+
+def parse_latency_spec(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution spec into a sampler (seconds).
+
+    Supported specs:
+        fixed:S            always S seconds
+        uniform:LO,HI      uniform between LO and HI
+        normal:MU,SIGMA    normal, clipped at 0
+        lognormal:MEDIAN,SIGMA
+        exponential:MEAN
+
+    Raises:
+        ValueError: If the spec is not recognised
+    """
+    name, _, args = spec.strip().partition(":")
+    try:
+        params = [float(value) for value in args.split(",") if value.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    name = name.lower()
+
+    if name == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if name == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if name == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if name == "lognormal" and len(params) == 2:
+        mu = math.log(params[0]) if params[0] > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, params[1])
+    if name == "exponential" and len(params) == 1:
+        return lambda rng: rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class FakeLLMProfile:
+    """Latency and failure behaviour of the fake backend."""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        rate_429: float = 0.0,
+        rate_503: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            latency: Latency distribution spec (see parse_latency_spec)
+            rate_429: Probability a call raises ResourceExhausted
+            rate_503: Probability a call raises ServiceUnavailable
+            malformed_rate: Probability a response is malformed JSON
+            seed: Seed for latency/error draws and response content
+        """
+        self.latency = latency
+        self.sample_latency = parse_latency_spec(latency)
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.malformed_rate = malformed_rate
+        self.seed = seed if seed is not None else 0
+
+    @classmethod
+    def from_config(cls) -> "FakeLLMProfile":
+        """Build the profile from the LLM_FAKE_* environment settings."""
+        return cls(
+            latency=config.LLM_FAKE_LATENCY,
+            rate_429=config.LLM_FAKE_429_RATE,
+            rate_503=config.LLM_FAKE_503_RATE,
+            malformed_rate=config.LLM_FAKE_MALFORMED_RATE,
+            seed=config.LLM_FAKE_SEED,
+        )
+
+
+class _UsageMetadata:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    """Stand-in for a GenerationResponse."""
+
+    def __init__(self, text: str, prompt: str):
+        self.text = text
+        self.usage_metadata = _UsageMetadata(max(1, len(prompt) // 4), max(1, len(text) // 4))
+
+
+class FakeUsageChunk:
+    """Stand-in for the final stream chunk, which has usage metadata but no text part."""
+
+    def __init__(self, usage_metadata: _UsageMetadata):
+        self.usage_metadata = usage_metadata
+
+    @property
+    def text(self) -> str:
+        # What vertexai's GenerationResponse.text does for a candidate without parts
+        raise ValueError("Response candidate content has no parts (and thus no text).")
+
+
+def _sample_from_schema(schema: Dict[str, Any], rng: random.Random, field: str = "") -> Any:
+    """Generate a value that satisfies a cleaned (Vertex-style) JSON schema."""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+
+    schema_type = schema.get("type", "string")
+    if schema_type == "object":
+        return {
+            name: _sample_from_schema(prop, rng, name)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return [_sample_from_schema(schema.get("items", {}), rng, field) for _ in range(rng.randint(1, 3))]
+    if schema_type in ("number", "integer"):
+        low = schema.get("minimum", 0)
+        high = schema.get("maximum", low + 10)
+        value = rng.uniform(low, high)
+        return int(value) if schema_type == "integer" else round(value, 1)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 8)))
+    return f"{field.replace('_', ' ')}: {words}" if field else words
+
+
+def _normalize_weights(rng: random.Random) -> Dict[str, float]:
+    sections = ["summary", "experience", "skills", "projects", "education"]
+    raw = [rng.uniform(0.5, 2.0) for _ in sections]
+    total = sum(raw)
+    weights = [round(value / total, 2) for value in raw]
+    weights[-1] = round(1.0 - sum(weights[:-1]), 2)
+    return dict(zip(sections, weights))
+
+
+_SECTION_NAME_PATTERN = re.compile(r'section_name"?\s*:\s*"(\w+)"')
+_FUSED_SECTIONS_PATTERN = re.compile(r"Sections to score: ([\w, ]+)")
+
+
+class FakeGenerativeModel:
+    """
+    Offline drop-in for GenerativeModel.
+
+    Thread-safe; one instance per (model_name, temperature, max_output_tokens)
+    is memoized by get_llm just like the Vertex models.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "fake-llm",
+        generation_config: Optional[Dict[str, Any]] = None,
+        profile: Optional[FakeLLMProfile] = None,
+    ):
+        self._model_name = model_name
+        self._generation_config = dict(generation_config or {})
+        self.profile = profile or FakeLLMProfile.from_config()
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(
+        self,
+        prompt: str,
+        generation_config: Optional[Any] = None,
+        stream: bool = False,
+        **kwargs,
+    ) -> Union[FakeResponse, Iterator[FakeResponse]]:
+        """
+        Return a schema-valid JSON response after a simulated delay.
+
+        With stream=True, returns an iterator of chunks: part of the latency
+        passes before the call returns, the rest is spread between chunks.
+
+        Raises:
+            ResourceExhausted: Simulated 429, at profile.rate_429
+            ServiceUnavailable: Simulated 503, at profile.rate_503
+        """
+        with self._lock:
+            self.calls += 1
+            latency = self.profile.sample_latency(self._rng)
+            failure_draw = self._rng.random()
+            malformed_draw = self._rng.random()
+
+        first_chunk = latency * _STREAM_FIRST_CHUNK_SHARE if stream else latency
+        if first_chunk > 0:
+            time.sleep(first_chunk)
+
+        if failure_draw < self.profile.rate_429 + self.profile.rate_503:
+            logger.debug(f"Fake backend simulating failure after {latency:.2f}s")
+        if failure_draw < self.profile.rate_429:
+            raise ResourceExhausted("Simulated quota exhaustion (fake backend)")
+        if failure_draw < self.profile.rate_429 + self.profile.rate_503:
+            raise ServiceUnavailable("Simulated overload (fake backend)")
+
+        text = json.dumps(self._build_payload(prompt, generation_config))
+        if malformed_draw < self.profile.malformed_rate:
+            text = self._malform(text, malformed_draw)
+        if stream:
+            return self._stream(text, prompt, latency - first_chunk)
+        return FakeResponse(text, prompt)
+
+    @staticmethod
+    def _stream(text: str, prompt: str, remaining: float) -> Iterator[Union[FakeResponse, FakeUsageChunk]]:
+        """Yield the response in chunks, then a text-less chunk carrying the total usage."""
+        chunks = [text[i:i + _STREAM_CHUNK_CHARS] for i in range(0, len(text), _STREAM_CHUNK_CHARS)]
+        delay = remaining / (len(chunks) or 1)
+        for chunk in chunks:
+            if delay > 0:
+                time.sleep(delay)
+            yield FakeResponse(chunk, prompt)
+        yield FakeUsageChunk(FakeResponse(text, prompt).usage_metadata)
+
+    def _content_rng(self, prompt: str) -> random.Random:
+        """Content depends only on the prompt and seed, so repeated calls agree."""
+        digest = hashlib.sha256(f"{self.profile.seed}:{self._model_name}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _build_payload(self, prompt: str, generation_config: Optional[Any]) -> Any:
+        """Pick the output shape the prompt (or its response_schema) asks for."""
+        rng = self._content_rng(prompt)
+        response_schema = generation_config.get("response_schema") if isinstance(generation_config, dict) else None
+
+        # Match the JSON keys of the JD analysis prompts; section prompts may
+        # quote extracted requirements that mention these words
+        if '"jobKeySkills":' in prompt:
+            return _sample_from_schema(_JD_EXTRACTION_SCHEMA, rng)
+        if '"sectionWeights":' in prompt:
+            return {
+                "sectionWeights": _normalize_weights(rng),
+                "focusAreas": [_sample_from_schema({"type": "string"}, rng) for _ in range(2)],
+                "optimizationStrategy": _sample_from_schema({"type": "string"}, rng),
+            }
+        fused = _FUSED_SECTIONS_PATTERN.search(prompt)
+        if fused:
+            # Fused scoring: one SectionScore per requested section
+            return [
+                {**_sample_from_schema(SECTION_SCORE_SCHEMA, rng), "section_name": name.strip()}
+                for name in fused.group(1).split(",")
+            ]
+        if response_schema is not None:
+            payload = _sample_from_schema(response_schema, rng)
+        elif "resume parsing assistant" in prompt:
+            payload = _sample_from_schema(RESUME_STRUCTURED_SCHEMA, rng)
+        elif "missing_requirements" in prompt:
+            payload = _sample_from_schema(SECTION_SCORE_SCHEMA, rng)
+        elif "JSON array" in prompt:
+            payload = _sample_from_schema(SECTION_OPTIMIZATION_LIST_SCHEMA, rng)
+        else:
+            payload = _sample_from_schema(SECTION_OPTIMIZATION_SCHEMA, rng)
+
+        match = _SECTION_NAME_PATTERN.search(prompt)
+        if match:
+            for item in payload if isinstance(payload, list) else [payload]:
+                if isinstance(item, dict) and "section_name" in item:
+                    item["section_name"] = match.group(1)
+        return payload
+
+    @staticmethod
+    def _malform(text: str, draw: float) -> str:
+        """Damage the JSON in one of the ways real model output goes wrong."""
+        variants: List[Callable[[str], str]] = [
+            lambda t: t[: max(1, len(t) * 2 // 3)],                 # truncated output
+            lambda t: f"```json\n{t}\n```",                         # markdown fence
+            lambda t: re.sub(r"([}\]])$", r",\1", t),               # trailing comma
+            lambda t: f"Here is the JSON you asked for:\n{t}",      # leading prose
+        ]
+        return variants[int(draw * 1_000_003) % len(variants)](text)
@@ -5,9 +5,10 @@ These models are used for:
 1. Structured extraction from resume text (ResumeStructured)
 2. Section scoring outputs (SectionScore)
 3. Final aggregated results (FinalScore)
+4. Failures of individual graph nodes in a partial result (NodeFailure)
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -88,6 +89,18 @@ class SectionScore(BaseModel):
     )
 
 
+class NodeFailure(BaseModel):
+    """A graph node that failed and was left out of the result."""
+    node: str = Field(description="Graph node name (e.g., score_skills)")
+    section: str = Field(description="Resume section the node handles")
+    error_type: str = Field(description="Exception class name")
+    message: str = Field(description="Exception message")
+    retryable: bool = Field(
+        default=True,
+        description="Whether re-running the node may succeed (quota, timeouts, bad model output)"
+    )
+
+
 class FinalScore(BaseModel):
     """Final aggregated scoring result."""
     overall_score: float = Field(ge=0, le=100, description="Weighted overall score")
@@ -99,6 +112,18 @@ class FinalScore(BaseModel):
         default_factory=list,
         description="Overall comments and recommendations"
     )
+    degraded: bool = Field(
+        default=False,
+        description="True if some sections failed and were excluded from the overall score"
+    )
+    failed_sections: List[str] = Field(
+        default_factory=list,
+        description="Sections that could not be scored"
+    )
+    skipped_sections: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Sections scored without an LLM call, with the reason; those not applicable to the job are excluded from the overall score"
+    )
 
 
 class SectionOptimization(BaseModel):
@@ -127,4 +152,16 @@ class OptimizationResult(BaseModel):
         default_factory=list,
         description="Overall improvements and recommendations"
     )
+    degraded: bool = Field(
+        default=False,
+        description="True if some sections failed and are missing from the result"
+    )
+    failed_sections: List[str] = Field(
+        default_factory=list,
+        description="Sections that could not be optimized"
+    )
+    skipped_sections: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Sections left unchanged without an LLM call, with the reason"
+    )
 
@@ -0,0 +1,2 @@
+"""HTTP serving utilities for the API server"""
+
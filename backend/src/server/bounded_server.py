@@ -0,0 +1,142 @@
+"""
+Bounded concurrent HTTP server.
+
+Serves requests from a fixed-size worker pool with a bounded queue in front
+of it. When every worker is busy and the queue is full, new connections are
+rejected immediately with 503 + Retry-After instead of piling up behind a
+slow LLM call.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer
+from typing import Dict, Any, Optional
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class BoundedThreadPoolHTTPServer(HTTPServer):
+    """
+    HTTPServer that dispatches each connection to a bounded worker pool.
+
+    At most ``max_workers`` requests run concurrently and at most
+    ``max_queue`` accepted requests wait for a worker. Anything beyond that
+    is answered with ``503 Service Unavailable`` and a ``Retry-After`` header.
+    """
+
+    def __init__(
+        self,
+        server_address,
+        handler_class,
+        max_workers: int = 8,
+        max_queue: int = 16,
+        retry_after: int = 5,
+        backlog: Optional[int] = None,
+    ):
+        """
+        Args:
+            server_address: (host, port) tuple to bind to
+            handler_class: BaseHTTPRequestHandler subclass
+            max_workers: Number of requests processed concurrently
+            max_queue: Number of accepted requests allowed to wait for a worker
+            retry_after: Seconds advertised in the Retry-After header when saturated
+            backlog: Listen backlog for the socket (defaults to max_queue)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be non-negative")
+
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        # Must be set before the base class calls server_activate()
+        self.request_queue_size = backlog if backlog is not None else max(max_queue, 5)
+
+        super().__init__(server_address, handler_class)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="api-worker",
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+        self._rejected = 0
+        self._local = threading.local()
+
+    def process_request(self, request, client_address):
+        """Hand the connection to the worker pool, or reject it when saturated."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            logger.warning(f"Server saturated, rejecting request from {client_address[0]}")
+            self._reject_request(request)
+            self.shutdown_request(request)
+            return
+
+        with self._lock:
+            self._queued += 1
+        self._executor.submit(self._process_request_worker, request, client_address, time.monotonic())
+
+    def _process_request_worker(self, request, client_address, enqueued_at: float):
+        """Run the handler for one connection on a pool thread."""
+        with self._lock:
+            self._queued -= 1
+            self._in_flight += 1
+        # Handlers run on this thread, so they can read the wait via queue_wait()
+        self._local.queue_wait = time.monotonic() - enqueued_at
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def queue_wait(self) -> float:
+        """Seconds the request being handled on this thread waited for a worker."""
+        return getattr(self._local, "queue_wait", 0.0)
+
+    def _reject_request(self, request):
+        """Write a minimal 503 response directly to the socket."""
+        body = json.dumps({
+            "success": False,
+            "error": "Server is at capacity, please retry later",
+        }).encode("utf-8")
+        head = (
+            "HTTP/1.1 503 Service Unavailable\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Retry-After: {self.retry_after}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+        ).encode("latin-1")
+        try:
+            request.settimeout(1.0)
+            request.sendall(head + body)
+        except OSError as e:
+            logger.debug(f"Failed to send 503 to rejected client: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Current pool occupancy, for health and metrics endpoints."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "rejected_total": self._rejected,
+            }
+
+    def server_close(self):
+        """Close the listening socket and stop the worker pool."""
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,178 @@
+"""
+In-memory background job store.
+
+Lets the API accept long-running graph invocations, return a job id
+immediately and serve status, partial results and the final result by
+polling, so connection lifetime is decoupled from LLM latency.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already queued or running."""
+
+
+class Job:
+    """A single background job and its (partial) results."""
+
+    def __init__(self, job_type: str):
+        self.id = f"job_{os.urandom(8).hex()}"
+        self.type = job_type
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.partial: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def set_partial(self, key: str, value: Any) -> None:
+        """Record an intermediate result (e.g. one section's score)."""
+        with self._lock:
+            self.partial[key] = value
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for the status endpoint."""
+        with self._lock:
+            return {
+                "jobId": self.id,
+                "type": self.type,
+                "status": self.status,
+                "createdAt": self.created_at,
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobStore:
+    """
+    Thread-safe registry of jobs backed by a bounded executor.
+
+    Finished jobs are kept for ``ttl_seconds`` so clients can fetch the
+    result, then evicted; at most ``max_finished`` of them are kept, the
+    oldest evicted first, so a burst of jobs can't hold an unbounded number
+    of result payloads until the TTL expires. At most ``max_pending`` jobs
+    may be queued or running at once; beyond that ``submit`` raises
+    JobQueueFull.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        ttl_seconds: float = 3600,
+        max_finished: int = 256,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        # Ids of finished jobs, oldest first
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+
+    def submit(self, job_type: str, func: Callable[[Job], Dict[str, Any]]) -> Job:
+        """
+        Queue ``func(job)`` for background execution.
+
+        ``func`` may call ``job.set_partial`` while running; its return value
+        becomes the job result.
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already queued or running
+        """
+        with self._lock:
+            self._evict_expired()
+            pending = sum(1 for job in self._jobs.values() if not job.is_finished)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already pending")
+            job = Job(job_type)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, func)
+        logger.info(f"Queued {job_type} job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            self._evict_expired()
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, func: Callable[[Job], Dict[str, Any]]) -> None:
+        """Execute a job on a worker thread and record its outcome."""
+        with job._lock:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+        try:
+            result = func(job)
+        except Exception as e:
+            self._finish(job, JOB_FAILED, error=str(e))
+            logger.error(f"Job {job.id} failed: {e}")
+            return
+        self._finish(job, JOB_SUCCEEDED, result=result)
+        logger.info(f"Job {job.id} succeeded")
+
+    def _finish(
+        self,
+        job: Job,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Record a job's outcome and evict the oldest finished jobs beyond max_finished."""
+        with self._lock:
+            with job._lock:
+                job.result = result
+                job.error = error
+                job.status = status
+                job.finished_at = time.time()
+            self._finished[job.id] = None
+            while len(self._finished) > self.max_finished:
+                job_id, _ = self._finished.popitem(last=False)
+                del self._jobs[job_id]
+                logger.info(f"Evicted finished job {job_id}, over the limit of {self.max_finished}")
+
+    def _evict_expired(self) -> None:
+        """Drop finished jobs older than the TTL. Caller must hold the lock."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id in self._finished if self._jobs[job_id].finished_at < cutoff]
+        for job_id in expired:
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts by status."""
+        with self._lock:
+            counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_SUCCEEDED: 0, JOB_FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self) -> None:
+        """Stop accepting work and cancel queued jobs."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,203 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Responses are stored in a local SQLite file keyed by a hash of the model
+name, generation config and full prompt, with TTL expiry and size-bounded
+LRU eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Cache hits' access times are written back in batches of this size (and before every eviction)
+_TOUCH_BATCH = 256
+# Eviction frees space down to this share of max_bytes, so a full cache doesn't scan on every store
+_EVICT_TO = 0.9
+
+
+def make_cache_key(model_name: str, generation_config: Dict[str, Any], prompt: str) -> str:
+    """
+    Build a content-addressed cache key.
+
+    Args:
+        model_name: Model name (e.g., gemini-2.5-flash)
+        generation_config: Effective generation config for the call
+        prompt: Full prompt text
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    payload = json.dumps(
+        {"model": model_name, "config": generation_config, "prompt": prompt},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed LLM response cache with TTL and LRU eviction.
+
+    Safe to share across threads; multiple processes may point at the same
+    file since SQLite serializes writers.
+
+    Stores don't scan the table: running totals of entries and response
+    sizes are kept in memory and the eviction scan only runs once the size
+    passes max_bytes, re-reading the real totals (other processes sharing
+    the file change them too). stats() reports the running totals, so a
+    metrics scrape never scans the table either. Hits record their access time in memory and write it back in
+    batches, so LRU order is approximate between flushes.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_bytes: int = 100 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite database file path
+            ttl_seconds: Entries older than this are treated as misses
+            max_bytes: Total response size kept before least recently used entries are evicted
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_accessed ON llm_cache (last_accessed)"
+        )
+        self._total_entries, self._total_bytes = self._count()
+        self._touched: Dict[str, float] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on miss or expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, size, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            response, size, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._total_entries -= 1
+                self._total_bytes -= size
+                self._touched.pop(key, None)
+                self._misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touched()
+            self._hits += 1
+            return response
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response and evict least recently used entries over the size bound."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            self._touched.pop(key, None)
+            if replaced is None:
+                self._total_entries += 1
+            self._total_bytes += size - (replaced[0] if replaced else 0)
+            self._stores += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _count(self) -> Tuple[int, int]:
+        """Entries and total response size as stored in the file."""
+        entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return entries, total
+
+    def _flush_touched(self) -> None:
+        """Write the buffered access times of cache hits. Caller holds the lock."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE llm_cache SET last_accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then LRU entries if over max_bytes (down to _EVICT_TO of it). Caller holds the lock."""
+        self._flush_touched()
+        cutoff = time.time() - self.ttl_seconds
+        cursor = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
+        self._evictions += max(cursor.rowcount, 0)
+
+        entries, total = self._count()
+        if total > self.max_bytes:
+            excess = total - int(self.max_bytes * _EVICT_TO)
+            rows = self._conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_accessed ASC"
+            ).fetchall()
+            to_delete = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                to_delete.append((key,))
+                excess -= size
+                total -= size
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", to_delete)
+            self._evictions += len(to_delete)
+            entries -= len(to_delete)
+        self._total_entries = entries
+        self._total_bytes = total
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._total_entries = 0
+            self._total_bytes = 0
+            self._touched.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the running entry count and size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "entries": self._total_entries,
+                "bytes": self._total_bytes,
+            }
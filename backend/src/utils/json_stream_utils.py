@@ -0,0 +1,317 @@
+"""
+Incremental JSON parsing of streamed LLM responses.
+
+IncrementalJSONParser is fed response chunks as they arrive and reports
+every value that completes near the top of the document: each element of
+a top-level array (one SectionOptimization of an experience list) or each
+field of a top-level object (the score of a SectionScore). Agents pass a
+callback built by partial_item_writer to call_llm, which validates those
+items and forwards them through LangGraph's custom stream so the API can
+send them to the client before the response finishes.
+"""
+
+import contextlib
+import contextvars
+import json
+import re
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Dict, List, Optional, Tuple, Type
+from langgraph.config import get_stream_writer
+from pydantic import BaseModel, TypeAdapter
+from src import config
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Outside strings only structure matters; inside, only the closing quote and escapes
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+Path = Tuple[Any, ...]
+
+
+class _Frame:
+    """An open object or array."""
+
+    __slots__ = ("closer", "key", "expect_key", "scalar_from", "has_value", "value_start")
+
+    def __init__(self, closer: str, scalar_from: Optional[int]):
+        self.closer = closer
+        # Current key (objects) or element index (arrays)
+        self.key: Any = None if closer == "}" else 0
+        self.expect_key = closer == "}"
+        # Where a bare scalar value would start, if one can follow
+        self.scalar_from = scalar_from
+        # Whether the current value was a string or container (already reported)
+        self.has_value = False
+        self.value_start = -1
+
+
+class IncrementalJSONParser:
+    """
+    Report values of a JSON document as soon as they are complete.
+
+    Text before the first { or [ (fences, prose) and after the root value is
+    ignored. Values deeper than ``max_depth`` are scanned but not decoded, so
+    feeding a chunk costs a regex scan of that chunk plus one json.loads per
+    reported value.
+
+    Example:
+        parser = IncrementalJSONParser()
+        for chunk in chunks:
+            for path, value in parser.feed(chunk):
+                ...  # path is e.g. (0,) for an array element or ("score",) for a field
+    """
+
+    def __init__(self, max_depth: int = 1):
+        """
+        Args:
+            max_depth: Report values whose path is at most this long
+                (1 = elements or fields of the root)
+        """
+        self.max_depth = max_depth
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._string_start = 0
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """
+        Add a chunk of the response.
+
+        Args:
+            chunk: Next piece of response text
+
+        Returns:
+            (path, value) for every value completed by this chunk, in document order
+        """
+        self._buffer += chunk
+        items: List[Tuple[Path, Any]] = []
+        buffer = self._buffer
+        end = len(buffer)
+        pos = self._pos
+        while pos < end and not self.done:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    pos = end
+                    break
+                if match.group() == "\\":
+                    if match.end() >= end:
+                        # The escaped character is in the next chunk
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                pos = match.end()
+                self._in_string = False
+                self._string_done(self._string_start, pos, items)
+                continue
+
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = end
+                break
+            char = match.group()
+            start = match.start()
+            pos = match.end()
+            if not self._stack:
+                if char in "{[":
+                    self._stack.append(_Frame("}" if char == "{" else "]", None if char == "{" else pos))
+                continue
+
+            frame = self._stack[-1]
+            if char == '"':
+                self._in_string = True
+                self._string_start = start
+                if not frame.expect_key:
+                    frame.value_start = start
+            elif char in "{[":
+                frame.value_start = start
+                self._stack.append(_Frame("}" if char == "{" else "]", None if char == "{" else pos))
+            elif char == ":":
+                frame.scalar_from = pos
+            elif char == ",":
+                self._scalar_done(frame, start, items)
+                self._next_value(frame, pos)
+            else:
+                self._scalar_done(frame, start, items)
+                self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    break
+                parent = self._stack[-1]
+                parent.has_value = True
+                self._report(parent.value_start, pos, items)
+        self._pos = pos
+        return items
+
+    def _path(self) -> Path:
+        return tuple(frame.key for frame in self._stack)
+
+    def _report(self, start: int, end: int, items: List[Tuple[Path, Any]]) -> None:
+        """Decode buffer[start:end] as the current value if it is shallow enough."""
+        if len(self._stack) > self.max_depth:
+            return
+        try:
+            items.append((self._path(), json.loads(self._buffer[start:end], strict=False)))
+        except ValueError:
+            # Malformed output; the caller's final parse reports it
+            pass
+
+    def _string_done(self, start: int, end: int, items: List[Tuple[Path, Any]]) -> None:
+        frame = self._stack[-1]
+        if frame.expect_key:
+            try:
+                frame.key = json.loads(self._buffer[start:end], strict=False)
+            except ValueError:
+                frame.key = self._buffer[start + 1:end - 1]
+            frame.expect_key = False
+            return
+        frame.has_value = True
+        self._report(start, end, items)
+
+    def _scalar_done(self, frame: _Frame, end: int, items: List[Tuple[Path, Any]]) -> None:
+        """Report a number, true, false or null ended by a comma or closer."""
+        if frame.has_value or frame.scalar_from is None:
+            return
+        if self._buffer[frame.scalar_from:end].strip():
+            self._report(frame.scalar_from, end, items)
+
+    @staticmethod
+    def _next_value(frame: _Frame, pos: int) -> None:
+        frame.has_value = False
+        frame.value_start = -1
+        if frame.closer == "]":
+            frame.key += 1
+            frame.scalar_from = pos
+        else:
+            frame.expect_key = True
+            frame.scalar_from = None
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(model: Type[BaseModel], field: str) -> Optional[TypeAdapter]:
+    """TypeAdapter validating one field of a model, constraints included."""
+    info = model.model_fields.get(field)
+    if info is None:
+        return None
+    if not info.metadata:
+        return TypeAdapter(info.annotation)
+    return TypeAdapter(Annotated[(info.annotation, *info.metadata)])
+
+
+def model_items(model: Type[BaseModel], **overrides: Any) -> Callable[[Path, Any], Optional[Any]]:
+    """
+    Converter for a JSON array of ``model`` objects: validates each element.
+
+    Args:
+        model: Pydantic model of the array elements
+        **overrides: Fields to set on every element (e.g. section_name)
+
+    Returns:
+        Converter returning the validated element as a dict, or None
+    """
+    def convert(path: Path, value: Any) -> Optional[Any]:
+        if len(path) != 1 or not isinstance(value, dict):
+            return None
+        return model(**{**value, **overrides}).model_dump()
+
+    return convert
+
+
+def model_fields(model: Type[BaseModel]) -> Callable[[Path, Any], Optional[Any]]:
+    """
+    Converter for a JSON object of ``model``: validates each field as it completes.
+
+    Args:
+        model: Pydantic model of the object
+
+    Returns:
+        Converter returning ``{field: value}``, or None for unknown fields
+    """
+    def convert(path: Path, value: Any) -> Optional[Any]:
+        if len(path) != 1 or not isinstance(path[0], str):
+            return None
+        adapter = _field_adapter(model, path[0])
+        if adapter is None:
+            return None
+        return {path[0]: adapter.validate_python(value)}
+
+    return convert
+
+
+_partials_requested: contextvars.ContextVar[bool] = contextvars.ContextVar("partials_requested", default=False)
+
+
+@contextlib.contextmanager
+def stream_partials():
+    """
+    Ask the agents to stream partial results while serving one request.
+    
+    Like hedge_budget, this reaches every LLM call inside the block,
+    including calls from parallel LangGraph nodes. The graph must be
+    streamed with the "custom" stream mode to receive the items.
+    """
+    token = _partials_requested.set(True)
+    try:
+        yield
+    finally:
+        _partials_requested.reset(token)
+
+
+def partial_item_writer(
+    state: Dict[str, Any],
+    section: Optional[str],
+    convert: Callable[[Path, Any], Optional[Any]],
+) -> Optional[Callable[[Path, Any], None]]:
+    """
+    Build the call_llm ``on_item`` callback for a section node.
+    
+    Each completed item is converted (validated) and written to the graph's
+    custom stream as ``{"section", "path", "item"}``, plus ``"batch"`` when
+    the node runs one entry batch. Items that fail validation are dropped
+    since the node's final result is authoritative; an identical item
+    repeated by a retried attempt is written once.
+    
+    Args:
+        state: The node's state (for the batch index)
+        section: Section the items belong to, or None to take each item's section_name
+        convert: Converter such as model_items or model_fields
+    
+    Returns:
+        The callback, or None (no streaming) unless the request asked for
+        partial results from inside a graph run
+    """
+    if not _partials_requested.get() or not config.LLM_STREAMING_ENABLED:
+        return None
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Not running inside a graph (e.g. the shared JD analysis)
+        return None
+    batch = state.get("batch_index")
+    sent: Dict[Path, Any] = {}
+    
+    def on_item(path: Path, value: Any) -> None:
+        try:
+            item = convert(path, value)
+        except Exception as e:
+            logger.debug(f"Dropping invalid partial item {path}: {e}")
+            return
+        if item is None or sent.get(path) == item:
+            return
+        sent[path] = item
+        event = {"section": section or item.get("section_name"), "path": list(path), "item": item}
+        if batch is not None:
+            event["batch"] = batch
+        writer(event)
+    
+    return on_item
@@ -0,0 +1,638 @@
+"""
+Shared LLM call layer used by every agent.
+
+All agents go through call_llm instead of calling model.generate_content
+directly, so cross-cutting concerns such as response caching, quota rate
+limiting, retries and request hedging live in one place.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Optional, Callable, Tuple
+from google.api_core.exceptions import (
+    DeadlineExceeded,
+    InternalServerError,
+    ResourceExhausted,
+    ServiceUnavailable,
+)
+from vertexai.generative_models import GenerationConfig, GenerativeModel
+from src import config
+from src.utils.cache_utils import LLMResponseCache, make_cache_key
+from src.utils.json_stream_utils import IncrementalJSONParser
+from src.utils.rate_limit_utils import RateLimiter, RateLimitTimeout, estimate_tokens
+from src.utils.retry_utils import RetryBudget, exponential_backoff_retry, get_retry_budget
+from src.utils.logging_utils import get_logger
+from src.utils.metrics_utils import REGISTRY
+from src.utils import tracing_utils
+
+logger = get_logger(__name__)
+
+LLM_CALLS = REGISTRY.counter(
+    "llm_calls",
+    "LLM calls per agent by outcome (ok, cache_hit, error)",
+    ("agent", "outcome"),
+)
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_duration_seconds",
+    "End-to-end LLM call time per agent, including rate limiting and retries (cache misses only)",
+    ("agent",),
+)
+LLM_ATTEMPT_SECONDS = REGISTRY.histogram(
+    "llm_attempt_duration_seconds",
+    "Time per individual LLM attempt, excluding rate-limiter wait",
+    ("agent",),
+)
+LLM_ERRORS = REGISTRY.counter(
+    "llm_errors",
+    "Failed LLM attempts per agent by error code (HTTP status, timeout or exception type)",
+    ("agent", "code"),
+)
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "llm_cache_lookups",
+    "LLM response cache lookups per agent by result (hit, miss)",
+    ("agent", "result"),
+)
+LLM_RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "llm_rate_limit_wait_seconds",
+    "Time LLM calls spent waiting for the rate limiter",
+    ("agent",),
+)
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+_cache_disabled = not config.LLM_CACHE_ENABLED
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide LLM response cache, creating it on first use.
+
+    Returns:
+        The shared LLMResponseCache, or None if caching is disabled or the
+        cache file could not be opened
+    """
+    global _cache, _cache_disabled
+    if _cache_disabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None and not _cache_disabled:
+                try:
+                    _cache = LLMResponseCache(
+                        config.LLM_CACHE_PATH,
+                        ttl_seconds=config.LLM_CACHE_TTL_SECONDS,
+                        max_bytes=int(config.LLM_CACHE_MAX_MB * 1024 * 1024),
+                    )
+                    logger.info(f"LLM response cache enabled at {config.LLM_CACHE_PATH}")
+                except Exception as e:
+                    logger.warning(f"Failed to open LLM response cache, caching disabled: {e}")
+                    _cache_disabled = True
+    return _cache
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter shared by every LLM call.
+    
+    Budgets come from LLM_RATE_LIMIT_RPM / LLM_RATE_LIMIT_TPM; setting
+    LLM_RATE_LIMIT_SHARED_PATH shares them across worker processes.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(
+                    requests_per_minute=config.LLM_RATE_LIMIT_RPM,
+                    tokens_per_minute=config.LLM_RATE_LIMIT_TPM,
+                    max_wait=config.LLM_RATE_LIMIT_MAX_WAIT,
+                    shared_path=config.LLM_RATE_LIMIT_SHARED_PATH,
+                )
+    return _rate_limiter
+
+
+class LLMAttemptTimeout(TimeoutError):
+    """Raised when a single LLM attempt exceeds its deadline."""
+
+
+class LLMCallSlotsExhausted(TimeoutError):
+    """
+    Raised when no LLM call slot frees up in time, typically because
+    timed-out calls are still holding them. Not retried: another attempt
+    would only add a call to the backlog.
+    """
+
+
+# Errors worth retrying at the call level: quota, overload and timeouts
+RETRYABLE_LLM_ERRORS = (
+    ResourceExhausted,
+    ServiceUnavailable,
+    InternalServerError,
+    DeadlineExceeded,
+    LLMAttemptTimeout,
+)
+
+
+class _CallSlots:
+    """
+    Bounds the SDK calls running on the attempt executor, abandoned ones included.
+    
+    An attempt takes a slot before it is submitted, so it starts running at
+    once and its deadline never includes time queued behind other calls. The
+    SDK call can't be cancelled, so a timed-out (or losing hedged) call keeps
+    its slot until it actually returns; those calls are counted as abandoned.
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_flight = 0
+        self._abandoned = set()
+        self._condition = threading.Condition()
+    
+    def acquire(self, timeout: Optional[float]) -> bool:
+        """Take a slot, waiting up to timeout (None = indefinitely); False if none freed up."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout):
+                return False
+            self._in_flight += 1
+            return True
+    
+    def release(self, future: Optional[Future] = None) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._abandoned.discard(future)
+            self._condition.notify()
+    
+    def abandon(self, future: Future) -> None:
+        """Note that nobody waits for this call any more; it holds its slot until it returns."""
+        with self._condition:
+            if not future.done():
+                self._abandoned.add(future)
+    
+    def saturated(self) -> bool:
+        with self._condition:
+            return self._in_flight >= self.limit
+    
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {"in_flight": self._in_flight, "abandoned": len(self._abandoned)}
+
+
+# Runs individual attempts so each one can be abandoned at its deadline
+_attempt_executor = ThreadPoolExecutor(
+    max_workers=config.LLM_MAX_CONCURRENCY,
+    thread_name_prefix="llm-call",
+)
+_call_slots = _CallSlots(config.LLM_MAX_CONCURRENCY)
+
+
+def _submit_attempt(func: Callable[[], Any]) -> Future:
+    """Run func on the attempt executor under a slot the caller has already taken."""
+    slots = _call_slots
+    try:
+        future = _attempt_executor.submit(contextvars.copy_context().run, func)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(slots.release)
+    return future
+
+
+class LatencyTracker:
+    """Rolling window of recent successful attempt latencies per agent."""
+    
+    def __init__(self, window: int = 200):
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+    
+    def record(self, agent_name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[agent_name].append(seconds)
+    
+    def percentile(self, agent_name: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        """Return the pct-th percentile latency, or None with fewer than min_samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(agent_name, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+
+_latency_tracker = LatencyTracker()
+_hedge_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"fired": 0, "won": 0})
+_hedge_stats_lock = threading.Lock()
+
+_current_hedge_budget: contextvars.ContextVar[Optional[RetryBudget]] = contextvars.ContextVar(
+    "hedge_budget", default=None
+)
+
+
+@contextlib.contextmanager
+def hedge_budget(max_hedges: int):
+    """
+    Cap the number of hedged duplicate calls made while serving one request.
+    
+    Works like retry_budget: every LLM call inside the block, including calls
+    from parallel LangGraph nodes, draws from the same allowance.
+    """
+    budget = RetryBudget(max_hedges)
+    token = _current_hedge_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_hedge_budget.reset(token)
+
+
+def _hedge_delay(agent_name: str) -> Optional[float]:
+    """Seconds to wait before firing a hedge for this agent, or None to not hedge."""
+    if not config.LLM_HEDGE_ENABLED:
+        return None
+    observed = _latency_tracker.percentile(
+        agent_name,
+        config.LLM_HEDGE_PERCENTILE,
+        min_samples=config.LLM_HEDGE_MIN_SAMPLES,
+    )
+    if observed is None:
+        return None
+    return max(observed, config.LLM_HEDGE_MIN_DELAY)
+
+
+def _try_start_hedge(agent_name: str, limiter: RateLimiter, estimated_tokens: int) -> bool:
+    """Check the request's hedge allowance and take quota without waiting."""
+    budget = _current_hedge_budget.get()
+    if budget is not None and not budget.try_consume():
+        return False
+    if limiter.enabled:
+        try:
+            # A hedge that has to queue for quota can't beat the primary
+            limiter.acquire(estimated_tokens, timeout=0)
+        except RateLimitTimeout:
+            return False
+    with _hedge_stats_lock:
+        _hedge_stats[agent_name]["fired"] += 1
+    return True
+
+
+def _run_attempt(
+    func: Callable[[], Any],
+    agent_name: str,
+    limiter: RateLimiter,
+    estimated_tokens: int,
+    hedge: bool = True,
+) -> Any:
+    """
+    Run one LLM attempt under its deadline, hedging it if it runs long.
+    
+    If hedging is enabled (and ``hedge`` is set) and the call hasn't returned
+    by the configured percentile of this agent's recent latency, a duplicate
+    is fired and the first successful response wins. The SDK call can't be
+    cancelled, so a losing or timed-out call keeps running in the background
+    (holding its call slot) and its result is discarded.
+    
+    The deadline starts once the attempt has a call slot. Waiting for one is
+    bounded by the attempt timeout too, and when every slot is taken at that
+    point or when the attempt times out, LLMCallSlotsExhausted is raised
+    instead of a retryable timeout so stuck calls don't pile up.
+    """
+    timeout = config.LLM_ATTEMPT_TIMEOUT if config.LLM_ATTEMPT_TIMEOUT > 0 else None
+    hedge_delay = _hedge_delay(agent_name) if hedge else None
+    
+    if timeout is None and hedge_delay is None:
+        start = time.monotonic()
+        response = func()
+        _latency_tracker.record(agent_name, time.monotonic() - start)
+        return response
+    
+    slots = _call_slots
+    if not slots.acquire(timeout):
+        raise LLMCallSlotsExhausted(
+            f"No LLM call slot freed up within {timeout:.1f}s ({slots.stats()['abandoned']} abandoned calls)"
+        )
+    start = time.monotonic()
+    deadline = start + timeout if timeout is not None else None
+    primary = _submit_attempt(func)
+    pending = {primary}
+    hedge = None
+    
+    if hedge_delay is not None and (deadline is None or start + hedge_delay < deadline):
+        done, _ = wait(pending, timeout=hedge_delay)
+        # A hedge only runs on a free slot; it must not wait behind other calls
+        if not done and slots.acquire(0):
+            if _try_start_hedge(agent_name, limiter, estimated_tokens):
+                logger.info(f"Hedging slow {agent_name} call after {hedge_delay:.1f}s")
+                hedge = _submit_attempt(func)
+                pending.add(hedge)
+            else:
+                slots.release()
+    
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                error = future.exception()
+                if error is not None:
+                    last_error = error
+                    continue
+                _latency_tracker.record(agent_name, time.monotonic() - start)
+                if future is hedge:
+                    with _hedge_stats_lock:
+                        _hedge_stats[agent_name]["won"] += 1
+                return future.result()
+    finally:
+        for future in pending:
+            slots.abandon(future)
+    
+    if last_error is not None and not pending:
+        raise last_error
+    if slots.saturated():
+        stats = slots.stats()
+        raise LLMCallSlotsExhausted(
+            f"LLM attempt exceeded {timeout:.1f}s deadline with all {slots.limit} call slots taken "
+            f"({stats['abandoned']} abandoned calls); not retrying"
+        )
+    raise LLMAttemptTimeout(f"LLM attempt exceeded {timeout:.1f}s deadline")
+
+
+def hedge_stats() -> Dict[str, Dict[str, Any]]:
+    """Hedges fired and won per agent, with the hedge win rate."""
+    with _hedge_stats_lock:
+        return {
+            agent: {
+                "fired": counts["fired"],
+                "won": counts["won"],
+                "win_rate": counts["won"] / counts["fired"] if counts["fired"] else 0.0,
+            }
+            for agent, counts in _hedge_stats.items()
+        }
+
+
+def _error_code(error: BaseException) -> str:
+    """Metric label for a failed attempt: HTTP status for API errors, else a short name."""
+    if isinstance(error, LLMAttemptTimeout):
+        return "timeout"
+    if isinstance(error, LLMCallSlotsExhausted):
+        return "slots_exhausted"
+    if isinstance(error, RateLimitTimeout):
+        return "rate_limited"
+    code = getattr(error, "code", None)
+    if code is not None:
+        return str(int(code)) if isinstance(code, int) else str(code)
+    return type(error).__name__
+
+
+def _collect_llm_metrics():
+    """Scrape-time metrics for the response cache and hedging."""
+    cache = get_response_cache()
+    if cache is not None:
+        stats = cache.stats()
+        yield "llm_cache_hit_ratio", "gauge", "Response cache hit ratio since process start", [
+            ("", {}, stats["hit_ratio"])
+        ]
+        yield "llm_cache_entries", "gauge", "Entries in the response cache", [("", {}, stats["entries"])]
+        yield "llm_cache_bytes", "gauge", "Bytes of responses in the cache", [("", {}, stats["bytes"])]
+        yield "llm_cache_evictions", "counter", "Response cache evictions", [
+            ("_total", {}, stats["evictions"])
+        ]
+    slots = _call_slots.stats()
+    yield "llm_calls_in_flight", "gauge", "SDK calls running on the attempt executor", [
+        ("", {}, slots["in_flight"])
+    ]
+    yield "llm_calls_abandoned", "gauge", "Timed-out or losing hedged SDK calls still running", [
+        ("", {}, slots["abandoned"])
+    ]
+    hedges = hedge_stats()
+    yield "llm_hedges_fired", "counter", "Hedged duplicate LLM calls fired per agent", [
+        ("_total", {"agent": agent}, counts["fired"]) for agent, counts in hedges.items()
+    ]
+    yield "llm_hedges_won", "counter", "Hedged calls that returned before the primary per agent", [
+        ("_total", {"agent": agent}, counts["won"]) for agent, counts in hedges.items()
+    ]
+
+
+REGISTRY.register_collector(_collect_llm_metrics)
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Total token count reported by the API, if available."""
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    return total if isinstance(total, int) and total > 0 else None
+
+
+class _StreamedResponse:
+    """A streamed response reassembled into what generate_content returns."""
+    
+    __slots__ = ("text", "usage_metadata")
+    
+    def __init__(self, text: str, usage_metadata: Any):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+def _chunk_text(chunk: Any) -> str:
+    """
+    Text of a stream chunk, or "" for a chunk without a text part.
+    
+    On Vertex AI, .text raises ValueError for such chunks, and the final one
+    (carrying only usage_metadata and finish_reason) usually is one.
+    """
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+def _report_items(on_item: Callable[[Tuple, Any], None], items, agent_name: str) -> None:
+    """Pass completed JSON items to the caller; its failures never fail the call."""
+    for path, value in items:
+        try:
+            on_item(path, value)
+        except Exception as e:
+            logger.warning(f"Partial item callback failed for {agent_name}: {e}")
+
+
+def _model_identity(model: Any) -> tuple:
+    """Return (model_name, generation_config) for a GenerativeModel-like object."""
+    model_name = getattr(model, "_model_name", None) or type(model).__name__
+    generation_config = getattr(model, "_generation_config", None) or {}
+    if hasattr(generation_config, "to_dict"):
+        generation_config = generation_config.to_dict()
+    return model_name, generation_config
+
+
+def _is_cacheable(response_text: str, generation_config: Dict[str, Any]) -> bool:
+    """Only cache JSON responses that parse, so a malformed answer isn't replayed."""
+    if generation_config.get("response_mime_type") != "application/json":
+        return bool(response_text)
+    try:
+        json.loads(response_text)
+        return True
+    except (json.JSONDecodeError, TypeError):
+        return False
+
+
+@functools.lru_cache(maxsize=64)
+def _schema_generation_config(config_json: str) -> GenerationConfig:
+    """Build (once per distinct config) the SDK object for a config carrying a response_schema."""
+    return GenerationConfig(**json.loads(config_json))
+
+
+def _sdk_generation_config(model: Any, generation_config: Dict[str, Any]) -> Any:
+    """
+    Convert a per-call config dict into what generate_content accepts.
+    
+    Plain dicts are passed through, but for Vertex models a JSON-schema
+    response_schema has to go through GenerationConfig so the SDK converts
+    it to its Schema proto. Other backends receive the dict unchanged.
+    """
+    if "response_schema" not in generation_config or not isinstance(model, GenerativeModel):
+        return generation_config
+    return _schema_generation_config(json.dumps(generation_config, sort_keys=True))
+
+
+def call_llm(
+    model: Any,
+    prompt: str,
+    generation_config: Optional[Dict[str, Any]] = None,
+    agent_name: str = "llm",
+    on_item: Optional[Callable[[Tuple, Any], None]] = None,
+) -> str:
+    """
+    Call the model and return the response text.
+    
+    Checks the response cache first. On a miss, each attempt waits for the
+    shared rate limiter and runs under a per-attempt deadline, optionally
+    hedged with a duplicate call when it runs long; quota, overload and
+    timeout errors are retried with jittered exponential backoff, bounded
+    per call (LLM_MAX_RETRIES) and per request by the active RetryBudget.
+    
+    With ``on_item``, the response is generated with streaming and fed to an
+    IncrementalJSONParser; each top-level array element or object field is
+    passed to ``on_item`` as soon as it is complete (all at once on a cache
+    hit). Streamed attempts aren't hedged, and a retried attempt reports its
+    items again, so callers should key items by path.
+
+    Args:
+        model: GenerativeModel instance from get_llm
+        prompt: Full prompt text
+        generation_config: Per-call generation config (e.g., response_mime_type,
+            response_schema)
+        agent_name: Name of the calling agent, used for logging
+        on_item: Optional callback taking (path, value) for completed JSON
+            items, e.g. from partial_item_writer
+
+    Returns:
+        Response text from the model (or from the cache)
+    """
+    with tracing_utils.span("llm.call", agent=agent_name) as call_span:
+        generation_config = generation_config or {}
+        cache = get_response_cache()
+
+        cache_key = None
+        if cache is not None:
+            model_name, model_config = _model_identity(model)
+            effective_config = {**model_config, **generation_config}
+            cache_key = make_cache_key(model_name, effective_config, prompt)
+            try:
+                cached = cache.get(cache_key)
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed for {agent_name}: {e}")
+                cached = None
+            LLM_CACHE_LOOKUPS.inc(agent=agent_name, result="hit" if cached is not None else "miss")
+            if cached is not None:
+                logger.info(f"LLM cache hit for {agent_name}")
+                if call_span is not None:
+                    call_span.set_attribute("cache_hit", True)
+                LLM_CALLS.inc(agent=agent_name, outcome="cache_hit")
+                if on_item is not None:
+                    _report_items(on_item, IncrementalJSONParser().feed(cached), agent_name)
+                return cached
+
+        limiter = get_rate_limiter()
+        estimated_tokens = estimate_tokens(prompt)
+        sdk_generation_config = _sdk_generation_config(model, generation_config)
+        
+        def generate() -> Any:
+            with tracing_utils.span("llm.network", agent=agent_name):
+                return model.generate_content(prompt, generation_config=sdk_generation_config)
+        
+        def generate_streamed(abandoned: threading.Event) -> _StreamedResponse:
+            parser = IncrementalJSONParser()
+            usage_metadata = None
+            with tracing_utils.span("llm.network", agent=agent_name, stream=True):
+                chunks = model.generate_content(prompt, generation_config=sdk_generation_config, stream=True)
+                for chunk in chunks:
+                    # A timed-out attempt stops reading rather than report stale items
+                    if abandoned.is_set():
+                        break
+                    usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                    text = _chunk_text(chunk)
+                    if text:
+                        _report_items(on_item, parser.feed(text), agent_name)
+            return _StreamedResponse(parser.text, usage_metadata)
+        
+        def attempt() -> str:
+            with tracing_utils.span("llm.attempt", agent=agent_name):
+                if limiter.enabled:
+                    with tracing_utils.span("llm.rate_limit_wait", agent=agent_name):
+                        waited = limiter.acquire(estimated_tokens)
+                    LLM_RATE_LIMIT_WAIT_SECONDS.observe(waited, agent=agent_name)
+                attempt_start = time.perf_counter()
+                abandoned = threading.Event()
+                try:
+                    if on_item is None:
+                        response = _run_attempt(generate, agent_name, limiter, estimated_tokens)
+                    else:
+                        response = _run_attempt(
+                            functools.partial(generate_streamed, abandoned),
+                            agent_name,
+                            limiter,
+                            estimated_tokens,
+                            hedge=False,
+                        )
+                except Exception as e:
+                    LLM_ERRORS.inc(agent=agent_name, code=_error_code(e))
+                    raise
+                finally:
+                    abandoned.set()
+                    LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - attempt_start, agent=agent_name)
+                if limiter.enabled:
+                    limiter.record_usage(estimated_tokens, _usage_tokens(response))
+                return response.text
+        
+        call_start = time.perf_counter()
+        try:
+            response_text = exponential_backoff_retry(
+                attempt,
+                max_retries=config.LLM_MAX_RETRIES,
+                retryable_exceptions=RETRYABLE_LLM_ERRORS,
+                budget=get_retry_budget(),
+            )
+        except Exception:
+            LLM_CALLS.inc(agent=agent_name, outcome="error")
+            raise
+        finally:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - call_start, agent=agent_name)
+        LLM_CALLS.inc(agent=agent_name, outcome="ok")
+
+        if cache_key is not None and _is_cacheable(response_text, generation_config):
+            try:
+                cache.set(cache_key, response_text)
+            except Exception as e:
+                logger.warning(f"LLM cache store failed for {agent_name}: {e}")
+
+        return response_text
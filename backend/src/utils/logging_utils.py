@@ -15,11 +15,14 @@ def setup_logging(level: str = "INFO") -> None:
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
+    # Imported here: tracing_utils itself logs through this module
+    from src.utils.tracing_utils import CorrelationIdFilter
+    
     log_level = getattr(logging, level.upper(), logging.INFO)
     
     # Create formatter
     formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        fmt='%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
@@ -34,6 +37,7 @@ def setup_logging(level: str = "INFO") -> None:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
+    console_handler.addFilter(CorrelationIdFilter())
     root_logger.addHandler(console_handler)
 
 
@@ -0,0 +1,287 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+A small, dependency-free registry of labelled counters, gauges and
+histograms, rendered in the Prometheus text format by the API server's
+/metrics endpoint. Values that already live elsewhere (server queue depth,
+cache statistics, job counts) are exported through collectors evaluated at
+scrape time.
+"""
+
+import contextlib
+import functools
+import math
+import threading
+import time
+from typing import Dict, Any, Callable, Iterable, List, Sequence, Tuple
+from src.utils import tracing_utils
+
+# Seconds; covers fast local nodes through multi-minute LLM retries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# (metric name, type, help, [(sample suffix, labels, value), ...])
+CollectedMetric = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value: backslash, double quote and newline."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    """Escape HELP text: only backslash and newline (quotes are literal there)."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics. Subclasses hold one value per label set."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def collect(self) -> CollectedMetric:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> CollectedMetric:
+        with self._lock:
+            samples = [
+                ("_total", dict(zip(self.label_names, key)), value)
+                for key, value in self._values.items()
+            ]
+        return self.name, self.metric_type, self.documentation, samples
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def collect(self) -> CollectedMetric:
+        with self._lock:
+            samples = [("", dict(zip(self.label_names, key)), value) for key, value in self._values.items()]
+        return self.name, self.metric_type, self.documentation, samples
+
+
+class Histogram(_Metric):
+    """Cumulative bucketed distribution with sum and count."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any):
+        """Observe the duration of the enclosed block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> CollectedMetric:
+        samples = []
+        with self._lock:
+            for key, state in self._values.items():
+                labels = dict(zip(self.label_names, key))
+                for index, bound in enumerate(self.buckets):
+                    samples.append(("_bucket", {**labels, "le": _format_value(bound)}, state[index]))
+                samples.append(("_sum", labels, state[-2]))
+                samples.append(("_count", labels, state[-1]))
+        return self.name, self.metric_type, self.documentation, samples
+
+
+class MetricsRegistry:
+    """Named metrics plus scrape-time collectors, rendered as Prometheus text."""
+
+    def __init__(self, prefix: str = "resume_matcher_"):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[CollectedMetric]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Re-registration (e.g. module reload) returns the live metric
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, label_names, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedMetric]]) -> None:
+        """
+        Add a callable evaluated on every scrape.
+
+        It returns (name, type, help, samples) tuples like _Metric.collect, with
+        names given without the registry prefix. A failing collector is skipped.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(
+                    (self.prefix + name, metric_type, documentation, samples)
+                    for name, metric_type, documentation, samples in collector()
+                )
+            except Exception:
+                continue
+
+        lines = []
+        for name, metric_type, documentation, samples in families:
+            lines.append(f"# HELP {name} {_escape_help(documentation)}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served at /metrics
+REGISTRY = MetricsRegistry()
+
+GRAPH_NODE_SECONDS = REGISTRY.histogram(
+    "graph_node_duration_seconds",
+    "Wall time spent in each LangGraph node",
+    ("graph", "node"),
+)
+GRAPH_NODE_ERRORS = REGISTRY.counter(
+    "graph_node_errors",
+    "LangGraph node executions that raised",
+    ("graph", "node"),
+)
+
+
+def instrument_node(graph_name: str, node_name: str, func: Callable) -> Callable:
+    """
+    Wrap a LangGraph node function so its latency and failures are recorded.
+
+    Each execution is also traced as a "node.<name>" span; when the node
+    calls the LLM, its overhead before and after the calls is recorded too
+    (tracing_utils.record_node_phases).
+
+    Args:
+        graph_name: Graph label (e.g., "analysis")
+        node_name: Node name as registered with add_node
+        func: Node function taking the state dict
+
+    Returns:
+        Wrapped node function with the same signature
+    """
+    @functools.wraps(func)
+    def wrapper(state, *args, **kwargs):
+        start = time.perf_counter()
+        with tracing_utils.span(f"node.{node_name}", graph=graph_name, node=node_name) as node_span:
+            try:
+                return func(state, *args, **kwargs)
+            except Exception:
+                GRAPH_NODE_ERRORS.inc(graph=graph_name, node=node_name)
+                raise
+            finally:
+                GRAPH_NODE_SECONDS.observe(time.perf_counter() - start, graph=graph_name, node=node_name)
+                tracing_utils.record_node_phases(node_span)
+
+    return wrapper
@@ -0,0 +1,293 @@
+"""
+Rate limiting utilities for Vertex AI quota.
+
+Every LLM call passes through a process-wide RateLimiter with separate
+request-per-minute and token-per-minute token buckets. Waiters are served
+first-come first-served. A SQLite-backed bucket can be used instead so that
+several worker processes share one budget.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call would have to wait longer than the limiter allows."""
+
+
+class TokenBucket:
+    """
+    Thread-safe, FIFO-fair token bucket.
+
+    Refills continuously at ``rate_per_minute`` up to ``capacity``. Callers
+    take a ticket and are served strictly in arrival order, so a large
+    request can't be starved by a stream of small ones.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: Tokens added per minute
+            capacity: Maximum burst size (defaults to one minute of tokens)
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._condition = threading.Condition()
+        self._next_ticket = 0
+        self._now_serving = 0
+        self._skipped = set()
+
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last refill. Caller holds the lock."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Block until ``amount`` tokens are available, then take them.
+
+        Args:
+            amount: Tokens to take (clamped to capacity so it can always succeed)
+            timeout: Maximum seconds to wait, None to wait indefinitely
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If the tokens can't be taken within timeout
+        """
+        amount = min(amount, self.capacity)
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            try:
+                while True:
+                    if ticket == self._now_serving:
+                        self._refill()
+                        if self._tokens >= amount:
+                            self._tokens -= amount
+                            return time.monotonic() - start
+                        wait = (amount - self._tokens) / self.rate_per_second
+                    else:
+                        wait = None
+
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise RateLimitTimeout(
+                                f"Rate limit wait exceeded {timeout:.1f}s"
+                            )
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._condition.wait(wait)
+            finally:
+                if ticket == self._now_serving:
+                    self._now_serving += 1
+                else:
+                    # Timed out while queued; later tickets must not wait on this one
+                    self._skipped.add(ticket)
+                while self._now_serving in self._skipped:
+                    self._skipped.discard(self._now_serving)
+                    self._now_serving += 1
+                self._condition.notify_all()
+
+    def debit(self, amount: float) -> None:
+        """Take tokens without waiting (may go negative), e.g. to settle actual usage."""
+        with self._condition:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class SharedTokenBucket:
+    """
+    Token bucket whose state lives in a SQLite file shared across processes.
+
+    Each acquire runs in an IMMEDIATE transaction so concurrent processes
+    see a consistent token count. Ordering across processes is approximate.
+    """
+
+    def __init__(self, path: str, name: str, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            path: SQLite database file shared by all worker processes
+            name: Bucket name (e.g., "requests" or "tokens")
+            rate_per_minute: Tokens added per minute
+            capacity: Maximum burst size (defaults to one minute of tokens)
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.path = path
+        self.name = name
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            "name TEXT PRIMARY KEY, tokens REAL NOT NULL, last_refill REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO token_buckets (name, tokens, last_refill) VALUES (?, ?, ?)",
+            (name, self.capacity, time.time()),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _take(self, amount: float, allow_negative: bool = False) -> float:
+        """Try to take tokens; return 0 on success or the seconds until enough refill."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, last_refill = conn.execute(
+                "SELECT tokens, last_refill FROM token_buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            tokens = min(self.capacity, tokens + max(0.0, now - last_refill) * self.rate_per_second)
+            if tokens >= amount or allow_negative:
+                tokens = min(self.capacity, tokens - amount)
+                wait = 0.0
+            else:
+                wait = (amount - tokens) / self.rate_per_second
+            conn.execute(
+                "UPDATE token_buckets SET tokens = ?, last_refill = ? WHERE name = ?",
+                (tokens, now, self.name),
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Block until ``amount`` tokens are available, then take them.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If the tokens can't be taken within timeout
+        """
+        amount = min(amount, self.capacity)
+        start = time.monotonic()
+        while True:
+            wait = self._take(amount)
+            if wait == 0.0:
+                return time.monotonic() - start
+            if timeout is not None and time.monotonic() - start + wait > timeout:
+                raise RateLimitTimeout(f"Rate limit wait exceeded {timeout:.1f}s")
+            # Poll in short steps so other processes get a fair chance
+            time.sleep(min(wait, 0.5))
+
+    def debit(self, amount: float) -> None:
+        """Take tokens without waiting (may go negative), e.g. to settle actual usage."""
+        self._take(amount, allow_negative=True)
+
+
+class RateLimiter:
+    """
+    Combined request-per-minute and token-per-minute limiter.
+
+    Either budget may be disabled by passing 0. Token usage is reserved from
+    an estimate before the call and settled against actual usage afterwards.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_wait: Optional[float] = None,
+        shared_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            requests_per_minute: Request budget (0 disables)
+            tokens_per_minute: Token budget (0 disables)
+            max_wait: Maximum seconds a call may wait before RateLimitTimeout
+            shared_path: SQLite file to share budgets across processes (None = in-process)
+        """
+        self.max_wait = max_wait
+        self._request_bucket = self._make_bucket("requests", requests_per_minute, shared_path)
+        self._token_bucket = self._make_bucket("tokens", tokens_per_minute, shared_path)
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._wait_seconds = 0.0
+
+    @staticmethod
+    def _make_bucket(name: str, rate_per_minute: float, shared_path: Optional[str]):
+        if not rate_per_minute or rate_per_minute <= 0:
+            return None
+        if shared_path:
+            return SharedTokenBucket(shared_path, name, rate_per_minute)
+        return TokenBucket(rate_per_minute)
+
+    @property
+    def enabled(self) -> bool:
+        return self._request_bucket is not None or self._token_bucket is not None
+
+    def acquire(self, estimated_tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Wait for one request slot and ``estimated_tokens`` of token budget.
+
+        Args:
+            estimated_tokens: Token budget to reserve
+            timeout: Maximum seconds to wait (defaults to max_wait; 0 = don't wait)
+
+        Returns:
+            Total seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If the combined wait would exceed the timeout
+        """
+        max_wait = self.max_wait if timeout is None else timeout
+        waited = 0.0
+        if self._request_bucket is not None:
+            waited += self._request_bucket.acquire(1, timeout=max_wait)
+        if self._token_bucket is not None and estimated_tokens > 0:
+            remaining = None if max_wait is None else max(max_wait - waited, 0.0)
+            waited += self._token_bucket.acquire(estimated_tokens, timeout=remaining)
+        with self._lock:
+            self._calls += 1
+            self._wait_seconds += waited
+        if waited > 0.05:
+            logger.debug(f"Rate limiter delayed LLM call by {waited:.2f}s")
+        return waited
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Settle the token budget once the real token count is known."""
+        if self._token_bucket is None or actual_tokens is None:
+            return
+        difference = actual_tokens - estimated_tokens
+        if difference != 0:
+            self._token_bucket.debit(difference)
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of calls that went through the limiter and total time spent waiting."""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "wait_seconds_total": self._wait_seconds,
+            }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for budget reservation (about 4 characters per token)."""
+    return max(1, len(text) // 4)
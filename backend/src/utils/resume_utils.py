@@ -0,0 +1,99 @@
+"""
+Structured resume validated once per request, with prompt-ready sections.
+
+Extraction (or preparation, when the caller sends resume_structured) is the
+only place the resume is validated against ResumeStructured. It writes the
+validated resume back to ``resume_structured`` and the JSON each section
+agent puts in its prompt to ``resume_sections``, so the scoring and
+optimization nodes neither re-validate the whole resume nor re-serialize
+their section. Nodes of a run share the same ``resume_sections`` dict and
+must treat it as read-only; the entry batches get a copy with their
+section re-serialized for their slice of entries.
+"""
+
+import json
+from typing import Any, Dict, Optional
+from src.models.schemas import ResumeStructured
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Sections with a prompt-ready view in resume_sections
+RESUME_SECTIONS = ("skills", "experience", "education", "projects", "meta")
+
+
+def section_json(data: Any) -> str:
+    """Serialize a section's validated data the way the agents' prompts show it."""
+    return json.dumps(data, indent=2)
+
+
+def resume_state(resume: ResumeStructured, provided: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the state update for a validated resume.
+
+    Args:
+        resume: Validated resume
+        provided: The resume_structured the caller sent, if any; keys the
+            model doesn't know (e.g. a summary) are kept
+
+    Returns:
+        ``{"resume_structured": dict, "resume_sections": {section: JSON}}``
+    """
+    data = resume.model_dump()
+    sections = {section: section_json(data[section]) for section in RESUME_SECTIONS}
+    if provided:
+        data = {**provided, **data}
+    return {"resume_structured": data, "resume_sections": sections}
+
+
+def prepare_resume(resume_structured: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a caller-provided resume_structured once for the whole run.
+
+    Args:
+        resume_structured: ResumeStructured as dict
+
+    Returns:
+        State update from resume_state
+
+    Raises:
+        ValueError: If the data doesn't match ResumeStructured
+    """
+    try:
+        resume = ResumeStructured(**resume_structured)
+    except Exception as e:
+        logger.error(f"Failed to parse resume_structured: {e}")
+        raise ValueError(f"Invalid resume_structured data: {e}")
+    return resume_state(resume, resume_structured)
+
+
+def validated_resume(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The validated resume_structured of a node's state.
+
+    Raises:
+        ValueError: If an unprepared resume_structured is invalid
+    """
+    if state.get("resume_sections") is None:
+        return prepare_resume(state.get("resume_structured") or {})["resume_structured"]
+    return state.get("resume_structured") or {}
+
+
+def resume_sections(state: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Prompt-ready JSON of each resume section for a node.
+
+    Args:
+        state: Graph state
+
+    Returns:
+        Section name -> JSON; computed here (validating the resume) only when
+        the state wasn't prepared, e.g. a node invoked outside the graphs
+
+    Raises:
+        ValueError: If an unprepared resume_structured is invalid
+    """
+    sections = state.get("resume_sections")
+    if sections is None:
+        sections = prepare_resume(state.get("resume_structured") or {})["resume_sections"]
+    return sections
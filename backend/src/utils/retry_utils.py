@@ -2,9 +2,12 @@
 Retry utilities for handling API rate limits and transient errors.
 """
 
+import contextlib
+import contextvars
+import threading
 import time
 import random
-from typing import Callable, TypeVar, Optional
+from typing import Callable, TypeVar, Optional, Tuple, Type
 from google.api_core import retry
 from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
 from src.utils.logging_utils import get_logger
@@ -14,13 +17,68 @@ logger = get_logger(__name__)
 T = TypeVar('T')
 
 
+class RetryBudget:
+    """
+    Cap on the total number of retries spent on behalf of one request.
+    
+    Shared by every LLM call made while serving the request, so a degraded
+    backend costs at most ``max_retries`` extra calls per request instead of
+    multiplying load by the per-call retry count.
+    """
+    
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self._used = 0
+        self._lock = threading.Lock()
+    
+    def try_consume(self) -> bool:
+        """Take one retry from the budget; False if it is exhausted."""
+        with self._lock:
+            if self._used >= self.max_retries:
+                return False
+            self._used += 1
+            return True
+    
+    @property
+    def used(self) -> int:
+        return self._used
+
+
+_current_retry_budget: contextvars.ContextVar[Optional[RetryBudget]] = contextvars.ContextVar(
+    "retry_budget", default=None
+)
+
+
+@contextlib.contextmanager
+def retry_budget(max_retries: int):
+    """
+    Scope a RetryBudget to the current request.
+    
+    Calls made inside the block (including LangGraph nodes, which run with a
+    copy of the caller's context) share the budget.
+    """
+    budget = RetryBudget(max_retries)
+    token = _current_retry_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_retry_budget.reset(token)
+
+
+def get_retry_budget() -> Optional[RetryBudget]:
+    """Return the RetryBudget for the current request, if one is active."""
+    return _current_retry_budget.get()
+
+
 def exponential_backoff_retry(
     func: Callable[[], T],
     max_retries: int = 3,
     initial_delay: float = 1.0,
     max_delay: float = 60.0,
     backoff_factor: float = 2.0,
-    jitter: bool = True
+    jitter: bool = True,
+    retryable_exceptions: Tuple[Type[BaseException], ...] = (ResourceExhausted, ServiceUnavailable),
+    budget: Optional[RetryBudget] = None,
 ) -> T:
     """
     Retry a function with exponential backoff on rate limit errors.
@@ -32,6 +90,8 @@ def exponential_backoff_retry(
         max_delay: Maximum delay in seconds
         backoff_factor: Multiplier for delay on each retry
         jitter: Add random jitter to delay
+        retryable_exceptions: Exception types that trigger a retry
+        budget: Optional per-request RetryBudget; no retry happens once it is spent
     
     Returns:
         Result of the function call
@@ -44,9 +104,13 @@ def exponential_backoff_retry(
     for attempt in range(max_retries + 1):
         try:
             return func()
-        except (ResourceExhausted, ServiceUnavailable) as e:
+        except retryable_exceptions as e:
             last_exception = e
             
+            if attempt < max_retries and budget is not None and not budget.try_consume():
+                logger.error(f"Retry budget exhausted ({budget.max_retries} retries), giving up")
+                raise
+            
             if attempt < max_retries:
                 # Calculate delay with exponential backoff
                 delay = min(initial_delay * (backoff_factor ** attempt), max_delay)
@@ -63,7 +127,7 @@ def exponential_backoff_retry(
                     )
                 else:
                     logger.warning(
-                        f"Service unavailable (attempt {attempt + 1}/{max_retries + 1}). "
+                        f"Transient error {type(e).__name__} (attempt {attempt + 1}/{max_retries + 1}). "
                         f"Retrying in {delay:.2f} seconds..."
                     )
                 
@@ -1,8 +1,13 @@
 """
 Schema utilities for cleaning JSON schemas for Vertex AI compatibility.
+
+Also holds the cleaned response schemas used for constrained decoding,
+computed once at import so no request pays for schema generation.
 """
 
-from typing import Dict, Any, Set
+from typing import Dict, Any, Optional, Set
+from src import config
+from src.models.schemas import SectionScore, SectionOptimization, ResumeStructured
 
 
 def clean_schema_for_vertex_ai(schema: Dict[str, Any]) -> Dict[str, Any]:
@@ -140,3 +145,42 @@ def _convert_anyof(obj: Any) -> Any:
     else:
         return obj
 
+
+
+# Cleaned response schemas, built once and shared by every agent
+SECTION_SCORE_SCHEMA = clean_schema_for_vertex_ai(SectionScore.model_json_schema())
+SECTION_SCORE_LIST_SCHEMA = {"type": "array", "items": SECTION_SCORE_SCHEMA}
+SECTION_OPTIMIZATION_SCHEMA = clean_schema_for_vertex_ai(SectionOptimization.model_json_schema())
+SECTION_OPTIMIZATION_LIST_SCHEMA = {"type": "array", "items": SECTION_OPTIMIZATION_SCHEMA}
+RESUME_STRUCTURED_SCHEMA = clean_schema_for_vertex_ai(ResumeStructured.model_json_schema())
+
+
+def response_schema_enabled() -> bool:
+    """Whether agents should request constrained decoding (LLM_RESPONSE_SCHEMA)."""
+    return config.LLM_RESPONSE_SCHEMA
+
+
+def json_generation_config(response_schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the per-call generation config for a JSON-producing agent.
+    
+    Args:
+        response_schema: Cleaned schema to enforce when constrained decoding is enabled
+    
+    Returns:
+        Generation config dict for call_llm
+    """
+    generation_config: Dict[str, Any] = {"response_mime_type": "application/json"}
+    if response_schema is not None and response_schema_enabled():
+        generation_config["response_schema"] = response_schema
+    return generation_config
+
+
+def schema_prompt_block(block: str) -> str:
+    """
+    Return a prompt's prose description of the output format.
+    
+    With constrained decoding the schema is enforced by the API, so the prose
+    copy is dropped to keep prompts short.
+    """
+    return "" if response_schema_enabled() else block
@@ -0,0 +1,119 @@
+"""
+Fast JSON serialization and validation helpers.
+
+Responses and request bodies go through dumps_bytes / loads, which use
+orjson when it is installed (JSON_BACKEND=auto, the default) and the
+standard library otherwise; both accept and produce UTF-8 bytes so the API
+never round-trips bodies through str. LLM output is validated straight from
+its JSON text with validate_json, which lets pydantic-core parse and validate
+in one pass through a TypeAdapter built once per type.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Optional, Type, TypeVar, Union
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from src import config
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+T = TypeVar("T")
+
+_use_orjson = orjson is not None and config.JSON_BACKEND != "json"
+if config.JSON_BACKEND == "orjson" and orjson is None:
+    logger.warning("JSON_BACKEND=orjson but orjson is not installed, using the json module")
+
+
+def json_backend() -> str:
+    """Name of the JSON library in use ("orjson" or "json")."""
+    return "orjson" if _use_orjson else "json"
+
+
+def _default(value: Any) -> Any:
+    """Serialize values the JSON libraries don't know (models, sets, ...)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """
+    Serialize a value to compact UTF-8 JSON bytes.
+
+    Args:
+        value: JSON-compatible value; pydantic models are dumped, other
+            unknown types are converted with str()
+
+    Returns:
+        The encoded JSON
+    """
+    if _use_orjson:
+        try:
+            return orjson.dumps(value, default=_default)
+        except TypeError:
+            # Non-str dict keys; the option is slower, so only on the rare payload that needs it
+            return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON from bytes or str.
+
+    Raises:
+        ValueError: If the data is not valid JSON (json.JSONDecodeError and
+            orjson.JSONDecodeError are both ValueErrors)
+    """
+    if _use_orjson:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter for a type, built once; building one compiles the validator."""
+    return TypeAdapter(tp)
+
+
+def validate_json(tp: Type[T], data: Union[bytes, str]) -> T:
+    """
+    Parse and validate JSON text against a type in one pass.
+
+    Args:
+        tp: Model or type (e.g. SectionScore, List[SectionOptimization])
+        data: JSON text as bytes or str
+
+    Returns:
+        The validated value
+
+    Raises:
+        pydantic.ValidationError: If the text is not valid JSON or doesn't
+            match the type (a ValueError)
+    """
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        return tp.model_validate_json(data)
+    return type_adapter(tp).validate_json(data)
+
+
+def try_validate_json(tp: Type[T], data: Union[bytes, str]) -> Optional[T]:
+    """
+    validate_json for the common case where LLM output is already well-formed.
+
+    Returns:
+        The validated value, or None if the text is not valid JSON of that
+        shape; callers then take their slower repairing / error-reporting path
+    """
+    try:
+        return validate_json(tp, data)
+    except ValidationError:
+        return None
@@ -4,7 +4,7 @@ Text processing utilities for resume and job description handling.
 
 import re
 import json
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 def normalize_whitespace(text: str) -> str:
@@ -47,6 +47,40 @@ def truncate_for_prompt(text: str, max_chars: int = 10000) -> str:
     return truncated + "..."
 
 
+def format_job_requirements(jd_analysis: Optional[Dict[str, Any]]) -> str:
+    """
+    Format pre-extracted job requirements as a compact prompt block.
+    
+    Args:
+        jd_analysis: Output of the shared JD analysis stage (may be None or empty)
+    
+    Returns:
+        A "KEY JOB REQUIREMENTS" block preceded by a blank line, or "" if
+        nothing was extracted
+    """
+    if not jd_analysis:
+        return ""
+    
+    lines = []
+    role = jd_analysis.get("job_role")
+    if role and role != "Unknown":
+        seniority = jd_analysis.get("job_seniority")
+        lines.append(f"- Role: {role}" + (f" ({seniority})" if seniority else ""))
+    for label, key, limit in (
+        ("Key skills", "job_key_skills", 15),
+        ("Tech stack", "job_tech_stack", 15),
+        ("Key responsibilities", "job_key_responsibilities", 8),
+        ("Focus areas", "focus_areas", 5),
+    ):
+        values = [str(value) for value in (jd_analysis.get(key) or []) if value][:limit]
+        if values:
+            lines.append(f"- {label}: {'; '.join(values)}")
+    
+    if not lines:
+        return ""
+    return "\n\nKEY JOB REQUIREMENTS (extracted from the job description):\n" + "\n".join(lines)
+
+
 def clean_resume_text(text: str) -> str:
     """
     Clean and normalize resume text for processing.
@@ -64,110 +98,206 @@ def clean_resume_text(text: str) -> str:
     return text.strip()
 
 
-def clean_json_response(text: str) -> str:
+
+
+# Tokens of a JSON-ish LLM response. A string (double- or, Python-style,
+# single-quoted) runs to its closing quote or, if truncated, to the end of the
+# text; anything that can't start a token is a stray (code fences, prose,
+# stray Unicode) and is dropped.
+_JSON_START = re.compile(r'[{\[]')
+_JSON_TOKEN = re.compile(
+    r'(?P<string>"[^"\\]*(?:\\.[^"\\]*)*)(?P<quote>")?'
+    r"|'(?P<single>[^'\\]*(?:\\.[^'\\]*)*)'?"
+    r'|(?P<open>[{\[])'
+    r'|(?P<close>[}\]])'
+    r'|(?P<colon>:)'
+    r'|(?P<comma>,)'
+    r'|(?P<word>[A-Za-z0-9_+\-.]+)'
+    r'|(?P<skip>[^"\'{}\[\]:,A-Za-z0-9_+\-.]+)',
+    re.DOTALL,
+)
+# Escapes of a single-quoted string body, and the double quotes it may contain
+_SINGLE_QUOTED_ESCAPE = re.compile(r'\\(.)|"', re.DOTALL)
+_JSON_ESCAPE = re.compile(r'\\(["\\/bfnrt]|u[0-9a-fA-F]{4})?')
+_JSON_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_JSON_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null",
+}
+
+
+def _repair_string(body: str) -> str:
+    """Close a string token, doubling backslashes that don't start a valid escape."""
+    if "\\" in body:
+        body = _JSON_ESCAPE.sub(lambda m: m.group(0) if m.group(1) else "\\\\", body)
+    return body + '"'
+
+
+def _repair_single_quoted(body: str) -> str:
+    """Turn a single-quoted string's body into a JSON string."""
+    body = _SINGLE_QUOTED_ESCAPE.sub(
+        lambda m: '\\"' if m.group(1) is None else ("'" if m.group(1) == "'" else m.group(0)),
+        body,
+    )
+    return _repair_string('"' + body)
+
+
+def _repair_literal(word: str) -> str:
+    """Map a bare word to a JSON literal or number, quoting it if it is neither."""
+    literal = _JSON_LITERALS.get(word)
+    if literal is not None:
+        return literal
+    if _JSON_NUMBER.fullmatch(word):
+        return word
+    # A number cut off mid-exponent or after the decimal point
+    trimmed = word.rstrip(".eE+-")
+    if trimmed and _JSON_NUMBER.fullmatch(trimmed):
+        return trimmed
+    return json.dumps(word)
+
+
+def _value_slot(frame: List[Any], out: List[str]) -> bool:
     """
-    Clean and extract JSON from LLM response text.
-    Handles markdown code blocks, extra characters, and malformed JSON.
+    Emit what must precede a value in a container; False if no value fits here.
+    
+    A frame is [closer, expecting, items]; an object expects "key", "colon" or
+    "value". Commas are emitted before every item but the first rather than
+    copied from the input, which drops trailing and doubled commas and fills in
+    missing ones.
+    """
+    if frame[0] == "]":
+        if frame[2]:
+            out.append(",")
+    elif frame[1] == "colon":
+        out.append(":")
+    elif frame[1] != "value":
+        return False
+    frame[1] = "key"
+    frame[2] += 1
+    return True
+
+
+def _close_frame(frame: List[Any], out: List[str]) -> None:
+    """Close a container, completing a key left without a value."""
+    if frame[0] == "}":
+        if frame[1] == "colon":
+            out.append(":null")
+        elif frame[1] == "value":
+            out.append("null")
+    out.append(frame[0])
+
+
+def parse_json_response(text: str) -> Any:
+    """
+    Parse JSON from LLM response text, repairing it if needed.
+    
+    Well-formed responses, bare or wrapped in code fences or prose, are
+    parsed directly. Otherwise a single pass over
+    the text, starting at the first { or [, rebuilds the JSON while tracking
+    the open containers: code fences, prose and stray characters outside
+    strings are dropped, trailing commas removed and missing ones inserted,
+    single-quoted strings converted, unquoted keys and words quoted,
+    mismatched closers ignored, anything after the outermost container
+    discarded, and a truncated response closed (open string, dangling key,
+    open containers).
+    
+    A bare word where an object expects its next key, with no comma after the
+    previous value, is refused rather than guessed at: it is almost always
+    prose spilling out of a string with an unescaped quote in it
+    (``{"reason": "role at "Acme" was great"}``), and quoting it as a key
+    would invent one.
     
     Args:
-        text: Raw response text that should contain JSON
+        text: Raw response text that should contain a JSON object or array
     
     Returns:
-        Cleaned JSON string ready for parsing
+        The parsed object or array
+    
+    Raises:
+        ValueError: If no JSON container is found, a bare word follows a value
+            where a key is expected, or the repaired text still doesn't parse
+            (json.JSONDecodeError is a ValueError)
     """
-    # Remove markdown code blocks if present
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
-    text = text.strip()
-    
-    # Try to extract JSON object using regex
-    # Look for content between first { and last }
-    json_match = re.search(r'\{.*\}', text, re.DOTALL)
-    if json_match:
-        text = json_match.group(0)
-    
-    # Remove stray characters that appear before closing brackets/braces
-    # Pattern 1: quote, whitespace, stray char(s), closing bracket
-    # Example: "value"\n  腮] -> "value"\n]
-    text = re.sub(r'(")\s*[^\s"\[\]{},:\w\-_\.]+\s*([\]}])', r'\1\2', text)
-    # Pattern 2: word/quote, whitespace, stray char(s), closing bracket  
-    # Example: Concepts\n  腮] -> Concepts\n]
-    text = re.sub(r'(["\w])\s+[^\s"\[\]{},:\w\-_\.]+\s*([\]}])', r'\1\2', text)
-    
-    # More aggressive: remove any non-ASCII, non-JSON characters outside of strings
-    # We'll do this by processing character by character while tracking string state
-    cleaned = []
-    in_string = False
-    escape_next = False
-    
-    for i, char in enumerate(text):
-        if escape_next:
-            cleaned.append(char)
-            escape_next = False
-            continue
-        
-        if char == '\\':
-            escape_next = True
-            cleaned.append(char)
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        pass
+    
+    start = _JSON_START.search(text)
+    if start is None:
+        raise ValueError("No JSON object or array found in response")
+    
+    # Most malformed responses are only wrapped in fences or prose
+    end = text.rfind("}" if start.group() == "{" else "]")
+    if end > start.start():
+        try:
+            return json.loads(text[start.start():end + 1], strict=False)
+        except ValueError:
+            pass
+    
+    out: List[str] = []
+    stack: List[List[Any]] = []
+    comma = False  # A comma since the last token
+    for match in _JSON_TOKEN.finditer(text, start.start()):
+        kind = match.lastgroup
+        if kind == "skip":
             continue
-        
-        if char == '"':
-            in_string = not in_string
-            cleaned.append(char)
+        if kind == "comma":
+            comma = True
             continue
+        after_comma, comma = comma, False
         
-        if in_string:
-            # Inside string: keep all characters
-            cleaned.append(char)
+        if kind == "open":
+            token = match.group()
+            if stack and not _value_slot(stack[-1], out):
+                continue
+            out.append(token)
+            stack.append(["}", "key", 0] if token == "{" else ["]", "value", 0])
             continue
         
-        # Outside string: filter invalid characters
-        # Allow: JSON structure chars, whitespace, alphanumeric, and common JSON value chars
-        if (char in ['{', '}', '[', ']', ',', ':', ' ', '\n', '\t', '\r'] or
-            char.isalnum() or 
-            char in ['-', '_', '.', '+', 'E', 'e', 't', 'r', 'u', 'f', 'a', 'l', 's', 'n', 'N']):
-            cleaned.append(char)
-        # Skip everything else (stray Unicode characters, etc.)
-    
-    text = ''.join(cleaned)
-    
-    # Fix common JSON issues
-    # Remove trailing commas before closing brackets/braces
-    text = re.sub(r',(\s*[}\]])', r'\1', text)
-    
-    # Find the last valid closing brace to remove any trailing garbage
-    brace_count = 0
-    bracket_count = 0
-    last_valid_pos = -1
-    in_string = False
-    escape_next = False
-    
-    for i, char in enumerate(text):
-        if escape_next:
-            escape_next = False
-            continue
-        if char == '\\':
-            escape_next = True
-            continue
-        if char == '"' and not escape_next:
-            in_string = not in_string
-            continue
-        if not in_string:
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0 and bracket_count == 0:
-                    last_valid_pos = i
+        frame = stack[-1]
+        if kind in ("string", "quote", "single"):
+            if kind == "single":
+                token = _repair_single_quoted(match.group("single"))
+            else:
+                token = _repair_string(match.group("string"))
+            if frame[0] == "}" and frame[1] == "key":
+                if frame[2]:
+                    out.append(",")
+                out.append(token)
+                frame[1] = "colon"
+            elif _value_slot(frame, out):
+                out.append(token)
+        elif kind == "word":
+            word = match.group()
+            if frame[0] == "}" and frame[1] == "key":
+                # Unquoted key
+                if frame[2] and not after_comma:
+                    raise ValueError(f"Unexpected {word!r} after a value where a key was expected")
+                if frame[2]:
+                    out.append(",")
+                out.append(json.dumps(word))
+                frame[1] = "colon"
+            elif _value_slot(frame, out):
+                out.append(_repair_literal(word))
+        elif kind == "colon":
+            if frame[0] == "}" and frame[1] == "colon":
+                out.append(":")
+                frame[1] = "value"
+        else:
+            closer = match.group()
+            if not any(open_frame[0] == closer for open_frame in stack):
+                continue
+            while True:
+                open_frame = stack.pop()
+                _close_frame(open_frame, out)
+                if open_frame[0] == closer:
                     break
-            elif char == '[':
-                bracket_count += 1
-            elif char == ']':
-                bracket_count -= 1
+            if not stack:
+                break
     
-    # If we found a valid closing position, truncate everything after it
-    if last_valid_pos > 0:
-        text = text[:last_valid_pos + 1]
+    # Truncated response: close whatever is still open
+    while stack:
+        _close_frame(stack.pop(), out)
     
-    return text.strip()
-
+    return json.loads("".join(out), strict=False)
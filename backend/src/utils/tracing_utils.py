@@ -0,0 +1,364 @@
+"""
+Lightweight request tracing with OpenTelemetry-compatible export.
+
+Each request runs inside a Trace identified by its correlation id. Spans
+opened with ``span()`` nest through contextvars, so they follow the request
+into LangGraph's node threads and the LLM attempt executor without passing
+anything explicitly. When the trace finishes its critical path is computed
+and it is handed to the configured exporters:
+
+- ``otlp-json``: one OTLP/JSON ``resourceSpans`` document per line, readable
+  by the OpenTelemetry Collector's otlpjsonfile receiver
+- ``chrome``: one Chrome trace-event file per trace, for chrome://tracing
+  or Perfetto
+
+Exporters are selected with TRACE_EXPORTERS (comma-separated) and write to
+TRACE_DIR.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, Any, Iterator, List, Optional
+from src.config import TRACE_DIR, TRACE_EXPORTERS, TRACE_SERVICE_NAME
+from src.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+_STATUS_UNSET = 0
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("span_id", "parent_id", "name", "start_ns", "end_ns", "attributes",
+                 "status", "thread_id", "thread_name")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Optional[Dict[str, Any]] = None,
+                 start_ns: Optional[int] = None):
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = _STATUS_UNSET
+        current = threading.current_thread()
+        self.thread_id = current.ident or 0
+        self.thread_name = current.name
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, correlation_id: str):
+        self.correlation_id = correlation_id
+        # A request and the background job it submits share a correlation id
+        # but are separate traces
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def children(self, span: Span) -> List[Span]:
+        with self._lock:
+            return [s for s in self.spans if s.parent_id == span.span_id and s.end_ns is not None]
+
+    def root(self) -> Optional[Span]:
+        with self._lock:
+            return next((s for s in self.spans if s.parent_id is None), None)
+
+    def critical_path(self, span: Optional[Span] = None) -> List[Span]:
+        """
+        Return the chain of spans that determined the end-to-end latency.
+
+        Walks backwards from the end of ``span`` (the root by default): the
+        child that finished last is on the critical path, then the child that
+        finished last before that one started, and so on, recursing into each
+        chosen child. For a parallel fan-out this picks the slowest branch.
+        """
+        span = span or self.root()
+        if span is None or span.end_ns is None:
+            return []
+        children = self.children(span)
+        chain: List[Span] = []
+        cursor = span.end_ns
+        while True:
+            candidates = [c for c in children if c.end_ns <= cursor and c not in chain]
+            if not candidates:
+                break
+            latest = max(candidates, key=lambda c: c.end_ns)
+            chain.append(latest)
+            cursor = latest.start_ns
+        path: List[Span] = []
+        for child in reversed(chain):
+            path.append(child)
+            path.extend(self.critical_path(child))
+        return path
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+_CORRELATION_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex
+
+
+def sanitize_correlation_id(value: Optional[str]) -> str:
+    """Accept a caller-supplied id (e.g. X-Request-ID) if it's safe to log, else generate one."""
+    if value and _CORRELATION_ID_PATTERN.match(value.strip()):
+        return value.strip()
+    return new_correlation_id()
+
+
+def get_correlation_id() -> Optional[str]:
+    """Correlation id of the trace active in this context, if any."""
+    trace = _current_trace.get()
+    return trace.correlation_id if trace is not None else None
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Add the active correlation id (or "-") to every log record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = get_correlation_id() or "-"
+        return True
+
+
+@contextlib.contextmanager
+def start_trace(name: str, correlation_id: Optional[str] = None, **attributes: Any) -> Iterator[Trace]:
+    """
+    Run the enclosed block as a new trace with a root span.
+
+    Args:
+        name: Root span name (e.g., "POST /")
+        correlation_id: Id to carry through the request (generated if omitted)
+        **attributes: Attributes for the root span
+
+    Yields:
+        The active Trace
+    """
+    trace = Trace(correlation_id or new_correlation_id())
+    trace_token = _current_trace.set(trace)
+    root = Span(name, None, attributes)
+    trace.add(root)
+    span_token = _current_span.set(root)
+    try:
+        yield trace
+        if root.status == _STATUS_UNSET:
+            root.status = _STATUS_OK
+    except BaseException as e:
+        root.status = _STATUS_ERROR
+        root.set_attribute("exception.type", type(e).__name__)
+        raise
+    finally:
+        root.end()
+        try:
+            _finish_trace(trace)
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record the enclosed block as a child of the current span.
+
+    A no-op (yielding None) outside of a trace, so library code can open
+    spans unconditionally.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    trace.add(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+        if current.status == _STATUS_UNSET:
+            current.status = _STATUS_OK
+    except BaseException as e:
+        current.status = _STATUS_ERROR
+        current.set_attribute("exception.type", type(e).__name__)
+        raise
+    finally:
+        current.end()
+        _current_span.reset(token)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, parent: Optional[Span] = None, **attributes: Any) -> None:
+    """Record an already-measured interval (e.g. server queue wait) as a span."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    parent = parent or _current_span.get()
+    recorded = Span(name, parent.span_id if parent else None, attributes, start_ns=start_ns)
+    recorded.status = _STATUS_OK
+    recorded.end(end_ns)
+    trace.add(recorded)
+
+
+def record_node_phases(node_span: Optional[Span], end_ns: Optional[int] = None) -> None:
+    """
+    Record a graph node's overhead before and after its LLM calls.
+
+    The time from the start of the node span to its first ``llm.call`` child
+    and from the last one to the end of the node is recorded as
+    ``node.before_llm`` and ``node.after_llm`` child spans. These are derived
+    from the span edges, not measured: besides prompt building and response
+    parsing they include whatever else the node does there (cache and store
+    lookups, gating, retries of the whole node). Per-attempt timings are in
+    the ``llm.attempt`` spans and their ``llm.rate_limit_wait`` and
+    ``llm.network`` children.
+    """
+    trace = _current_trace.get()
+    if trace is None or node_span is None:
+        return
+    calls = [child for child in trace.children(node_span) if child.name == "llm.call"]
+    if not calls:
+        return
+    end_ns = end_ns if end_ns is not None else time.time_ns()
+    first_start = min(call.start_ns for call in calls)
+    last_end = max(call.end_ns for call in calls)
+    record_span("node.before_llm", node_span.start_ns, first_start, parent=node_span, derived=True)
+    record_span("node.after_llm", last_end, end_ns, parent=node_span, derived=True)
+
+
+def _finish_trace(trace: Trace) -> None:
+    """Mark the critical path, log it and run the exporters."""
+    path = trace.critical_path()
+    for item in path:
+        item.set_attribute("critical_path", True)
+    if path:
+        root = trace.root()
+        summary = " -> ".join(f"{item.name} {item.duration_ms:.0f}ms" for item in path)
+        logger.info(f"Critical path for {trace.correlation_id} ({root.duration_ms:.0f}ms total): {summary}")
+
+    for exporter in TRACE_EXPORTERS:
+        try:
+            if exporter == "otlp-json":
+                export_otlp_json(trace, os.path.join(TRACE_DIR, "traces.otlp.jsonl"))
+            elif exporter == "chrome":
+                export_chrome_trace(trace, os.path.join(TRACE_DIR, f"{trace.correlation_id}.{trace.trace_id[:8]}.trace.json"))
+            else:
+                logger.warning(f"Unknown trace exporter: {exporter}")
+        except Exception as e:
+            logger.warning(f"Trace export ({exporter}) failed for {trace.correlation_id}: {e}")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_json(trace: Trace) -> Dict[str, Any]:
+    """Convert a trace to an OTLP/JSON ExportTraceServiceRequest document."""
+    spans = []
+    for item in list(trace.spans):
+        attributes = {**item.attributes, "correlation_id": trace.correlation_id, "thread.name": item.thread_name}
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(item.start_ns),
+            "endTimeUnixNano": str(item.end_ns or item.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+            "status": {"code": item.status},
+        }
+        if item.parent_id:
+            otlp_span["parentSpanId"] = item.parent_id
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "resume_matcher.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def to_chrome_trace(trace: Trace) -> Dict[str, Any]:
+    """Convert a trace to Chrome trace-event format (complete events, microseconds)."""
+    events = []
+    thread_names: Dict[int, str] = {}
+    for item in list(trace.spans):
+        thread_names[item.thread_id] = item.thread_name
+        events.append({
+            "name": item.name,
+            "cat": "critical_path" if item.attributes.get("critical_path") else "span",
+            "ph": "X",
+            "ts": item.start_ns / 1000,
+            "dur": ((item.end_ns or item.start_ns) - item.start_ns) / 1000,
+            "pid": 1,
+            "tid": item.thread_id,
+            "args": {**item.attributes, "span_id": item.span_id, "parent_id": item.parent_id},
+        })
+    for thread_id, thread_name in thread_names.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": thread_id, "args": {"name": thread_name}})
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"correlation_id": trace.correlation_id, "trace_id": trace.trace_id},
+    }
+
+
+_export_lock = threading.Lock()
+
+
+def export_otlp_json(trace: Trace, path: str) -> None:
+    """Append the trace as one OTLP/JSON line to path."""
+    line = json.dumps(to_otlp_json(trace))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _export_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def export_chrome_trace(trace: Trace, path: str) -> None:
+    """Write the trace as a Chrome trace-event JSON file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(trace), f)
@@ -0,0 +1,40 @@
+"""
+Shared test setup.
+
+Everything runs against the offline fake LLM backend (src/llm/fake_backend.py)
+with zero latency, and every on-disk store lives in a temporary directory.
+The environment is set before any src module is imported because
+src.config reads it at import time.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+TEST_DIR = tempfile.mkdtemp(prefix="resume-matcher-tests-")
+
+os.environ.update({
+    "LLM_BACKEND": "fake",
+    "LLM_FAKE_LATENCY": "fixed:0",
+    "LLM_WARMUP": "false",
+    "LLM_CACHE_ENABLED": "false",
+    "SECTION_CACHE_ENABLED": "false",
+    "LLM_RATE_LIMIT_RPM": "0",
+    "LLM_RATE_LIMIT_TPM": "0",
+    "TRACE_EXPORTERS": "",
+    "GRAPH_CHECKPOINT_PATH": os.path.join(TEST_DIR, "checkpoints.sqlite3"),
+})
+
+
+@pytest.fixture
+def server():
+    """The API handler served from a BoundedThreadPoolHTTPServer on a free port."""
+    from tests.helpers import running_server
+    with running_server() as httpd:
+        yield httpd
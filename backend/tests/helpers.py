@@ -0,0 +1,91 @@
+"""Sample inputs and a throwaway API server for the tests."""
+
+import contextlib
+import http.client
+import json
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from benchmarks.load_benchmark import SAMPLE_JD, SAMPLE_RESUME
+
+__all__ = ["SAMPLE_JD", "SAMPLE_RESUME", "get_json", "post_json", "post_sse", "running_server"]
+
+
+@contextlib.contextmanager
+def running_server(max_workers: int = 4, max_queue: int = 4, retry_after: int = 5) -> Iterator[Any]:
+    """Serve api_server's handler from a BoundedThreadPoolHTTPServer on a free port."""
+    import api_server
+    from src.server.bounded_server import BoundedThreadPoolHTTPServer
+
+    server = BoundedThreadPoolHTTPServer(
+        ("127.0.0.1", 0),
+        api_server.ResumeAnalysisHandler,
+        max_workers=max_workers,
+        max_queue=max_queue,
+        retry_after=retry_after,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(
+    server,
+    method: str,
+    path: str,
+    body: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30,
+) -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=timeout)
+    try:
+        if body is not None:
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+        response = connection.getresponse()
+        raw = response.read()
+        return response.status, dict(response.getheaders()), json.loads(raw) if raw else {}
+    finally:
+        connection.close()
+
+
+def post_json(
+    server,
+    path: str,
+    body: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30,
+) -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+    """POST a JSON body; returns (status, headers, parsed body)."""
+    return _request(server, "POST", path, body, headers, timeout)
+
+
+def get_json(server, path: str, timeout: float = 30) -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+    """GET a JSON resource; returns (status, headers, parsed body)."""
+    return _request(server, "GET", path, timeout=timeout)
+
+
+def post_sse(
+    server,
+    path: str,
+    body: Dict[str, Any],
+    timeout: float = 30,
+) -> Tuple[int, Dict[str, str], List[Tuple[str, Any]]]:
+    """POST a JSON body to a streaming endpoint; returns (status, headers, [(event, parsed data), ...])."""
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=timeout)
+    try:
+        connection.request("POST", path, body=json.dumps(body), headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        raw = response.read().decode("utf-8")
+        events = []
+        for block in raw.split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+            if "event" in fields:
+                events.append((fields["event"], json.loads(fields["data"])))
+        return response.status, dict(response.getheaders()), events
+    finally:
+        connection.close()
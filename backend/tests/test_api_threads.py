@@ -0,0 +1,60 @@
+"""Thread ids and resuming checkpointed runs through the API (_prepare_run)."""
+
+import pytest
+
+from tests.helpers import SAMPLE_JD, SAMPLE_RESUME, post_json
+
+OTHER_RESUME = """John Roe
+john.roe@example.com
+
+SKILLS
+Java, Spring, Oracle
+
+EXPERIENCE
+Developer, Initech (2019 - Present)
+- Maintained the billing system
+"""
+OTHER_JD = "Frontend Engineer. Must have 3+ years of React and TypeScript."
+
+
+@pytest.fixture(autouse=True)
+def _require_checkpointer():
+    import api_server
+    if api_server.checkpointer is None:
+        pytest.skip("API graphs are not checkpointed")
+
+
+def analyze(server, body, request_id=None):
+    headers = {"X-Request-ID": request_id} if request_id else None
+    return post_json(server, "/", body, headers)
+
+
+def test_reused_request_id_starts_a_new_run(server):
+    status, _, first = analyze(server, {"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD}, "fixed-id")
+    assert status == 200
+    status, _, second = analyze(server, {"resume_text": OTHER_RESUME, "job_description": OTHER_JD}, "fixed-id")
+    assert status == 200
+    assert second["data"]["threadId"] != first["data"]["threadId"]
+    assert second["data"]["resumeStructured"] != first["data"]["resumeStructured"]
+
+
+def test_explicit_thread_id_resumes_the_run(server):
+    body = {"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD, "thread_id": "resume-me"}
+    status, _, first = analyze(server, body)
+    assert status == 200
+
+    # The same body, or thread_id alone, returns the stored run
+    for resumed_body in (body, {"thread_id": "resume-me"}):
+        status, _, resumed = analyze(server, resumed_body)
+        assert status == 200
+        assert resumed["data"]["threadId"] == "resume-me"
+        assert resumed["data"]["overallScore"] == first["data"]["overallScore"]
+        assert resumed["data"]["resumeStructured"] == first["data"]["resumeStructured"]
+
+
+def test_explicit_thread_id_with_a_different_body_is_rejected(server):
+    status, _, _ = analyze(server, {"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD, "thread_id": "taken"})
+    assert status == 200
+    status, _, response = analyze(server, {"resume_text": OTHER_RESUME, "job_description": OTHER_JD, "thread_id": "taken"})
+    assert status == 409
+    assert response["success"] is False
@@ -0,0 +1,91 @@
+"""BoundedThreadPoolHTTPServer backpressure: a full pool and queue get 503 + Retry-After."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from src.server.bounded_server import BoundedThreadPoolHTTPServer
+from tests.helpers import get_json
+
+
+class BlockingHandler(BaseHTTPRequestHandler):
+    """Answers GET once the test releases it, reporting how long it was queued."""
+
+    release = threading.Event()
+
+    def do_GET(self):
+        self.release.wait(10)
+        body = f'{{"queue_wait": {self.server.queue_wait()}}}'.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def blocking_server():
+    BlockingHandler.release = threading.Event()
+    server = BoundedThreadPoolHTTPServer(
+        ("127.0.0.1", 0), BlockingHandler, max_workers=2, max_queue=1, retry_after=7,
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    BlockingHandler.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _wait_for(server, **expected):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        stats = server.stats()
+        if all(stats[key] == value for key, value in expected.items()):
+            return stats
+        time.sleep(0.01)
+    raise AssertionError(f"server never reached {expected}: {server.stats()}")
+
+
+def test_saturated_server_rejects_with_retry_after(blocking_server):
+    responses = []
+    clients = [
+        threading.Thread(target=lambda: responses.append(get_json(blocking_server, "/")))
+        for _ in range(3)
+    ]
+    for client in clients:
+        client.start()
+    # Two requests hold the workers and one waits in the queue
+    _wait_for(blocking_server, in_flight=2, queued=1)
+
+    status, headers, body = get_json(blocking_server, "/", timeout=5)
+    assert status == 503
+    assert headers["Retry-After"] == "7"
+    assert body == {"success": False, "error": "Server is at capacity, please retry later"}
+    assert blocking_server.stats()["rejected_total"] == 1
+
+    # Keep the third request queued a little longer before the workers free up
+    time.sleep(0.05)
+    BlockingHandler.release.set()
+    for client in clients:
+        client.join(10)
+    assert sorted(status for status, _, _ in responses) == [200, 200, 200]
+    # The queued request reports its wait for a worker
+    assert max(body["queue_wait"] for _, _, body in responses) >= 0.05
+    assert _wait_for(blocking_server, in_flight=0, queued=0)["rejected_total"] == 1
+
+    # Capacity is released once the requests finish
+    status, _, _ = get_json(blocking_server, "/", timeout=5)
+    assert status == 200
+
+
+def test_invalid_pool_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        BoundedThreadPoolHTTPServer(("127.0.0.1", 0), BlockingHandler, max_workers=0)
+    with pytest.raises(ValueError):
+        BoundedThreadPoolHTTPServer(("127.0.0.1", 0), BlockingHandler, max_queue=-1)
@@ -0,0 +1,114 @@
+"""LLMResponseCache expiry, LRU eviction and the statements its hot paths run."""
+
+import time
+
+import pytest
+
+from src.utils import cache_utils
+from src.utils.cache_utils import LLMResponseCache, make_cache_key
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def _statements(cache):
+    """Record the SQL the cache runs from now on."""
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    return statements
+
+
+def test_round_trip_and_expiry(path):
+    cache = LLMResponseCache(path, ttl_seconds=60)
+    key = make_cache_key("gemini", {"temperature": 0.1}, "prompt")
+    assert key != make_cache_key("gemini", {"temperature": 0.3}, "prompt")
+    assert cache.get(key) is None
+    cache.set(key, '{"score": 80}')
+    assert cache.get(key) == '{"score": 80}'
+
+    cache._conn.execute("UPDATE llm_cache SET created_at = ?", (time.time() - 120,))
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+    assert cache._total_bytes == 0
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_stores_under_the_limit_do_not_scan(path):
+    cache = LLMResponseCache(path, max_bytes=1000)
+    statements = _statements(cache)
+    for index in range(5):
+        cache.set(f"key-{index}", "x" * 100)
+    cache.set("key-0", "x" * 50)
+    assert not any("SUM(" in sql or "DELETE" in sql for sql in statements)
+    assert cache._total_bytes == 450 == cache.stats()["bytes"]
+
+
+def test_stats_report_running_totals_without_querying(path):
+    cache = LLMResponseCache(path, ttl_seconds=60)
+    for index in range(3):
+        cache.set(f"key-{index}", "x" * 100)
+    cache.set("key-0", "x" * 50)
+    cache._conn.execute("UPDATE llm_cache SET created_at = ? WHERE key = 'key-2'", (time.time() - 120,))
+    assert cache.get("key-2") is None
+
+    statements = _statements(cache)
+    stats = cache.stats()
+    assert statements == []
+    assert (stats["entries"], stats["bytes"]) == (2, 150)
+    assert LLMResponseCache(path).stats()["entries"] == 2
+
+
+def test_hits_write_access_times_in_batches(path, monkeypatch):
+    monkeypatch.setattr(cache_utils, "_TOUCH_BATCH", 3)
+    cache = LLMResponseCache(path)
+    for key in ("a", "b", "c"):
+        cache.set(key, "x")
+    statements = _statements(cache)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    assert not any(sql.startswith("UPDATE") for sql in statements)
+
+    # The third distinct key fills the batch; one executemany writes all three
+    cache.get("c")
+    assert [sql.rsplit("= ", 1)[-1] for sql in statements if sql.startswith("UPDATE")] == ["'a'", "'b'", "'c'"]
+    assert cache._touched == {}
+
+
+def test_eviction_drops_least_recently_used_entries(path):
+    cache = LLMResponseCache(path, max_bytes=300)
+    for index in range(3):
+        cache.set(f"key-{index}", "x" * 100)
+        time.sleep(0.01)
+    # A buffered hit counts: key-0 is now the most recently used
+    assert cache.get("key-0")
+    time.sleep(0.01)
+    statements = _statements(cache)
+    cache.set("key-3", "x" * 100)
+
+    assert sum("SUM(" in sql for sql in statements) == 1
+    # Evicted down to 90% of max_bytes: the two least recently used entries go
+    assert cache.get("key-1") is None and cache.get("key-2") is None
+    assert cache.get("key-0") and cache.get("key-3")
+    assert cache._total_bytes == 200 == cache.stats()["bytes"]
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 2
+
+
+def test_running_total_resyncs_with_other_processes(path):
+    cache = LLMResponseCache(path, max_bytes=300)
+    other = LLMResponseCache(path, max_bytes=300)
+    other.set("theirs", "x" * 250)
+    assert LLMResponseCache(path)._total_bytes == 250
+
+    # This instance only learns of the other's entry when its own total passes the limit
+    cache.set("mine", "x" * 100)
+    assert cache.get("theirs")
+    cache.set("more", "x" * 250)
+    assert cache._total_bytes == cache.stats()["bytes"] <= 270
+    assert cache.get("more")
+
+    cache.clear()
+    assert cache._total_bytes == 0 and cache.stats()["entries"] == 0
@@ -0,0 +1,165 @@
+"""SQLiteCheckpointSaver and resuming checkpointed graph runs."""
+
+import time
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src import config
+from src.agents import skills_agent
+from src.graph.checkpointing import resume_input, thread_config
+from src.graph.failures import invoke_with_partial_retry
+from src.graph.orchestrator import build_langgraph_app
+from src.utils.checkpoint_utils import SQLiteCheckpointSaver
+from tests.helpers import SAMPLE_JD, SAMPLE_RESUME
+
+
+class Crash(BaseException):
+    """Stands in for a process dying mid-run (not caught by tolerate_failure)."""
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"))
+    yield saver
+    saver.close()
+
+
+def _checkpoint(values):
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = values
+    checkpoint["channel_versions"] = {key: 1 for key in values}
+    return checkpoint
+
+
+def _put(saver, thread_id, values, parent_id=None):
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if parent_id:
+        configurable["checkpoint_id"] = parent_id
+    checkpoint = _checkpoint(values)
+    return saver.put({"configurable": configurable}, checkpoint, {"source": "loop", "step": 0}, {}), checkpoint
+
+
+def _llm_calls() -> int:
+    return sum(model.calls for model in config._llm_registry.values())
+
+
+def test_put_get_round_trip(saver):
+    first_config, first = _put(saver, "t", {"resume_text": "hello", "scores": {"skills": 80.5}})
+    second_config, second = _put(saver, "t", {"resume_text": "hello again"}, parent_id=first["id"])
+
+    latest = saver.get_tuple({"configurable": {"thread_id": "t"}})
+    assert latest.config == second_config
+    assert latest.checkpoint["channel_values"] == {"resume_text": "hello again"}
+    assert latest.parent_config == first_config
+    assert latest.metadata["step"] == 0
+
+    earlier = saver.get_tuple(first_config)
+    assert earlier.checkpoint["channel_values"] == {"resume_text": "hello", "scores": {"skills": 80.5}}
+    assert earlier.parent_config is None
+
+    listed = list(saver.list({"configurable": {"thread_id": "t"}}))
+    assert [item.config for item in listed] == [second_config, first_config]
+    assert list(saver.list({"configurable": {"thread_id": "t"}}, before=second_config))[0].config == first_config
+    assert saver.get_tuple({"configurable": {"thread_id": "other"}}) is None
+
+    saver.delete_thread("t")
+    assert saver.get_tuple({"configurable": {"thread_id": "t"}}) is None
+
+
+def test_pending_writes_are_returned_with_their_checkpoint(saver):
+    checkpoint_config, _ = _put(saver, "t", {"resume_text": "hello"})
+    saver.put_writes(checkpoint_config, [("skills_score", {"score": 80}), ("node_failures", [])], task_id="task-1")
+    saver.put_writes(checkpoint_config, [("meta_score", {"score": 40})], task_id="task-2")
+
+    pending = saver.get_tuple({"configurable": {"thread_id": "t"}}).pending_writes
+    assert sorted(pending) == sorted([
+        ("task-1", "skills_score", {"score": 80}),
+        ("task-1", "node_failures", []),
+        ("task-2", "meta_score", {"score": 40}),
+    ])
+
+    # Like LangGraph's own savers, a task's first writes are kept, not duplicated
+    saver.put_writes(checkpoint_config, [("meta_score", {"score": 41})], task_id="task-2")
+    pending = saver.get_tuple({"configurable": {"thread_id": "t"}}).pending_writes
+    assert ("task-2", "meta_score", {"score": 40}) in pending
+    assert len(pending) == 3
+
+
+def test_interrupted_fan_out_resumes_only_unfinished_nodes(saver, monkeypatch):
+    graph = build_langgraph_app(saver)
+    run_config = thread_config(graph, "crashed-run")
+
+    def crash(*args, **kwargs):
+        # Let the sibling section nodes (zero-latency fake LLM) finish first
+        time.sleep(0.5)
+        raise Crash()
+
+    monkeypatch.setattr(skills_agent, "call_llm", crash)
+    with pytest.raises(Crash):
+        graph.invoke({"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD}, run_config)
+    snapshot = graph.get_state(run_config)
+    assert snapshot.next == ("score_skills",)
+    assert "experience_score" in snapshot.values
+    monkeypatch.undo()
+
+    # The sibling section nodes' writes were kept; only score_skills calls the LLM again
+    graph_input, stored = resume_input(graph, {"resume_text": "ignored"}, run_config)
+    assert graph_input is None and stored["resume_text"] == SAMPLE_RESUME
+    calls = _llm_calls()
+    result = graph.invoke(graph_input, run_config)
+    assert _llm_calls() - calls == 1
+    assert result["skills_score"]["section_name"] == "skills"
+    assert result["final_score"]["degraded"] is False
+
+
+def test_expired_threads_are_pruned(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    saver = SQLiteCheckpointSaver(path, ttl_seconds=60)
+    _put(saver, "old", {"resume_text": "old"})
+    _put(saver, "fresh", {"resume_text": "fresh"})
+    old_config = saver.get_tuple({"configurable": {"thread_id": "old"}}).config
+    saver.put_writes(old_config, [("skills_score", {"score": 1})], task_id="task")
+    saver._conn.execute("UPDATE checkpoints SET created_at = ? WHERE thread_id = 'old'", (time.time() - 120,))
+    saver.close()
+
+    # Expired threads are pruned when the file is opened (and every _PRUNE_INTERVAL puts)
+    saver = SQLiteCheckpointSaver(path, ttl_seconds=60)
+    try:
+        assert saver.get_tuple({"configurable": {"thread_id": "old"}}) is None
+        assert saver._conn.execute("SELECT COUNT(*) FROM checkpoint_writes WHERE thread_id = 'old'").fetchone()[0] == 0
+        assert saver.get_tuple({"configurable": {"thread_id": "fresh"}}) is not None
+    finally:
+        saver.close()
+
+
+def test_partial_retry_rounds_use_their_own_threads(saver, monkeypatch):
+    graph = build_langgraph_app(saver)
+    assert thread_config(graph, "run")["configurable"]["thread_id"] == "analysis:run"
+    assert thread_config(graph, "run", 2)["configurable"]["thread_id"] == "analysis:run:retry-2"
+
+    original = skills_agent.call_llm
+    attempts = {"count": 0}
+
+    def fail_once(*args, **kwargs):
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            raise ValueError("unparseable model output")
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(skills_agent, "call_llm", fail_once)
+    result = invoke_with_partial_retry(
+        graph, {"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD}, retries=1, thread_id="run",
+    )
+    assert result["node_failures"] == []
+    assert result["final_score"]["degraded"] is False
+
+    # The first round keeps its failure; the retry round is a separate, clean thread
+    first = graph.get_state(thread_config(graph, "run")).values
+    retried = graph.get_state(thread_config(graph, "run", 1)).values
+    assert [failure["section"] for failure in first["node_failures"]] == ["skills"]
+    assert "skills_score" not in first
+    assert retried["skills_score"] == result["skills_score"]
+    assert {item.config["configurable"]["thread_id"] for item in saver.list(None)} == {
+        "analysis:run", "analysis:run:retry-1",
+    }
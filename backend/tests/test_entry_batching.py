@@ -0,0 +1,130 @@
+"""Entry batching of the optimization graph's list sections, end to end with the fake backend."""
+
+import json
+import re
+import threading
+
+import pytest
+
+from src import config
+from src.agents import experience_agent
+from src.graph.entry_batching import estimate_output_tokens, plan_entry_batches
+from src.graph.failures import invoke_with_partial_retry
+from src.graph.optimization_orchestrator import build_optimization_app
+from src.models.schemas import ResumeStructured
+from src.utils.checkpoint_utils import SQLiteCheckpointSaver
+from tests.helpers import SAMPLE_JD
+
+_EXPERIENCE_JSON = re.compile(r"CANDIDATE EXPERIENCE:\n(.*?)\n\nRewrite", re.DOTALL)
+
+EXPERIENCE = [
+    {
+        "job_title": "Software Engineer",
+        "company": f"Company {index}",
+        "start_date": str(2010 + index),
+        "responsibilities": ["Built services in Python and Go", "Mentored engineers"],
+    }
+    for index in range(8)
+]
+RESUME = {
+    "contact_info": {"name": "Jane Doe"},
+    "skills": [{"name": "Python"}],
+    "experience": EXPERIENCE,
+    "education": [{"degree": "B.Sc.", "institution": "TU Munich"}],
+    "projects": [{"name": "ledgerlite", "description": "Accounting library"}],
+    "meta": {"seniority_level": "senior"},
+}
+
+# The entries as the graph sees (and sizes) them, after validation
+ENTRIES = ResumeStructured(**RESUME).model_dump()["experience"]
+
+
+class ExperienceLLM:
+    """Stands in for the experience optimizer's LLM: one optimization per entry in its prompt."""
+
+    def __init__(self, fail_first_call_for=None):
+        self.batches = []
+        self.fail_first_call_for = fail_first_call_for
+        self._lock = threading.Lock()
+
+    def __call__(self, model, prompt, **kwargs):
+        companies = [entry["company"] for entry in json.loads(_EXPERIENCE_JSON.search(prompt).group(1))]
+        with self._lock:
+            self.batches.append(companies)
+            if self.fail_first_call_for in companies:
+                self.fail_first_call_for = None
+                raise ValueError("unparseable model output")
+        return json.dumps([
+            {"section_name": "experience", "original_content": company, "optimized_content": f"{company}, improved"}
+            for company in companies
+        ])
+
+
+@pytest.fixture
+def experience_llm(monkeypatch):
+    # Two of these (equally sized) entries fit in a batch
+    monkeypatch.setattr(config, "OPTIMIZATION_BATCH_OUTPUT_TOKENS", 2 * estimate_output_tokens(ENTRIES[0]))
+    monkeypatch.setattr(config, "OPTIMIZATION_MAX_BATCHES", 8)
+    llm = ExperienceLLM()
+    monkeypatch.setattr(experience_agent, "call_llm", llm)
+    return llm
+
+
+def _companies(indexes):
+    return [EXPERIENCE[index]["company"] for index in indexes]
+
+
+def test_plan_packs_entries_within_the_budget(monkeypatch):
+    monkeypatch.setattr(config, "OPTIMIZATION_MAX_BATCHES", 10)
+    entries = [{"text": "x" * 200}, {"text": "x" * 200}, {"text": "x" * 2000}, {"text": "x"}, {"text": "x"}]
+    monkeypatch.setattr(config, "OPTIMIZATION_BATCH_OUTPUT_TOKENS", 2 * estimate_output_tokens(entries[0]))
+    # An entry over the budget gets a batch of its own
+    assert plan_entry_batches(entries) == [[0, 1], [2], [3, 4]]
+    assert plan_entry_batches([]) == []
+
+    monkeypatch.setattr(config, "OPTIMIZATION_MAX_BATCHES", 2)
+    assert plan_entry_batches(entries) == [[0, 1, 2], [3, 4]]
+
+
+def test_batches_are_dispatched_and_merged_in_entry_order(experience_llm):
+    plan = plan_entry_batches(ENTRIES)
+    assert len(plan) == 4 and all(len(indexes) == 2 for indexes in plan)
+
+    result = build_optimization_app().invoke({"resume_structured": RESUME, "job_description": SAMPLE_JD})
+    assert sorted(experience_llm.batches) == sorted(_companies(indexes) for indexes in plan)
+    assert [item["original_content"] for item in result["experience_optimizations"]] == _companies(range(8))
+    assert result["node_failures"] == []
+
+
+def test_max_batches_caps_the_fan_out(experience_llm, monkeypatch):
+    monkeypatch.setattr(config, "OPTIMIZATION_MAX_BATCHES", 3)
+    result = build_optimization_app().invoke({"resume_structured": RESUME, "job_description": SAMPLE_JD})
+    assert sorted(experience_llm.batches) == sorted([_companies(range(0, 3)), _companies(range(3, 6)), _companies(range(6, 8))])
+    assert [item["original_content"] for item in result["experience_optimizations"]] == _companies(range(8))
+
+
+def test_partial_retry_redispatches_only_failed_batches(experience_llm, tmp_path):
+    experience_llm.fail_first_call_for = "Company 5"
+    saver = SQLiteCheckpointSaver(str(tmp_path / "checkpoints.sqlite3"))
+    try:
+        graph = build_optimization_app(saver)
+        result = invoke_with_partial_retry(
+            graph, {"resume_structured": RESUME, "job_description": SAMPLE_JD}, retries=1, thread_id="batched",
+        )
+    finally:
+        saver.close()
+
+    # Four batches in the first round, then only the failed one again
+    assert len(experience_llm.batches) == 5
+    assert experience_llm.batches[-1] == _companies([4, 5])
+    assert [item["original_content"] for item in result["experience_optimizations"]] == _companies(range(8))
+    assert result["node_failures"] == []
+
+
+def test_failed_batch_fails_the_section_without_retries(experience_llm):
+    experience_llm.fail_first_call_for = "Company 5"
+    result = build_optimization_app().invoke({"resume_structured": RESUME, "job_description": SAMPLE_JD})
+    [failure] = result["node_failures"]
+    assert failure["section"] == "experience"
+    assert "batch 2" in failure["message"]
+    assert "experience_optimizations" not in result
@@ -0,0 +1,94 @@
+"""Incremental re-scoring from the section result store, end to end with the fake backend."""
+
+import pytest
+
+from src import config
+from src.graph import incremental
+from src.graph.orchestrator import build_langgraph_app
+from src.utils.cache_utils import LLMResponseCache
+from src.utils.llm_utils import LLM_CALLS
+from tests.helpers import SAMPLE_JD
+
+SCORING_AGENTS = ("skills", "experience", "education", "projects", "meta")
+
+RESUME = {
+    "contact_info": {"name": "Jane Doe"},
+    "skills": [{"name": "Python"}, {"name": "Kafka"}],
+    "experience": [{"job_title": "Software Engineer", "company": "Acme", "responsibilities": ["Built APIs"]}],
+    "education": [{"degree": "B.Sc.", "field_of_study": "Computer Science", "institution": "TU Munich"}],
+    "projects": [{"name": "ledgerlite", "description": "Accounting library"}],
+    "meta": {"seniority_level": "senior", "domains": ["fintech"]},
+}
+
+
+@pytest.fixture
+def section_store(monkeypatch, tmp_path):
+    """A fresh section result store; gating is off so every section node reaches it."""
+    store = LLMResponseCache(str(tmp_path / "sections.sqlite3"), ttl_seconds=3600, max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(incremental, "_store", store)
+    monkeypatch.setattr(incremental, "_store_disabled", False)
+    monkeypatch.setattr(config, "SECTION_GATING_ENABLED", False)
+    return store
+
+
+class CallCounter:
+    """LLM calls per agent since the last snapshot, from the llm_calls counter."""
+
+    def __init__(self, agents):
+        self.agents = agents
+        self.snapshot()
+
+    def _counts(self):
+        return {agent: LLM_CALLS.value(agent=agent, outcome="ok") for agent in self.agents}
+
+    def snapshot(self):
+        self._start = self._counts()
+
+    def calls(self):
+        return {agent: count - self._start[agent] for agent, count in self._counts().items() if count > self._start[agent]}
+
+
+def _run(resume=RESUME, **state):
+    return build_langgraph_app().invoke({"resume_structured": resume, "job_description": SAMPLE_JD, **state})
+
+
+def test_fused_scores_are_not_stored_as_section_results(section_store):
+    fused = _run(scoring_mode="fused")
+    assert set(fused["fused_scores"]) == set(SCORING_AGENTS)
+    state = {"resume_structured": RESUME, "job_description": SAMPLE_JD, "incremental": True}
+    assert not any(incremental.has_stored_result(f"score_{section}", state) for section in SCORING_AGENTS)
+
+    # A sections-mode incremental run scores every section itself rather than replaying fused scores
+    counter = CallCounter([f"{section}_scoring" for section in SCORING_AGENTS])
+    _run(incremental=True, scoring_mode="sections")
+    assert set(counter.calls()) == {f"{section}_scoring" for section in SCORING_AGENTS}
+
+
+def test_only_the_edited_section_is_rescored(section_store):
+    first = _run()
+    counter = CallCounter([f"{section}_scoring" for section in SCORING_AGENTS])
+
+    edited = {**RESUME, "skills": [{"name": "Python"}, {"name": "Kafka"}, {"name": "Kubernetes"}]}
+    second = _run(edited, incremental=True)
+    assert counter.calls() == {"skills_scoring": 1}
+    for section in ("experience", "education", "projects", "meta"):
+        assert second[f"{section}_score"] == first[f"{section}_score"]
+
+    counter.snapshot()
+    _run(edited, incremental=True)
+    assert counter.calls() == {}
+
+
+@pytest.mark.parametrize("change", ["response_schema", "jd_analysis", "section_gating"])
+def test_prompt_settings_invalidate_stored_results(section_store, monkeypatch, change):
+    _run()
+    counter = CallCounter([f"{section}_scoring" for section in SCORING_AGENTS])
+    state = {"incremental": True}
+    if change == "response_schema":
+        monkeypatch.setattr(config, "LLM_RESPONSE_SCHEMA", not config.LLM_RESPONSE_SCHEMA)
+    elif change == "jd_analysis":
+        state["jd_analysis"] = {"job_key_skills": ["Python", "Kafka"], "job_tech_stack": ["Kubernetes"]}
+    else:
+        monkeypatch.setattr(config, "SECTION_GATING_EXCLUDE_NOT_APPLICABLE", True)
+    _run(**state)
+    assert set(counter.calls()) == {f"{section}_scoring" for section in SCORING_AGENTS}
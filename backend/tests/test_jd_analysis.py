@@ -0,0 +1,134 @@
+"""Shared JD analysis: scoring weights, fallback on failure and in-flight dedup."""
+
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+
+from src import config
+from src.graph import jd_analysis
+from src.graph.orchestrator import DEFAULT_SECTION_WEIGHTS, build_langgraph_app
+from tests.helpers import SAMPLE_JD
+
+ANALYSIS = {
+    "job_key_skills": ["Python", "Kafka"],
+    "section_weights": {"summary": 0.5, "experience": 0.3, "skills": 0.1, "projects": 0.05, "education": 0.05},
+}
+
+
+@pytest.fixture
+def analysis_enabled(monkeypatch):
+    monkeypatch.setattr(config, "JD_ANALYSIS_ENABLED", True)
+    monkeypatch.setattr(jd_analysis, "_memory", OrderedDict())
+
+
+def _blocking_compute(monkeypatch, result=None, error=None):
+    """Replace the 2-call analysis with one that waits for ``release`` and counts its runs."""
+    release = threading.Event()
+    runs = []
+
+    def compute(job_description):
+        runs.append(job_description)
+        release.wait(5)
+        if error is not None:
+            raise error
+        return dict(result)
+
+    monkeypatch.setattr(jd_analysis, "_compute", compute)
+    return release, runs
+
+
+def _release_when_queued(runs, release):
+    """Let the leader finish once it is computing and the others had time to queue behind it."""
+    while not runs:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    release.set()
+
+
+def _concurrently(func, count):
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = func()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_default_weights_without_an_analysis():
+    for analysis in (None, {}, {"section_weights": {"skills": "high"}}, {"section_weights": {"skills": -1}}):
+        assert jd_analysis.scoring_weights(analysis, DEFAULT_SECTION_WEIGHTS) == DEFAULT_SECTION_WEIGHTS
+    assert jd_analysis.scoring_weights(ANALYSIS, DEFAULT_SECTION_WEIGHTS, blend=0) == DEFAULT_SECTION_WEIGHTS
+
+
+def test_analysis_weights_are_clamped_and_blended():
+    weights = jd_analysis.scoring_weights(ANALYSIS, DEFAULT_SECTION_WEIGHTS, blend=1)
+    assert sum(weights.values()) == pytest.approx(1.0)
+    # The summary weight doesn't leak into meta
+    assert weights["meta"] == pytest.approx(DEFAULT_SECTION_WEIGHTS["meta"], rel=0.1)
+    for section, default in DEFAULT_SECTION_WEIGHTS.items():
+        assert default / 2.2 <= weights[section] <= default * 2.2
+
+    blended = jd_analysis.scoring_weights(ANALYSIS, DEFAULT_SECTION_WEIGHTS, blend=0.5)
+    for section, default in DEFAULT_SECTION_WEIGHTS.items():
+        assert blended[section] == pytest.approx((default + weights[section]) / 2, abs=0.01)
+
+
+def test_analysis_is_off_by_default():
+    assert jd_analysis.analyze_jd_node({"job_description": SAMPLE_JD}) == {"jd_analysis": {}}
+
+
+def test_failed_analysis_falls_back_to_default_weights(analysis_enabled, monkeypatch):
+    def fail(job_description):
+        raise ValueError("unparseable model output")
+
+    monkeypatch.setattr(jd_analysis, "_compute", fail)
+    assert jd_analysis.analyze_jd_node({"job_description": SAMPLE_JD}) == {"jd_analysis": {}}
+
+    resume = {"skills": [{"name": "Python"}], "experience": [{"job_title": "Engineer", "company": "Acme"}],
+              "education": [{"degree": "B.Sc."}], "projects": [{"name": "ledgerlite"}],
+              "meta": {"seniority_level": "senior"}}
+    final = build_langgraph_app().invoke({"resume_structured": resume, "job_description": SAMPLE_JD})["final_score"]
+    scores = {score["section_name"]: score["score"] for score in final["section_scores"]}
+    expected = sum(scores[section] * weight for section, weight in DEFAULT_SECTION_WEIGHTS.items())
+    assert not final["degraded"]
+    assert final["overall_score"] == pytest.approx(expected, abs=0.01)
+
+    # The failure isn't cached; a later request analyzes the JD again
+    monkeypatch.setattr(jd_analysis, "_compute", lambda job_description: dict(ANALYSIS))
+    assert jd_analysis.analyze_jd_node({"job_description": SAMPLE_JD}) == {"jd_analysis": ANALYSIS}
+
+
+def test_concurrent_requests_share_one_analysis(analysis_enabled, monkeypatch):
+    release, runs = _blocking_compute(monkeypatch, result=ANALYSIS)
+    threads, results = _concurrently(lambda: jd_analysis.get_jd_analysis(SAMPLE_JD), 5)
+    _release_when_queued(runs, release)
+    for thread in threads:
+        thread.join(5)
+
+    assert len(runs) == 1
+    assert all(result == ANALYSIS for result in results)
+    # Whitespace differences hit the same analysis, from memory
+    assert jd_analysis.get_jd_analysis(f"  {SAMPLE_JD}\n\n") == ANALYSIS
+    assert len(runs) == 1
+    assert jd_analysis._inflight == {}
+
+
+def test_waiters_get_the_leaders_error(analysis_enabled, monkeypatch):
+    error = ValueError("unparseable model output")
+    release, runs = _blocking_compute(monkeypatch, error=error)
+    threads, results = _concurrently(lambda: jd_analysis.get_jd_analysis(SAMPLE_JD), 3)
+    _release_when_queued(runs, release)
+    for thread in threads:
+        thread.join(5)
+
+    assert len(runs) == 1
+    assert all(result is error for result in results)
+    assert jd_analysis._inflight == {} and jd_analysis._memory == OrderedDict()
@@ -0,0 +1,127 @@
+"""JobStore limits and TTL, and the /jobs API built on it."""
+
+import threading
+import time
+
+import pytest
+
+import api_server
+from src.server.jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JobQueueFull, JobStore
+from tests.helpers import SAMPLE_JD, SAMPLE_RESUME, get_json, post_json
+
+
+@pytest.fixture
+def store():
+    store = JobStore(max_workers=1, max_pending=2, ttl_seconds=60)
+    yield store
+    store.shutdown()
+
+
+def _wait_until_finished(store, job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not job.is_finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return store.get(job.id)
+
+
+def test_full_queue_raises_until_a_job_finishes(store):
+    release = threading.Event()
+    running = store.submit("analysis", lambda job: release.wait(10) and {"ok": 1})
+    queued = store.submit("analysis", lambda job: {"ok": 2})
+    with pytest.raises(JobQueueFull):
+        store.submit("analysis", lambda job: {"ok": 3})
+    assert store.stats() == {JOB_QUEUED: 1, JOB_RUNNING: 1, JOB_SUCCEEDED: 0, JOB_FAILED: 0}
+
+    release.set()
+    assert _wait_until_finished(store, running).result == {"ok": 1}
+    assert _wait_until_finished(store, queued).result == {"ok": 2}
+    # Finished jobs don't count against max_pending
+    assert _wait_until_finished(store, store.submit("analysis", lambda job: {"ok": 3})).result == {"ok": 3}
+
+
+def test_job_records_partials_results_and_errors(store):
+    def work(job):
+        job.set_partial("skills", {"score": 80})
+        return {"overall": 75}
+
+    def fail(job):
+        raise ValueError("unparseable model output")
+
+    job = _wait_until_finished(store, store.submit("analysis", work))
+    data = job.to_dict()
+    assert data["status"] == JOB_SUCCEEDED
+    assert data["partial"] == {"skills": {"score": 80}}
+    assert data["result"] == {"overall": 75}
+    assert data["createdAt"] <= data["startedAt"] <= data["finishedAt"]
+
+    failed = _wait_until_finished(store, store.submit("optimization", fail))
+    assert failed.status == JOB_FAILED
+    assert failed.error == "unparseable model output"
+
+
+def test_finished_jobs_are_evicted_after_the_ttl(store):
+    release = threading.Event()
+    old = _wait_until_finished(store, store.submit("analysis", lambda job: {}))
+    running = store.submit("analysis", lambda job: release.wait(10) and {})
+    old.finished_at = time.time() - 61
+
+    assert store.get(old.id) is None
+    # Unfinished jobs are kept whatever their age
+    running.created_at = time.time() - 3600
+    assert store.get(running.id) is running
+    release.set()
+    _wait_until_finished(store, running)
+
+
+def test_only_the_newest_finished_jobs_are_kept():
+    store = JobStore(max_workers=1, max_pending=8, ttl_seconds=60, max_finished=2)
+    try:
+        jobs = [_wait_until_finished(store, store.submit("analysis", lambda job, i=i: {"i": i})) for i in range(4)]
+        assert [store.get(job.id) for job in jobs] == [None, None, jobs[2], jobs[3]]
+        assert store.stats()[JOB_SUCCEEDED] == 2
+
+        # Unfinished jobs don't count against the limit
+        release = threading.Event()
+        running = store.submit("analysis", lambda job: release.wait(10) and {})
+        assert store.get(jobs[2].id) is jobs[2]
+        release.set()
+        _wait_until_finished(store, running)
+        assert store.get(jobs[2].id) is None
+        assert store.get(running.id) is running
+    finally:
+        store.shutdown()
+
+
+def test_job_api_rejects_submissions_when_the_queue_is_full(server, monkeypatch):
+    full = JobStore(max_workers=1, max_pending=0)
+    monkeypatch.setattr(api_server, "job_store", full)
+    try:
+        status, headers, body = post_json(
+            server, "/jobs", {"type": "analysis", "resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD},
+        )
+    finally:
+        full.shutdown()
+    assert status == 503
+    assert headers["Retry-After"] == str(server.retry_after)
+    assert body["success"] is False
+
+
+def test_job_api_runs_a_job_to_completion(server):
+    status, headers, body = post_json(
+        server, "/jobs", {"type": "analysis", "resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD},
+    )
+    assert status == 202
+    job_id = body["data"]["jobId"]
+    assert headers["Location"] == f"/jobs/{job_id}"
+
+    deadline = time.monotonic() + 30
+    while True:
+        status, _, body = get_json(server, f"/jobs/{job_id}")
+        assert status == 200
+        if body["data"]["status"] in (JOB_SUCCEEDED, JOB_FAILED) or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert body["data"]["status"] == JOB_SUCCEEDED
+    assert body["data"]["result"]
+
+    assert get_json(server, "/jobs/job_missing")[0] == 404
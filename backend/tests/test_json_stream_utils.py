@@ -0,0 +1,82 @@
+"""IncrementalJSONParser fed a document in chunks of every size and offset."""
+
+import json
+
+import pytest
+
+from benchmarks.json_repair_benchmark import OPTIMIZATIONS
+from src.utils.json_stream_utils import IncrementalJSONParser
+
+SCORE = {
+    "section_name": "experience",
+    "score": 82.5,
+    "reasons": ["6 years of \"backend\" work", "Led a Kafka migration \\ C:\\tmp", "caf\u00e9 \\u00e9 \u2014 ok"],
+    "missing_requirements": [],
+    "details": {"years": 6, "nested": [1, {"a": [True, None]}]},
+    "strict": False,
+    "weight": -1.5e-3,
+    "note": None,
+    "count": 0,
+}
+
+ARRAY_OF_SCALARS = [1, -2.5, True, False, None, "x,]}", [], {}, 1e10]
+
+# name -> (response text, the JSON document in it)
+DOCUMENTS = {
+    "object": (json.dumps(SCORE), SCORE),
+    "object_indented": (json.dumps(SCORE, indent=2, ensure_ascii=False), SCORE),
+    "array": (json.dumps(OPTIMIZATIONS[:2], ensure_ascii=False), OPTIMIZATIONS[:2]),
+    "array_of_scalars": (json.dumps(ARRAY_OF_SCALARS), ARRAY_OF_SCALARS),
+    "fenced": ("Here you go:\n```json\n" + json.dumps(SCORE, indent=2) + "\n```\nDone [ok].", SCORE),
+}
+
+
+def _expected(document):
+    """Items the parser reports for a whole document, as decoded by json.loads."""
+    document = json.loads(json.dumps(document))
+    if isinstance(document, list):
+        return [((index,), value) for index, value in enumerate(document)]
+    return [((key,), value) for key, value in document.items()]
+
+
+def _feed(chunks, **kwargs):
+    parser = IncrementalJSONParser(**kwargs)
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return parser, items
+
+
+@pytest.mark.parametrize("name", DOCUMENTS)
+def test_split_at_every_offset(name):
+    text, document = DOCUMENTS[name]
+    expected = _expected(document)
+    for offset in range(len(text) + 1):
+        parser, items = _feed([text[:offset], text[offset:]])
+        assert items == expected, f"split at {offset}: {text[:offset]!r}|{text[offset:]!r}"
+        assert parser.done
+
+
+@pytest.mark.parametrize("name", DOCUMENTS)
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_fixed_size_chunks(name, size):
+    text, document = DOCUMENTS[name]
+    _, items = _feed(text[i:i + size] for i in range(0, len(text), size))
+    assert items == _expected(document)
+
+
+def test_deeper_values_are_reported_before_their_parent():
+    text = json.dumps(SCORE)
+    _, items = _feed(text, max_depth=2)
+    reasons = [(("reasons", index), value) for index, value in enumerate(SCORE["reasons"])]
+    position = items.index((("reasons",), SCORE["reasons"]))
+    assert items[position - len(reasons):position] == reasons
+    assert [item for item in items if len(item[0]) == 1] == _expected(SCORE)
+
+
+def test_truncated_document_reports_only_completed_values():
+    text = json.dumps(OPTIMIZATIONS[:3])
+    cut = text.index("{", text.index("}") + 1) + 10
+    parser, items = _feed([text[:cut]])
+    assert items == [((0,), OPTIMIZATIONS[0])]
+    assert not parser.done
@@ -0,0 +1,189 @@
+"""call_llm attempt deadlines, call slots and hedging with slow fake backends."""
+
+import functools
+import threading
+import time
+
+import pytest
+
+from src.llm.fake_backend import FakeGenerativeModel, FakeLLMProfile
+from src.utils import llm_utils
+from src.utils.retry_utils import exponential_backoff_retry
+
+HANG = 1.0
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    monkeypatch.setattr(llm_utils.config, "LLM_ATTEMPT_TIMEOUT", 0.1)
+    monkeypatch.setattr(llm_utils.config, "LLM_MAX_RETRIES", 3)
+    monkeypatch.setattr(
+        llm_utils, "exponential_backoff_retry", functools.partial(exponential_backoff_retry, initial_delay=0.01),
+    )
+    slots = llm_utils._CallSlots(2)
+    monkeypatch.setattr(llm_utils, "_call_slots", slots)
+    yield slots
+    # Let the hanging calls finish so they don't leak into other tests
+    deadline = time.monotonic() + 5
+    while slots.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def _model(latency):
+    return FakeGenerativeModel(profile=FakeLLMProfile(latency=latency))
+
+
+def test_hanging_calls_stop_retries_once_slots_run_out(slots):
+    model = _model(f"fixed:{HANG}")
+    start = time.monotonic()
+    with pytest.raises(llm_utils.LLMCallSlotsExhausted):
+        llm_utils.call_llm(model, "Return a JSON array", agent_name="hanging")
+
+    # The first timeout is retried; the second leaves both slots held by abandoned calls
+    assert model.calls == 2
+    assert time.monotonic() - start < HANG
+    assert slots.stats() == {"in_flight": 2, "abandoned": 2}
+
+    # A new call waits at most one attempt timeout for a slot, without calling the model
+    other = _model("fixed:0")
+    with pytest.raises(llm_utils.LLMCallSlotsExhausted):
+        llm_utils.call_llm(other, "Return a JSON array", agent_name="blocked")
+    assert other.calls == 0
+
+    # Slots come back when the abandoned calls return
+    time.sleep(HANG)
+    assert slots.stats() == {"in_flight": 0, "abandoned": 0}
+    assert llm_utils.call_llm(other, "Return a JSON array", agent_name="recovered")
+    assert other.calls == 1
+
+
+def test_timeouts_with_free_slots_are_retried(slots, monkeypatch):
+    monkeypatch.setattr(llm_utils.config, "LLM_MAX_RETRIES", 1)
+    slots.limit = 8
+    model = _model(f"fixed:{HANG}")
+    with pytest.raises(llm_utils.LLMAttemptTimeout):
+        llm_utils.call_llm(model, "Return a JSON array", agent_name="hanging")
+    assert model.calls == 2
+    assert slots.stats()["abandoned"] == 2
+
+
+def test_deadline_starts_when_the_call_gets_a_slot(slots, monkeypatch):
+    # The only slot frees up after 0.05s; 0.05s waiting plus a 0.06s call would miss a 0.1s deadline
+    queued_behind = llm_utils._CallSlots(1)
+    queued_behind.acquire(None)
+    monkeypatch.setattr(llm_utils, "_call_slots", queued_behind)
+    llm_utils._attempt_executor.submit(lambda: (time.sleep(0.05), queued_behind.release()))
+
+    model = _model("fixed:0.06")
+    assert llm_utils.call_llm(model, "Return a JSON array", agent_name="queued")
+    assert model.calls == 1
+
+
+def test_stream_ending_with_a_textless_chunk():
+    model = _model("fixed:0")
+    chunks = list(model.generate_content("Return a JSON array", stream=True))
+    with pytest.raises(ValueError):
+        chunks[-1].text
+
+    items = []
+    text = llm_utils.call_llm(
+        model, "Return a JSON array", agent_name="streamed", on_item=lambda path, value: items.append(path),
+    )
+    assert model.calls == 2
+    assert "".join(chunk.text for chunk in chunks[:-1]) == text
+    assert items and all(len(path) == 1 for path in items)
+
+
+class SlowFirstCall(FakeGenerativeModel):
+    """The first call takes first_latency seconds, later ones return at once."""
+
+    def __init__(self, first_latency):
+        super().__init__(profile=FakeLLMProfile(latency="fixed:0"))
+        self.first_latency = first_latency
+        self.started = []
+        self._started_lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        with self._started_lock:
+            self.started.append(time.monotonic())
+            first = len(self.started) == 1
+        if first:
+            time.sleep(self.first_latency)
+        return super().generate_content(prompt, generation_config, stream, **kwargs)
+
+
+@pytest.fixture
+def hedging(slots, monkeypatch):
+    """Hedging after the p95 of 50ms samples, with a deadline long enough not to interfere."""
+    monkeypatch.setattr(llm_utils.config, "LLM_ATTEMPT_TIMEOUT", 2.0)
+    monkeypatch.setattr(llm_utils.config, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(llm_utils.config, "LLM_HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(llm_utils.config, "LLM_HEDGE_MIN_DELAY", 0.0)
+    tracker = llm_utils.LatencyTracker()
+    monkeypatch.setattr(llm_utils, "_latency_tracker", tracker)
+    return tracker
+
+
+def _seed(tracker, agent_name, seconds=0.05, samples=5):
+    for _ in range(samples):
+        tracker.record(agent_name, seconds)
+
+
+def test_slow_primary_is_hedged_and_the_hedge_wins(hedging, slots):
+    _seed(hedging, "hedged")
+    model = SlowFirstCall(first_latency=HANG)
+    start = time.monotonic()
+    assert llm_utils.call_llm(model, "Return a JSON array", agent_name="hedged")
+    assert time.monotonic() - start < HANG / 2
+
+    # The hedge fired once the primary had run for the p95 delay
+    primary_start, hedge_start = model.started
+    assert hedge_start - primary_start >= 0.05
+    assert llm_utils.hedge_stats()["hedged"] == {"fired": 1, "won": 1, "win_rate": 1.0}
+
+    # The losing primary keeps its slot only until it returns
+    assert slots.stats() == {"in_flight": 1, "abandoned": 1}
+    time.sleep(HANG)
+    assert slots.stats() == {"in_flight": 0, "abandoned": 0}
+
+
+def test_fast_primary_is_not_hedged(hedging, slots):
+    _seed(hedging, "fast")
+    model = SlowFirstCall(first_latency=0)
+    assert llm_utils.call_llm(model, "Return a JSON array", agent_name="fast")
+    assert model.calls == 1
+    assert "fast" not in llm_utils.hedge_stats()
+    assert slots.stats() == {"in_flight": 0, "abandoned": 0}
+
+
+def test_hedges_need_a_free_slot_and_budget(hedging, slots):
+    _seed(hedging, "no_slot")
+    slots.limit = 1
+    model = SlowFirstCall(first_latency=0.2)
+    assert llm_utils.call_llm(model, "Return a JSON array", agent_name="no_slot")
+    assert model.calls == 1
+    assert slots.stats() == {"in_flight": 0, "abandoned": 0}
+
+    _seed(hedging, "no_budget")
+    slots.limit = 2
+    model = SlowFirstCall(first_latency=0.2)
+    with llm_utils.hedge_budget(0):
+        assert llm_utils.call_llm(model, "Return a JSON array", agent_name="no_budget")
+    assert model.calls == 1
+    assert slots.stats() == {"in_flight": 0, "abandoned": 0}
+
+
+def test_exhausted_slots_are_not_retried(slots):
+    assert not issubclass(llm_utils.LLMCallSlotsExhausted, llm_utils.RETRYABLE_LLM_ERRORS)
+    slots.limit = 1
+    assert slots.acquire(0)
+    try:
+        model = _model("fixed:0")
+        start = time.monotonic()
+        with pytest.raises(llm_utils.LLMCallSlotsExhausted):
+            llm_utils.call_llm(model, "Return a JSON array", agent_name="exhausted")
+        # One wait for a slot, bounded by the attempt timeout; LLM_MAX_RETRIES is 3
+        assert time.monotonic() - start < 0.2
+        assert model.calls == 0
+    finally:
+        slots.release()
@@ -0,0 +1,21 @@
+"""Prometheus text rendering of the metrics registry."""
+
+from src.utils.metrics_utils import MetricsRegistry
+
+
+def test_help_text_and_label_values_are_escaped_differently():
+    registry = MetricsRegistry(prefix="test_")
+    counter = registry.counter("requests", 'Requests by "route"\nwith C:\\paths', ("route",))
+    counter.inc(route='/jobs/"x"\\y\nz')
+
+    lines = registry.render().splitlines()
+    # HELP escapes only backslash and newline; label values also escape double quotes
+    assert lines[0] == '# HELP test_requests Requests by "route"\\nwith C:\\\\paths'
+    assert lines[1] == "# TYPE test_requests counter"
+    assert lines[2] == 'test_requests_total{route="/jobs/\\"x\\"\\\\y\\nz"} 1'
+
+
+def test_collector_help_text_is_escaped():
+    registry = MetricsRegistry(prefix="test_")
+    registry.register_collector(lambda: [("queue", "gauge", 'Jobs "queued"\nnow', [("", {}, 3)])])
+    assert registry.render() == '# HELP test_queue Jobs "queued"\\nnow\n# TYPE test_queue gauge\ntest_queue 3\n'
@@ -0,0 +1,20 @@
+"""/optimize with only resume_text: extraction runs inside the optimization graph."""
+
+from src.agents import resume_extractor
+from tests.helpers import SAMPLE_JD, SAMPLE_RESUME, post_json
+
+
+def test_optimize_extracts_the_resume_in_its_prepare_resume_node(server, monkeypatch):
+    calls = []
+    extract = resume_extractor.extract_resume_node
+
+    def counting_extract(state):
+        calls.append(state)
+        return extract(state)
+
+    monkeypatch.setattr(resume_extractor, "extract_resume_node", counting_extract)
+    status, _, body = post_json(server, "/optimize", {"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD})
+    assert status == 200
+    assert len(calls) == 1
+    assert body["data"]["resumeStructured"]
+    assert not body["data"]["degraded"]
@@ -0,0 +1,106 @@
+"""TokenBucket ordering, timeouts and debits."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.rate_limit_utils import RateLimiter, RateLimitTimeout, TokenBucket
+
+
+def _drained(rate_per_minute, capacity=1.0):
+    bucket = TokenBucket(rate_per_minute, capacity=capacity)
+    bucket.acquire(capacity)
+    return bucket
+
+
+def _queue(bucket, target, *args):
+    """Start a waiter and return once it holds its ticket."""
+    tickets = bucket._next_ticket
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    while bucket._next_ticket == tickets:
+        time.sleep(0.001)
+    return thread
+
+
+def test_waiters_are_served_in_arrival_order():
+    # 10 tokens/s: the first waiter needs 0.1s of refill, the small ones 0.01s each
+    bucket = _drained(600)
+    served = []
+
+    def take(name, amount):
+        bucket.acquire(amount)
+        served.append(name)
+
+    threads = [_queue(bucket, take, "large", 1.0)]
+    threads += [_queue(bucket, take, f"small-{i}", 0.1) for i in range(3)]
+    for thread in threads:
+        thread.join(5)
+    assert served == ["large", "small-0", "small-1", "small-2"]
+
+
+def test_timed_out_waiter_is_skipped():
+    bucket = _drained(600)
+    results = {}
+
+    def take(name, timeout):
+        try:
+            results[name] = bucket.acquire(1.0, timeout=timeout)
+        except RateLimitTimeout:
+            results[name] = "timeout"
+
+    first = _queue(bucket, take, "first", None)
+    impatient = _queue(bucket, take, "impatient", 0.02)
+    last = _queue(bucket, take, "last", None)
+    impatient.join(5)
+    assert results == {"impatient": "timeout"}
+
+    # The abandoned ticket doesn't block the one behind it
+    first.join(5)
+    last.join(5)
+    assert not last.is_alive()
+    assert results["first"] == pytest.approx(0.1, abs=0.08)
+    assert results["last"] == pytest.approx(0.2, abs=0.1)
+    assert bucket._skipped == set()
+    assert bucket._now_serving == bucket._next_ticket
+
+
+def test_timeout_at_the_head_of_the_line():
+    bucket = _drained(60)
+    with pytest.raises(RateLimitTimeout):
+        bucket.acquire(1.0, timeout=0.05)
+    assert bucket._now_serving == bucket._next_ticket
+
+
+def test_debit_can_go_negative():
+    bucket = TokenBucket(60, capacity=10)
+    bucket.debit(25)
+    assert bucket._tokens == pytest.approx(-15, abs=0.1)
+
+    # Nothing can be taken until the overdraft is paid back (16s at 1 token/s)
+    with pytest.raises(RateLimitTimeout):
+        bucket.acquire(1.0, timeout=0.05)
+
+    # A negative debit (usage below the estimate) refunds, up to capacity
+    bucket.debit(-100)
+    assert bucket._tokens == 10
+    assert bucket.acquire(10) < 0.05
+
+
+def test_rate_limiter_settles_token_usage():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=1000)
+    limiter.acquire(estimated_tokens=100)
+    limiter.record_usage(100, 1500)
+    assert limiter._token_bucket._tokens == pytest.approx(-500, abs=1)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(estimated_tokens=1, timeout=0.05)
+    assert limiter.stats()["calls"] == 1
+
+
+def test_zero_budgets_disable_the_limiter():
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    assert not limiter.enabled
+    assert limiter.acquire(estimated_tokens=10 ** 9) == 0.0
+    with pytest.raises(ValueError):
+        TokenBucket(0)
@@ -0,0 +1,99 @@
+"""Section gates and their effect on the analysis graph's overall score."""
+
+import pytest
+
+from src import config
+from src.graph.orchestrator import build_langgraph_app
+from src.graph.section_gating import gate_scoring_sections_node, optimization_gates, scoring_gates
+from tests.helpers import SAMPLE_JD
+
+EDUCATION_JD = SAMPLE_JD + "- Bachelor's degree in Computer Science or equivalent\n- Public GitHub portfolio\n"
+ENTRY_LEVEL_JD = "Software engineering internship. No prior experience required. Degree in progress."
+JD_ANALYSIS = {
+    "job_key_skills": ["Python", "Kafka"],
+    "job_tech_stack": ["Kubernetes"],
+    "job_key_responsibilities": ["Design platform services", "Mentor engineers"],
+}
+
+RESUME = {
+    "contact_info": {"name": "Jane Doe"},
+    "skills": [{"name": "Python"}, {"name": "Kafka"}],
+    "experience": [{"job_title": "Software Engineer", "company": "Acme", "responsibilities": ["Built APIs"]}],
+    "education": [{"degree": "B.Sc.", "field_of_study": "Computer Science", "institution": "TU Munich",
+                   "start_date": "2014", "end_date": "2018"}],
+    "projects": [{"name": "ledgerlite", "description": "Accounting library"}],
+    "meta": {"seniority_level": "senior", "domains": ["fintech"], "languages": ["English"]},
+}
+EMPTY_RESUME = {"contact_info": {"name": "Jane Doe"}, "meta": {}}
+
+
+def _sections(gates):
+    return {section: gate["applicable"] for section, gate in gates.items()}
+
+
+def test_complete_resume_is_not_gated():
+    assert scoring_gates(RESUME, EDUCATION_JD, JD_ANALYSIS) == {}
+    assert optimization_gates(RESUME, EDUCATION_JD, JD_ANALYSIS) == {}
+
+
+def test_scoring_gates_for_an_empty_resume():
+    gates = scoring_gates(EMPTY_RESUME, EDUCATION_JD, JD_ANALYSIS)
+    assert _sections(gates) == {
+        "skills": True, "experience": True, "education": True, "projects": True, "meta": False,
+    }
+    assert gates["skills"]["output"]["missing_requirements"] == ["Python", "Kafka", "Kubernetes"]
+    assert gates["experience"]["output"]["missing_requirements"] == JD_ANALYSIS["job_key_responsibilities"]
+    assert all(gate["output"]["score"] == 0 for gate in gates.values())
+    assert all(gate["output"]["section_name"] == section for section, gate in gates.items())
+
+
+def test_scoring_gates_for_sections_the_job_does_not_ask_for():
+    gates = scoring_gates(EMPTY_RESUME, ENTRY_LEVEL_JD, {})
+    assert _sections(gates) == {
+        "skills": True, "experience": False, "education": True, "projects": False, "meta": False,
+    }
+
+    # A JD without any education keyword marks education not applicable even on a full resume
+    gates = scoring_gates(RESUME, SAMPLE_JD, JD_ANALYSIS)
+    assert _sections(gates) == {"education": False}
+
+
+def test_optimization_gates():
+    gates = optimization_gates(EMPTY_RESUME, EDUCATION_JD, JD_ANALYSIS)
+    assert set(gates) == {"experience", "projects", "education", "skills"}
+    assert gates["experience"]["output"] == gates["projects"]["output"] == gates["education"]["output"] == []
+    assert "Python, Kafka" in gates["skills"]["output"]["improvements"][0]
+    assert gates["skills"]["output"]["optimized_content"] == ""
+
+    # Education the JD doesn't ask about is kept as written
+    gates = optimization_gates(RESUME, SAMPLE_JD, JD_ANALYSIS)
+    [education] = gates["education"]["output"]
+    assert education["original_content"] == education["optimized_content"] == (
+        "B.Sc. in Computer Science, TU Munich (2014 - 2018)"
+    )
+
+
+@pytest.mark.parametrize("exclude, expected", [
+    (False, {"skills": True, "projects": True}),
+    (True, {"skills": True, "projects": True, "education": False}),
+])
+def test_not_applicable_gates_are_opt_in(monkeypatch, exclude, expected):
+    monkeypatch.setattr(config, "SECTION_GATING_EXCLUDE_NOT_APPLICABLE", exclude)
+    resume = {**RESUME, "skills": [], "projects": []}
+    state = {"resume_structured": resume, "job_description": SAMPLE_JD, "jd_analysis": JD_ANALYSIS}
+    assert _sections(gate_scoring_sections_node(state)["section_gates"]) == expected
+
+
+@pytest.mark.parametrize("exclude", [False, True])
+def test_education_stays_in_the_overall_score_unless_opted_out(monkeypatch, exclude):
+    monkeypatch.setattr(config, "SECTION_GATING_EXCLUDE_NOT_APPLICABLE", exclude)
+    result = build_langgraph_app().invoke({"resume_structured": RESUME, "job_description": SAMPLE_JD})
+    final = result["final_score"]
+    scored = {score["section_name"] for score in final["section_scores"]}
+    assert not final["degraded"]
+    if exclude:
+        assert scored == {"skills", "experience", "projects", "meta"}
+        assert "education" in final["skipped_sections"]
+    else:
+        assert scored == {"skills", "experience", "education", "projects", "meta"}
+        assert final["skipped_sections"] == {}
@@ -0,0 +1,54 @@
+"""Server-Sent Events from /stream and /optimize/stream against the fake backend."""
+
+import pytest
+
+from src.agents import skills_agent
+from tests.helpers import SAMPLE_JD, SAMPLE_RESUME, post_sse
+
+BODY = {"resume_text": SAMPLE_RESUME, "job_description": SAMPLE_JD}
+SECTIONS = {
+    "/stream": ("section_score", {"skills", "experience", "education", "projects", "meta"}),
+    "/optimize/stream": ("section_optimization", {"summary", "experience", "skills", "projects", "education"}),
+}
+
+
+def _without_partials(events):
+    return [(event, data) for event, data in events if event != "section_partial"]
+
+
+@pytest.mark.parametrize("path", list(SECTIONS))
+def test_events_arrive_in_graph_order(server, path):
+    section_event, sections = SECTIONS[path]
+    status, headers, events = post_sse(server, path, BODY)
+    assert status == 200
+    assert headers["Content-Type"] == "text/event-stream"
+
+    events = _without_partials(events)
+    names = [event for event, _ in events]
+    assert names == ["resume_structured"] + [section_event] * len(sections) + ["result"]
+    assert {data["section"] for event, data in events if event == section_event} == sections
+
+    resume_structured, result = events[0][1], events[-1][1]
+    assert result["success"] and result["data"]["resumeStructured"] == resume_structured
+    assert not result["data"]["degraded"]
+
+
+def test_failed_section_emits_section_failed(server, monkeypatch):
+    def failing_call_llm(*args, **kwargs):
+        raise ValueError("unparseable model output")
+
+    monkeypatch.setattr(skills_agent, "call_llm", failing_call_llm)
+    status, _, events = post_sse(server, "/stream", {**BODY, "retry_failed": False})
+    assert status == 200
+
+    events = _without_partials(events)
+    [failure] = [data for event, data in events if event == "section_failed"]
+    assert failure["node"] == "score_skills" and failure["section"] == "skills"
+    assert failure["error_type"] == "ValueError"
+    scored = {data["section"] for event, data in events if event == "section_score"}
+    assert scored == {"experience", "education", "projects", "meta"}
+
+    event, result = events[-1]
+    assert event == "result"
+    assert result["data"]["degraded"]
+    assert [item["node"] for item in result["data"]["failures"]] == ["score_skills"]
@@ -0,0 +1,46 @@
+"""parse_json_response on well-formed, wrapped and malformed LLM responses."""
+
+import pytest
+
+from benchmarks.json_repair_benchmark import _build_corpus
+from src.utils.text_utils import parse_json_response
+
+
+@pytest.mark.parametrize("case", _build_corpus(), ids=lambda case: case["name"])
+def test_benchmark_corpus(case):
+    assert parse_json_response(case["text"]) == case["expected"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{'reason': 'Strong Python skills', 'score': 7}", {"reason": "Strong Python skills", "score": 7}),
+    ("[{'name': 'Go'}, {'name': 'Kafka'}]", [{"name": "Go"}, {"name": "Kafka"}]),
+    ("{'reason': 'it\\'s \"great\"', 'score': None}", {"reason": 'it\'s "great"', "score": None}),
+    ("{'reason': 'cut off", {"reason": "cut off"}),
+])
+def test_single_quoted_strings(text, expected):
+    assert parse_json_response(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    '{"reason": "role at "Acme" was great"}',
+    '{"reason": "Strong" Python skills, "score": 7}',
+    "{'reason': 'Strong' Python skills}",
+])
+def test_word_after_value_where_key_expected_is_rejected(text):
+    with pytest.raises(ValueError):
+        parse_json_response(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{reason: "ok", score: 7}', {"reason": "ok", "score": 7}),
+    ('{"reason": "ok", score: 7,}', {"reason": "ok", "score": 7}),
+    ('{"reason": "ok" "score": 7}', {"reason": "ok", "score": 7}),
+    ('{"skills": ["Go" "Kafka",], "score": 7', {"skills": ["Go", "Kafka"], "score": 7}),
+])
+def test_repairs_keep_working(text, expected):
+    assert parse_json_response(text) == expected
+
+
+def test_no_container_is_rejected():
+    with pytest.raises(ValueError):
+        parse_json_response("I could not score this resume.")
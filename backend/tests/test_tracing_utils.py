@@ -0,0 +1,83 @@
+"""Critical path and OTLP/JSON export of a traced fan-out."""
+
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils import tracing_utils
+from src.utils.metrics_utils import instrument_node
+
+
+def _branch(name, seconds):
+    with tracing_utils.span(name):
+        with tracing_utils.span("llm.call"):
+            time.sleep(seconds)
+
+
+def _traced_fan_out():
+    with tracing_utils.start_trace("POST /", correlation_id="req-1") as trace:
+        with tracing_utils.span("extract"):
+            time.sleep(0.01)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, _branch, name, seconds)
+                for name, seconds in (("fast", 0.01), ("slow", 0.08))
+            ]
+            for future in futures:
+                future.result()
+        with tracing_utils.span("aggregate"):
+            pass
+    return trace
+
+
+def test_critical_path_follows_the_slowest_branch():
+    trace = _traced_fan_out()
+    assert [span.name for span in trace.critical_path()] == ["extract", "slow", "llm.call", "aggregate"]
+    on_path = {span.name for span in trace.spans if span.attributes.get("critical_path")}
+    assert on_path == {"extract", "slow", "llm.call", "aggregate"}
+
+
+def test_otlp_json_export(monkeypatch, tmp_path):
+    monkeypatch.setattr(tracing_utils, "TRACE_EXPORTERS", ["otlp-json"])
+    monkeypatch.setattr(tracing_utils, "TRACE_DIR", str(tmp_path))
+    trace = _traced_fan_out()
+
+    [line] = (tmp_path / "traces.otlp.jsonl").read_text().splitlines()
+    [resource_spans] = json.loads(line)["resourceSpans"]
+    assert resource_spans["resource"]["attributes"][0]["key"] == "service.name"
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    assert len(spans) == len(trace.spans) == 7
+    assert {span["traceId"] for span in spans} == {trace.trace_id}
+
+    by_id = {span["spanId"]: span for span in spans}
+    [root] = [span for span in spans if "parentSpanId" not in span]
+    assert root["name"] == "POST /"
+    for span in spans:
+        if span is not root:
+            assert span["parentSpanId"] in by_id
+        assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+        attributes = {item["key"]: item["value"] for item in span["attributes"]}
+        assert attributes["correlation_id"] == {"stringValue": "req-1"}
+        assert span["status"] == {"code": 1}
+    slow = next(span for span in spans if span["name"] == "slow")
+    assert {"key": "critical_path", "value": {"boolValue": True}} in slow["attributes"]
+
+
+def test_node_overhead_around_llm_calls():
+    def node(state):
+        time.sleep(0.01)
+        with tracing_utils.span("llm.call"):
+            time.sleep(0.01)
+        return {}
+
+    with tracing_utils.start_trace("POST /") as trace:
+        instrument_node("analysis", "score_skills", node)({})
+
+    [node_span] = [span for span in trace.spans if span.name == "node.score_skills"]
+    phases = {span.name: span for span in trace.children(node_span)}
+    assert set(phases) == {"node.before_llm", "llm.call", "node.after_llm"}
+    assert phases["node.before_llm"].start_ns == node_span.start_ns
+    assert phases["node.before_llm"].end_ns == phases["llm.call"].start_ns
+    assert phases["node.after_llm"].start_ns == phases["llm.call"].end_ns
+    assert phases["node.before_llm"].attributes["derived"] is True